@@ -3,24 +3,46 @@
 from __future__ import annotations
 
 import argparse
-import json
-import random
-import time
-from dataclasses import asdict, dataclass
-from datetime import date, datetime
+import sys
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence
 
-from playwright.sync_api import sync_playwright
+import httpx
 
 from wi_scraper import (
     DEFAULT_CLASS_CODES,
+    CaptchaRequiredError,
     ClassCode,
+    CSVSink,
+    IncompleteSweepError,
+    NDJSONSink,
+    RateLimiter,
+    SQLiteCaseStore,
+    WICourtClient,
+    build_rate_limiter,
     fetch_case_summaries,
     flatten_aggregated,
+    harvest_cookies,
 )
+from wi_scraper.browser import (
+    DEFAULT_DETAIL_TIMEOUT,
+    LIGHT_VIEWPORT,
+    DetailCapture,
+    build_resource_blocker,
+    captcha_present,
+)
+from wi_scraper.clearance import BrowserClearances, ClearanceBroker, ClearanceError
+from wi_scraper.detailcache import DEFAULT_MAX_AGE, DetailCache
+from wi_scraper.pagepool import PagePool, solve_clearance
+from wi_scraper.parquet import DETAIL_FLUSH_INTERVAL, ParquetRowWriter, party_schema
+from wi_scraper.scraper import FailedUnit
+from wi_scraper.serialization import dump_bytes, dumps
 
 BASE_URL = "https://wcca.wicourts.gov"
+# Clearances tried per case before it is given up as stuck behind a CAPTCHA.
+MAX_CLEARANCES_PER_CASE = 3
 
 
 @dataclass
@@ -37,6 +59,9 @@ class PartyRecord:
     role_status: Optional[str]
 
 
+PARTY_FIELDS = [field.name for field in fields(PartyRecord)]
+
+
 @dataclass
 class CaseDetailEnvelope:
     case: Dict[str, object]
@@ -66,42 +91,35 @@ def _get_case_detail_url(case_no: str, county_no: int) -> str:
     return f"{BASE_URL}/caseDetail.html?caseNo={case_no}&countyNo={county_no}&index=0&isAdvanced=true"
 
 
-def _extract_json_from_page(page) -> Dict[str, object]:
-    # Wait for the page to load and API data to be available
-    page.wait_for_load_state('networkidle')
-    
-    # The API data is usually stored in a script tag or window object
-    # Try to find the JSON data in script tags
-    scripts = page.query_selector_all("script")
-    for script in scripts:
-        content = script.inner_text()
-        if content and 'caseDetail' in content:
-            # Extract JSON from script
-            start = content.find('{')
-            end = content.rfind('}') + 1
-            if start != -1 and end != -1:
-                json_str = content[start:end]
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    continue
-    
-    # Fallback: try to find the data in the page's data attributes or specific elements
-    # This would need adjustment based on the actual DOM structure
-    # For now, return empty dict
-    return {}
-
-
-def fetch_case_detail(page, case_no: str, county_no: int) -> Dict[str, object]:
+def fetch_case_detail(
+    page,
+    case_no: str,
+    county_no: int,
+    rate_limiter: Optional[RateLimiter] = None,
+    timeout: float = DEFAULT_DETAIL_TIMEOUT,
+) -> Dict[str, object]:
     url = _get_case_detail_url(case_no, county_no)
-    page.goto(url)
-    
-    # Wait for the case detail data to load
-    page.wait_for_load_state('networkidle')
-    
-    # Extract the detail data
-    detail = _extract_json_from_page(page)
-    
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    capture = DetailCapture(page)
+    try:
+        page.goto(url, wait_until="commit")
+        # Resolve on the page's own detail XHR rather than waiting for network idle.
+        detail = capture.wait(
+            case_no=case_no,
+            county_no=county_no,
+            timeout=timeout,
+            abort=lambda: captcha_present(page),
+        ) or {}
+    finally:
+        capture.detach()
+
+    if rate_limiter is not None:
+        if not detail and captcha_present(page):
+            rate_limiter.penalize()
+        else:
+            rate_limiter.reward()
+
     return detail
 
 
@@ -136,22 +154,98 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--offset", type=int, default=0)
     parser.add_argument("--profile", default=".wcca_profile", help="Browser profile directory to use")
     parser.add_argument("--output", type=Path)
-    parser.add_argument("--parties-csv", type=Path)
+    parser.add_argument(
+        "--ndjson",
+        type=Path,
+        help="Append each case's envelope to this NDJSON file as soon as its detail arrives",
+    )
+    parser.add_argument("--parties-csv", type=Path, help="Write party rows to a CSV file as details arrive")
+    parser.add_argument("--parties-parquet", type=Path, help="Write party rows to a Parquet file as details arrive (needs pyarrow)")
+    parser.add_argument("--sqlite", type=Path, help="Also upsert summaries and details into this SQLite database")
+    parser.add_argument(
+        "--detail-cache",
+        type=Path,
+        metavar="DB",
+        help="SQLite cache of fetched details; cases whose summary row is unchanged are not fetched again",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE.days,
+        metavar="DAYS",
+        help="Re-fetch cached details older than this even if the summary is unchanged (default: %(default)s)",
+    )
+    parser.add_argument("--rps", type=float, default=1.0, help="Target page loads/searches per second (default: 1.0)")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed back to back before pacing (default: 1)")
+    parser.add_argument(
+        "--http",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Fetch details from the JSON endpoint with the profile's cookies, using the browser only once a CAPTCHA is required (default: on)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Browser workers loading details in parallel, each with its own page (default: 1)",
+    )
+    parser.add_argument(
+        "--light",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Skip images, fonts, stylesheets and analytics on detail pages and use a small viewport (default: on)",
+    )
+    parser.add_argument(
+        "--block-host",
+        dest="block_hosts",
+        action="append",
+        default=[],
+        metavar="HOST",
+        help="Extra host to block in light mode (repeatable)",
+    )
+    parser.add_argument(
+        "--detail-timeout",
+        type=float,
+        default=DEFAULT_DETAIL_TIMEOUT,
+        help="Seconds to wait for a case's detail response (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--shared-clearance",
+        action="store_true",
+        help="Lease CAPTCHA clearances from a broker (seeded with the profile's session) to HTTP and browser workers",
+    )
     return parser
 
 
 def main(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
 
     class_codes = _resolve_class_codes(args.class_codes or [])
-    aggregated = fetch_case_summaries(
-        start=args.start,
-        end=args.end,
-        class_codes=class_codes,
-        span_days=args.span_days,
-    )
+    rate_limiter = build_rate_limiter(args.rps, args.burst, jitter=0.5)
+    failed: List[FailedUnit] = []
+    with WICourtClient(rate_limiter=rate_limiter) as client:
+        try:
+            aggregated = fetch_case_summaries(
+                start=args.start,
+                end=args.end,
+                class_codes=class_codes,
+                span_days=args.span_days,
+                client=client,
+            )
+        except IncompleteSweepError as exc:
+            # Carry on with the cases the other searches found; the exit status reports the gap.
+            aggregated = exc.partial
+            failed = exc.failed
+            print(f"{len(failed)} search(es) still failed after their retry; the output is incomplete:", file=sys.stderr)
+            for window, code in failed:
+                print(f"  {window.start}..{window.end} class {code}", file=sys.stderr)
     cases = flatten_aggregated(aggregated)
+    store = SQLiteCaseStore(args.sqlite) if args.sqlite else None
+    if store is not None:
+        store.write_batch(aggregated)
 
     if args.offset:
         cases = cases[args.offset:]
@@ -160,72 +254,193 @@ def main(argv: Sequence[str] | None = None) -> int:
 
     if not cases:
         print("No cases matched the requested window.")
-        return 0
-
-    # Use Playwright with persistent context using the browser profile
-    with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(
-            args.profile,
-            headless=True,
-            viewport={"width": 1920, "height": 1080},
-        )
-        
-        envelopes: List[CaseDetailEnvelope] = []
-        party_rows: List[PartyRecord] = []
-
-        for idx, case in enumerate(cases):
-            print(f"Fetching detail {idx + 1}/{len(cases)}: {case['case_no']} (county {case['county_no']})")
-            
-            page = browser.new_page()
-            
-            try:
-                detail = fetch_case_detail(page, case['case_no'], case['county_no'])
-                
-                parties = flatten_parties(case, detail)
-                party_rows.extend(parties)
-                envelopes.append(CaseDetailEnvelope(case=case, detail=detail, parties=parties))
-                
-                # Small delay between pages
-                time.sleep(random.uniform(0.5, 1.5))
-                
-            except Exception as e:
-                print(f"Error fetching case {case['case_no']}: {e}")
-                continue
-            finally:
-                page.close()
-
-        browser.close()
-
-    if not envelopes:
+        if store is not None:
+            store.close()
+        return 1 if failed else 0
+
+    # A detail takes a request or a page load, so flushing NDJSON/CSV after every case costs nothing and
+    # survives a crash. Parquet only becomes readable once closed (see ParquetRowWriter).
+    envelope_sink = NDJSONSink(args.ndjson, flush_every=1) if args.ndjson else None
+    party_sink = CSVSink(args.parties_csv, fieldnames=PARTY_FIELDS, flush_every=1) if args.parties_csv else None
+    parties_parquet = (
+        ParquetRowWriter(args.parties_parquet, party_schema(), flush_interval=DETAIL_FLUSH_INTERVAL)
+        if args.parties_parquet
+        else None
+    )
+    # The indented JSON array needs every envelope at once; with only --ndjson memory stays flat.
+    collected: Optional[List[Dict[str, object]]] = [] if args.output or envelope_sink is None else None
+    captured = 0
+    detail_cache = (
+        DetailCache(args.detail_cache, max_age=timedelta(days=args.cache_max_age)) if args.detail_cache else None
+    )
+
+    def record(case: Dict[str, object], detail: Dict[str, object], *, fetched: bool = True) -> None:
+        nonlocal captured
+        captured += 1
+        parties = [asdict(party) for party in flatten_parties(case, detail)]
+        if party_sink is not None:
+            party_sink.write_many(parties)
+        if parties_parquet is not None:
+            parties_parquet.write_many(parties)
+        envelope = {"case": case, "detail": detail, "parties": parties}
+        if envelope_sink is not None:
+            envelope_sink.write(envelope)
+        if collected is not None:
+            collected.append(envelope)
+        if store is not None and detail:
+            store.upsert_detail(case['case_no'], case['county_no'], detail)
+        if detail_cache is not None and fetched and detail:
+            detail_cache.put(case, detail)
+
+    broker = None
+    try:
+        if detail_cache is not None:
+            hits, cases = detail_cache.partition(cases)
+            for case, detail in hits:
+                record(case, detail, fetched=False)
+            print(f"{len(hits)} detail(s) unchanged since they were cached in {args.detail_cache}; fetching {len(cases)}.")
+
+        total = len(cases)
+
+        clearances = None
+        if args.shared_clearance and cases:
+            # Solves open a case page in a visible browser; until one is needed the profile's session is used.
+            probe_url = _get_case_detail_url(cases[0]['case_no'], cases[0]['county_no'])
+            broker = ClearanceBroker(lambda: solve_clearance(probe_url))
+            broker.add(harvest_cookies(args.profile))
+            clearances = BrowserClearances(broker)
+
+        browser_cases = cases
+        if args.http and broker is not None:
+            # Every request carries the broker's current clearance; a CAPTCHA demand swaps it for the next one.
+            browser_cases = []
+            clearance = None
+            with WICourtClient(rate_limiter=rate_limiter) as detail_client:
+                for idx, case in enumerate(cases):
+                    print(f"Fetching detail {idx + 1}/{total} over HTTP: {case['case_no']} (county {case['county_no']})")
+                    detail = None
+                    try:
+                        for _ in range(MAX_CLEARANCES_PER_CASE):
+                            lease = broker.lease()
+                            if lease is not clearance:
+                                detail_client.use_cookies(lease.cookies)
+                                clearance = lease
+                            try:
+                                detail = detail_client.case_detail(case['case_no'], case['county_no'])
+                            except CaptchaRequiredError:
+                                broker.revoke(clearance)
+                                continue
+                            broker.record_view(clearance)
+                            break
+                    except ClearanceError as e:
+                        print(f"No CAPTCHA clearance available ({e}); stopping with {total - idx} case(s) not fetched.")
+                        break
+                    except httpx.HTTPError as e:
+                        print(f"Error fetching case {case['case_no']}: {e}")
+                        continue
+                    if detail is None:
+                        print(f"Case {case['case_no']} still demands a CAPTCHA after {MAX_CLEARANCES_PER_CASE} clearances.")
+                        continue
+                    record(case, detail)
+        elif args.http and cases:
+            # Plain JSON calls with the profile's cookies; the browser is only needed once a CAPTCHA is demanded.
+            browser_cases = []
+            with WICourtClient(rate_limiter=rate_limiter) as detail_client:
+                detail_client.use_cookies(harvest_cookies(args.profile))
+                for idx, case in enumerate(cases):
+                    print(f"Fetching detail {idx + 1}/{total} over HTTP: {case['case_no']} (county {case['county_no']})")
+                    try:
+                        detail = detail_client.case_detail(case['case_no'], case['county_no'])
+                    except CaptchaRequiredError:
+                        print(f"Server requires a CAPTCHA; loading the remaining {total - idx} case(s) in the browser.")
+                        browser_cases = cases[idx:]
+                        break
+                    except httpx.HTTPError as e:
+                        print(f"Error fetching case {case['case_no']}: {e}")
+                        continue
+                    record(case, detail)
+
+        if browser_cases:
+            # Each worker keeps one page open; with --workers > 1 they share the profile's cookies.
+            blocker = build_resource_blocker(args.light, extra_hosts=tuple(args.block_hosts))
+
+            def setup_context(context) -> None:
+                if blocker is not None:
+                    blocker.install(context)
+                if clearances is not None:
+                    clearances.install(context)
+
+            pool = PagePool(
+                args.workers,
+                profile=args.profile,
+                # With --shared-clearance the broker's cookies replace the profile's.
+                cookies=[] if clearances is not None else None,
+                headless=True,
+                context_options={"viewport": LIGHT_VIEWPORT if blocker is not None else {"width": 1920, "height": 1080}},
+                setup_context=setup_context if blocker is not None or clearances is not None else None,
+            )
+
+            def load(page, indexed):
+                idx, case = indexed
+                print(f"Fetching detail {idx + 1}/{total}: {case['case_no']} (county {case['county_no']})")
+                if clearances is None:
+                    return fetch_case_detail(page, case['case_no'], case['county_no'], rate_limiter, timeout=args.detail_timeout)
+                detail = {}
+                for _ in range(MAX_CLEARANCES_PER_CASE):
+                    clearances.sync(page.context)
+                    detail = fetch_case_detail(page, case['case_no'], case['county_no'], rate_limiter, timeout=args.detail_timeout)
+                    if detail:
+                        clearances.record_view(page.context)
+                        break
+                    if not captcha_present(page):
+                        break
+                    clearances.revoke(page.context)
+                return detail
+
+            def failed(indexed, exc: BaseException) -> None:
+                print(f"Error fetching case {indexed[1]['case_no']}: {exc}")
+                return None
+
+            # Results arrive in input order; writes stay on this thread (SQLite connections are thread-bound).
+            indexed = enumerate(browser_cases, start=total - len(browser_cases))
+            for case, detail in zip(browser_cases, pool.imap(load, indexed, on_error=failed)):
+                if detail is not None:
+                    record(case, detail)
+    finally:
+        for sink in (envelope_sink, party_sink, parties_parquet):
+            if sink is not None:
+                sink.close()
+        if detail_cache is not None:
+            detail_cache.close()
+        if broker is not None:
+            broker.close()
+            stats = broker.stats()
+            print(f"{stats['views']} detail(s) from {stats['solves']} CAPTCHA solve(s)")
+        if store is not None:
+            store.close()
+
+    if store is not None:
+        print(f"Stored summaries and {captured} detail record(s) in {args.sqlite}")
+
+    if not captured:
         print("No detail records captured.")
         return 1
 
-    serialisable = [
-        {
-            "case": env.case,
-            "detail": env.detail,
-            "parties": [asdict(p) for p in env.parties],
-        }
-        for env in envelopes
-    ]
-
-    if args.output:
-        args.output.write_text(json.dumps(serialisable, indent=2, default=str))
-        print(f"Wrote {len(serialisable)} record(s) to {args.output}")
-    else:
-        print(json.dumps(serialisable, indent=2, default=str))
-
-    if args.parties_csv and party_rows:
-        import csv
-
-        with args.parties_csv.open("w", newline="", encoding="utf-8") as handle:
-            writer = csv.DictWriter(handle, fieldnames=list(asdict(party_rows[0]).keys()))
-            writer.writeheader()
-            for row in party_rows:
-                writer.writerow(asdict(row))
-        print(f"Wrote {len(party_rows)} party rows to {args.parties_csv}")
-
-    return 0
+    if envelope_sink is not None:
+        print(f"Streamed {envelope_sink.count} record(s) to {args.ndjson}")
+    if collected is not None:
+        if args.output:
+            args.output.write_bytes(dump_bytes(collected, indent=True))
+            print(f"Wrote {len(collected)} record(s) to {args.output}")
+        else:
+            print(dumps(collected, indent=True))
+    if parties_parquet is not None:
+        print(f"Wrote {parties_parquet.count} party rows to {args.parties_parquet}")
+    if party_sink is not None:
+        print(f"Wrote {party_sink.count} party rows to {args.parties_csv}")
+
+    # Searches that failed were listed right after the sweep.
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
@@ -4,22 +4,45 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
 import os
+import sys
 from datetime import date, datetime
 from pathlib import Path
 from typing import Sequence
 from urllib.parse import parse_qs, urlparse
 
+import httpx
 from hcaptcha_challenger import AgentConfig, AgentV
 from playwright.async_api import async_playwright
 
 from wi_scraper import (
     DEFAULT_CLASS_CODES,
+    CaptchaRequiredError,
     ClassCode,
+    IncompleteSweepError,
+    RateLimiter,
+    WICourtClient,
+    build_rate_limiter,
     fetch_case_summaries,
     flatten_aggregated,
 )
+from wi_scraper.browser import (
+    CAPTCHA_SELECTOR,
+    DEFAULT_DETAIL_TIMEOUT,
+    LIGHT_VIEWPORT,
+    AsyncDetailCapture,
+    ResourceBlocker,
+    build_resource_blocker,
+)
+from wi_scraper.clearance import BrowserClearances, ClearanceBroker, ClearanceError
+from wi_scraper.scraper import FailedUnit
+from wi_scraper.serialization import dump_bytes, dumps
+
+
+# How long to wait for the case detail while the user solves a CAPTCHA by hand.
+MANUAL_SOLVE_TIMEOUT = 120.0
+# Clearances tried per case before it is recorded as failed.
+MAX_CLEARANCES_PER_CASE = 3
 
 
 def _parse_date(value: str) -> date:
@@ -52,28 +75,39 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--limit", type=int, default=5, help="Maximum number of cases to inspect")
     parser.add_argument("--output", type=Path, help="Optional JSON file to write results")
     parser.add_argument("--no-next", action="store_true", help="Disable use of the on-page Next link")
+    parser.add_argument(
+        "--http",
+        action="store_true",
+        help="Fetch details over HTTP with CAPTCHA clearances shared through a broker instead of one solve per page",
+    )
+    parser.add_argument(
+        "--shared-clearance",
+        action="store_true",
+        help="In the browser, seed the page from the clearance broker and switch clearances on a CAPTCHA wall",
+    )
     parser.add_argument(
         "--gemini-key",
         help="Optional Gemini API key for hcaptcha-challenger (defaults to GEMINI_API_KEY env var)",
     )
+    parser.add_argument("--rps", type=float, default=None, help="Target case loads/searches per second (default: unlimited)")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed back to back before pacing (default: 1)")
+    parser.add_argument(
+        "--light",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Skip images, fonts, stylesheets and analytics on detail pages and use a small viewport (default: on)",
+    )
+    parser.add_argument(
+        "--block-host",
+        dest="block_hosts",
+        action="append",
+        default=[],
+        metavar="HOST",
+        help="Extra host to block in light mode (repeatable)",
+    )
     return parser
 
 
-async def _read_session_payload_async(page):
-    storage = await page.evaluate(
-        "() => {const out={}; for (let i=0;i<sessionStorage.length;i++){const key=sessionStorage.key(i); out[key]=sessionStorage.getItem(key);} return out;}"
-    )
-    for raw in storage.values():
-        if not raw:
-            continue
-        try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(payload, dict) and "caseDetail" in json.dumps(payload):
-            return payload
-    return None
-
 async def _extract_case_details_from_dom(page):
     """Extract structured case details from DOM using Playwright selectors"""
     try:
@@ -184,15 +218,6 @@ async def _extract_case_details_from_dom(page):
             return {"error": str(e)}
 
 
-def _detail_from_payload(payload):
-    if not payload:
-        return None
-    result = payload.get("result")
-    if isinstance(result, dict) and "caseDetail" in result:
-        return result.get("caseDetail")
-    return payload
-
-
 def _current_case_identifiers_sync(page):
     parsed = urlparse(page.url)
     qs = parse_qs(parsed.query)
@@ -225,7 +250,16 @@ async def async_scrape_case_details(
     limit: int,
     use_next: bool,
     gemini_key: str | None,
+    rate_limiter: RateLimiter | None = None,
+    blocker: ResourceBlocker | None = None,
+    clearances: BrowserClearances | None = None,
 ):
+    """Walk the detail pages in one visible browser.
+
+    With ``clearances`` the context is seeded from the broker's leases and a
+    CAPTCHA wall swaps in the next clearance; otherwise every CAPTCHA is
+    solved on the page itself (hcaptcha-challenger or by hand).
+    """
     case_map = {
         (case["case_no"], case["county_no"]): case for case in cases
     }
@@ -237,20 +271,25 @@ async def async_scrape_case_details(
 
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context(locale="en-US")
+        if blocker is not None:
+            context = await browser.new_context(locale="en-US", viewport=LIGHT_VIEWPORT)
+            await blocker.install_async(context)
+        else:
+            context = await browser.new_context(locale="en-US")
+        if clearances is not None:
+            await clearances.install_async(context)
         page = await context.new_page()
+        # The page is reused for every case; the capture skips responses for earlier cases.
+        capture = AsyncDetailCapture(page)
 
         first = cases[0]
-        await page.goto(
-            "https://wcca.wicourts.gov/caseDetail.html"
-            f"?caseNo={first['case_no']}&countyNo={first['county_no']}&index=0&isAdvanced=true",
-            wait_until="domcontentloaded",
-            timeout=60000,
-        )
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async()
+        await page.goto(_case_detail_url(first), wait_until="domcontentloaded", timeout=60000)
 
-        # Initialize hcaptcha agent only if a key was supplied
+        # Initialize hcaptcha agent only if a key was supplied (the broker runs its own solves)
         agent = None
-        if gemini_key:
+        if gemini_key and clearances is None:
             agent_config = AgentConfig(GEMINI_API_KEY=gemini_key)
             agent = AgentV(page=page, agent_config=agent_config)
 
@@ -270,7 +309,9 @@ async def async_scrape_case_details(
                 print(f"Currently viewing case {processed + 1}: {current_case_no} (county {current_county})")
                 
                 # Automatically handle CAPTCHA if present
-                if agent:
+                if clearances is not None:
+                    detail_timeout = DEFAULT_DETAIL_TIMEOUT
+                elif agent:
                     try:
                         await page.click("text=/click here/i", timeout=3000)
                     except Exception:
@@ -279,22 +320,30 @@ async def async_scrape_case_details(
                     try:
                         challenge_signal = await agent.wait_for_challenge()
                         print(f"CAPTCHA challenge handled (signal: {challenge_signal})")
+                        if rate_limiter is not None:
+                            rate_limiter.penalize()
                         await page.wait_for_selector("div.hcaptcha-box iframe", state="hidden", timeout=10000)
                         await page.wait_for_selector("table.parties, div.case-details, #reactContent", timeout=10000)
                     except Exception as exc:
                         print(f"CAPTCHA solving or page load error: {exc}")
+                    detail_timeout = DEFAULT_DETAIL_TIMEOUT
                 else:
-                    print("Solve the CAPTCHA manually in the browser window; waiting for 15 seconds.")
-                    await page.wait_for_timeout(15000)
+                    print(f"Solve the CAPTCHA manually in the browser window if shown; waiting up to {MANUAL_SOLVE_TIMEOUT:.0f} seconds.")
+                    detail_timeout = MANUAL_SOLVE_TIMEOUT
 
                 try:
-                    # After CAPTCHA is solved, wait for the page to load case details
-                    await page.wait_for_timeout(3000)
-                    
-                    # Try to read the session payload from sessionStorage
-                    payload = await _read_session_payload_async(page)
-                    detail = _detail_from_payload(payload) if payload else None
-                    
+                    if clearances is not None:
+                        detail = await _wait_with_clearance(
+                            page, capture, clearances, case_no=current_case_no, county_no=current_county
+                        )
+                    else:
+                        # Resolves as soon as the page's own case-detail XHR completes.
+                        detail = await capture.wait(
+                            case_no=current_case_no,
+                            county_no=current_county,
+                            timeout=detail_timeout,
+                        )
+
                     if not detail:
                         detail = await _extract_case_details_from_dom(page)
                         if not detail:
@@ -309,6 +358,11 @@ async def async_scrape_case_details(
                     if processed >= min(limit, len(cases)):
                         break
 
+                    if rate_limiter is not None:
+                        await rate_limiter.acquire_async()
+                    if clearances is not None:
+                        # Pick up a fresher clearance before the next page load.
+                        await clearances.sync_async(context)
                     if use_next:
                         next_link = await page.query_selector("a[href*='index='] >> text=Next")
                         if not next_link:
@@ -319,11 +373,13 @@ async def async_scrape_case_details(
                     else:
                         next_case = cases[processed]
                         await page.goto(
-                            "https://wcca.wicourts.gov/caseDetail.html"
-                            f"?caseNo={next_case['case_no']}&countyNo={next_case['county_no']}&index={processed}&isAdvanced=true",
+                            _case_detail_url(next_case, processed),
                             wait_until="domcontentloaded",
                             timeout=60000,
                         )
+                except ClearanceError as exc:
+                    print(f"No CAPTCHA clearance available ({exc}); stopping with {len(results)} case(s).")
+                    break
                 except Exception as e:
                     print(f"Error processing case detail: {e}")
                     results.append({
@@ -338,7 +394,120 @@ async def async_scrape_case_details(
 
     return results
 
-def scrape_case_details(cases, *, limit, use_next, gemini_key):
+
+async def _captcha_shown(page) -> bool:
+    return await page.locator(CAPTCHA_SELECTOR).count() > 0
+
+
+async def _wait_with_clearance(page, capture, clearances: BrowserClearances, *, case_no, county_no):
+    """Wait for the detail; on a CAPTCHA wall revoke the page's clearance, load the next one and reload."""
+    for _ in range(MAX_CLEARANCES_PER_CASE):
+        detail = await capture.wait(
+            case_no=case_no,
+            county_no=county_no,
+            timeout=DEFAULT_DETAIL_TIMEOUT,
+            abort=lambda: _captcha_shown(page),
+        )
+        if detail is not None:
+            clearances.record_view(page.context)
+            return detail
+        if not await _captcha_shown(page):
+            return None
+        print("CAPTCHA wall; switching to the next clearance.")
+        clearances.revoke(page.context)
+        await clearances.sync_async(page.context)
+        await page.reload(wait_until="domcontentloaded", timeout=60000)
+    return None
+
+
+def _case_detail_url(case, index: int = 0) -> str:
+    return (
+        "https://wcca.wicourts.gov/caseDetail.html"
+        f"?caseNo={case['case_no']}&countyNo={case['county_no']}&index={index}&isAdvanced=true"
+    )
+
+
+async def _solve_clearance(probe, *, gemini_key: str | None, blocker: ResourceBlocker | None = None) -> list[dict]:
+    """Clear one CAPTCHA on ``probe``'s detail page and return the browser's cookies."""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False)
+        try:
+            context = await browser.new_context(locale="en-US")
+            if blocker is not None:
+                await blocker.install_async(context)
+            page = await context.new_page()
+            capture = AsyncDetailCapture(page)
+            await page.goto(_case_detail_url(probe), wait_until="domcontentloaded", timeout=60000)
+            if gemini_key:
+                agent = AgentV(page=page, agent_config=AgentConfig(GEMINI_API_KEY=gemini_key))
+                try:
+                    await page.click("text=/click here/i", timeout=3000)
+                except Exception:
+                    pass
+                signal = await agent.wait_for_challenge()
+                print(f"CAPTCHA challenge handled (signal: {signal})")
+                timeout = DEFAULT_DETAIL_TIMEOUT
+            else:
+                print(f"Solve the CAPTCHA in the browser window to open a new clearance (up to {MANUAL_SOLVE_TIMEOUT:.0f} seconds).")
+                timeout = MANUAL_SOLVE_TIMEOUT
+            detail = await capture.wait(case_no=probe["case_no"], county_no=probe["county_no"], timeout=timeout)
+            if detail is None:
+                raise ClearanceError("the CAPTCHA was not cleared")
+            return await context.cookies()
+        finally:
+            await browser.close()
+
+
+def build_clearance_broker(probe, *, gemini_key: str | None, blocker: ResourceBlocker | None = None) -> ClearanceBroker:
+    """Broker whose solves run hcaptcha-challenger (or a manual solve) on ``probe``'s detail page."""
+    # Solves run on the broker's own thread, so each one gets a fresh event loop.
+    return ClearanceBroker(lambda: asyncio.run(_solve_clearance(probe, gemini_key=gemini_key, blocker=blocker)))
+
+
+def http_scrape_case_details(
+    cases,
+    *,
+    limit: int,
+    broker: ClearanceBroker,
+    rate_limiter: RateLimiter | None = None,
+    max_clearances: int = 3,
+):
+    """Fetch details over HTTP, with sessions leased from ``broker`` instead of one solve per page."""
+    results = []
+    clearance = None
+    with WICourtClient(rate_limiter=rate_limiter) as client:
+        for index, case in enumerate(cases[:limit]):
+            print(f"Fetching case {index + 1}: {case['case_no']} (county {case['county_no']}) over HTTP")
+            detail = None
+            try:
+                for _ in range(max_clearances):
+                    # Lease on every attempt: after a revoke this hands out the next clearance.
+                    lease = broker.lease()
+                    if lease is not clearance:
+                        client.use_cookies(lease.cookies)
+                        clearance = lease
+                    try:
+                        detail = client.case_detail(case["case_no"], case["county_no"])
+                    except CaptchaRequiredError:
+                        broker.revoke(clearance)
+                        continue
+                    except httpx.HTTPError as exc:
+                        detail = {"error": str(exc)}
+                        break
+                    broker.record_view(clearance)
+                    break
+            except ClearanceError as exc:
+                # Keep what was fetched; the remaining cases cannot be reached without a clearance.
+                print(f"No CAPTCHA clearance available ({exc}); stopping with {len(results)} case(s).")
+                results.append({"case": case, "detail": {"error": str(exc)}})
+                break
+            results.append(
+                {"case": case, "detail": detail or {"error": f"still behind a CAPTCHA after {max_clearances} clearances"}}
+            )
+    return results
+
+
+def scrape_case_details(cases, *, limit, use_next, gemini_key, rate_limiter=None, blocker=None, clearances=None):
     """Sync wrapper for async_scrape_case_details"""
     return asyncio.run(
         async_scrape_case_details(
@@ -346,6 +515,9 @@ def scrape_case_details(cases, *, limit, use_next, gemini_key):
             limit=limit,
             use_next=use_next,
             gemini_key=gemini_key,
+            rate_limiter=rate_limiter,
+            blocker=blocker,
+            clearances=clearances,
         )
     )
 
@@ -355,34 +527,74 @@ def main(argv=None):
     args = parser.parse_args(argv)
 
     class_codes = _resolve_class_codes(args.class_codes or [])
-    aggregated = fetch_case_summaries(
-        start=args.start,
-        end=args.end,
-        class_codes=class_codes,
-        span_days=args.span_days,
-    )
+    rate_limiter = build_rate_limiter(args.rps, args.burst)
+    failed: list[FailedUnit] = []
+    with WICourtClient(rate_limiter=rate_limiter) as client:
+        try:
+            aggregated = fetch_case_summaries(
+                start=args.start,
+                end=args.end,
+                class_codes=class_codes,
+                span_days=args.span_days,
+                client=client,
+            )
+        except IncompleteSweepError as exc:
+            # Carry on with the cases the other searches found; the exit status reports the gap.
+            aggregated = exc.partial
+            failed = exc.failed
+            print(f"{len(failed)} search(es) still failed after their retry; the output is incomplete:", file=sys.stderr)
+            for window, code in failed:
+                print(f"  {window.start}..{window.end} class {code}", file=sys.stderr)
     cases = flatten_aggregated(aggregated)
 
     if not cases:
         print("No cases returned for the requested window.")
-        return 0
+        return 1 if failed else 0
 
     gemini_key = resolve_gemini_key(args.gemini_key)
-
-    results = scrape_case_details(
-        cases,
-        limit=args.limit,
-        use_next=not args.no_next,
-        gemini_key=gemini_key,
-    )
+    blocker = build_resource_blocker(args.light, extra_hosts=tuple(args.block_hosts))
+
+    if args.http:
+        with build_clearance_broker(cases[0], gemini_key=gemini_key, blocker=blocker) as broker:
+            results = http_scrape_case_details(
+                cases,
+                limit=args.limit,
+                broker=broker,
+                rate_limiter=rate_limiter,
+            )
+            stats = broker.stats()
+        print(f"{stats['views']} detail(s) from {stats['solves']} CAPTCHA solve(s)")
+    elif args.shared_clearance:
+        with build_clearance_broker(cases[0], gemini_key=gemini_key, blocker=blocker) as broker:
+            results = scrape_case_details(
+                cases,
+                limit=args.limit,
+                use_next=not args.no_next,
+                gemini_key=gemini_key,
+                rate_limiter=rate_limiter,
+                blocker=blocker,
+                clearances=BrowserClearances(broker),
+            )
+            stats = broker.stats()
+        print(f"{stats['views']} detail(s) from {stats['solves']} CAPTCHA solve(s)")
+    else:
+        results = scrape_case_details(
+            cases,
+            limit=args.limit,
+            use_next=not args.no_next,
+            gemini_key=gemini_key,
+            rate_limiter=rate_limiter,
+            blocker=blocker,
+        )
 
     if args.output:
-        args.output.write_text(json.dumps(results, indent=2, default=str))
+        args.output.write_bytes(dump_bytes(results, indent=True))
         print(f"Wrote {len(results)} record(s) to {args.output}")
     else:
-        print(json.dumps(results, indent=2, default=str))
+        print(dumps(results, indent=True))
 
-    return 0
+    # Searches that failed were listed right after the sweep.
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
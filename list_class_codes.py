@@ -8,6 +8,7 @@ from typing import Dict
 import httpx
 
 from wi_scraper.constants import BASE_URL
+from wi_scraper.transport import build_http_client
 
 
 def parse_cookie_header(raw: str) -> Dict[str, str]:
@@ -29,7 +30,7 @@ def build_client(cookie_header: str | None) -> httpx.Client:
         "Referer": f"{BASE_URL}/advanced.html",
         "User-Agent": "Mozilla/5.0",
     }
-    client = httpx.Client(base_url=BASE_URL, timeout=30.0, headers=headers)
+    client = build_http_client(headers=headers)
     if cookie_header:
         for name, value in parse_cookie_header(cookie_header).items():
             client.cookies.set(name, value, domain="wcca.wicourts.gov")
@@ -3,17 +3,43 @@
 from __future__ import annotations
 
 import argparse
-import json
+import asyncio
+import sys
 from datetime import date, datetime
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Callable, Dict, Sequence, Tuple
 
 from wi_scraper import (
     DEFAULT_CLASS_CODES,
+    DEFAULT_RESULT_CAP,
+    AsyncWICourtClient,
+    IncompleteSweepError,
     ClassCode,
-    fetch_case_summaries,
+    CompactCaseStore,
+    NDJSONSink,
+    RetryBudget,
+    RetryPolicy,
+    SQLiteCaseStore,
+    SearchCache,
+    SweepJournal,
+    SyncState,
+    WICourtClient,
+    async_iter_window_batches,
+    build_async_transport,
+    build_rate_limiter,
+    build_transport,
     flatten_aggregated,
+    iter_window_batches,
+    merge_aggregated,
+    merge_flattened,
+    serialise_case,
+    sharded_iter_window_batches,
 )
+from wi_scraper.models import AggregatedCase, SearchWindow
+from wi_scraper.parquet import ParquetCaseWriter
+from wi_scraper.scraper import FailedUnit
+from wi_scraper.serialization import dump_bytes, dumps, loads
+from wi_scraper.transport import DEFAULT_MAX_CONNECTIONS
 
 
 def _parse_date(value: str) -> date:
@@ -54,48 +80,487 @@ def build_parser() -> argparse.ArgumentParser:
         default=7,
         help="Number of days per filing-date window (default: 7).",
     )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Split windows whose results hit --result-cap and widen sparse ones (up to --span-days).",
+    )
+    parser.add_argument(
+        "--result-cap",
+        type=int,
+        default=DEFAULT_RESULT_CAP,
+        help=f"Row count treated as a truncated response in adaptive mode (default: {DEFAULT_RESULT_CAP}).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Maximum in-flight searches; values above 1 use the asyncio client (default: 1).",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Shard the window x class-code grid across this many worker processes, each "
+        "with its own client; --rps is split between them (default: 1).",
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=None,
+        help="Target requests per second; backs off automatically on 429/503 (default: unlimited).",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=4,
+        help="Requests allowed back to back before --rps pacing applies (default: 4).",
+    )
+    parser.add_argument(
+        "--http2",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Force HTTP/2 on or off (default: on when the h2 package is installed).",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=5,
+        help="Attempts per request on connect errors, timeouts, 429 and 5xx, with capped "
+        "exponential backoff honouring Retry-After (default: 5; 1 disables retries).",
+    )
+    parser.add_argument(
+        "--retry-budget",
+        type=int,
+        default=None,
+        help="Total retries allowed across the whole sweep (default: unlimited).",
+    )
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=1,
+        help="Independently bootstrapped WCCA sessions to spread searches across; expired "
+        "sessions are re-bootstrapped automatically (default: 1).",
+    )
     parser.add_argument(
         "--class-code",
         dest="class_codes",
         action="append",
         help="Limit to specific class code(s). Repeat flag to include multiple.",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for the persistent search-response cache (disabled by default).",
+    )
     parser.add_argument(
         "--output",
         type=Path,
         help="Optional path to write JSON results. Defaults to stdout.",
     )
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson", "sqlite", "parquet"),
+        default="json",
+        help="json builds one document at the end; ndjson streams one case per line "
+        "as each window completes, followed by a {\"meta\": ...} line; sqlite upserts "
+        "each finished window into the --output database; parquet appends finished "
+        "windows to a columnar --output file in row groups (needs pyarrow) (default: json).",
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        help="Checkpoint file; an interrupted run restarted with the same path skips finished searches.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch windows after each class code's last synced date and merge into --output.",
+    )
+    parser.add_argument(
+        "--state-file",
+        type=Path,
+        help="High-water mark file for --incremental (default: <output>.state.json).",
+    )
+    parser.add_argument(
+        "--overlap-days",
+        type=int,
+        default=7,
+        help="Days before the high-water mark to re-check in --incremental mode (default: 7).",
+    )
     return parser
 
 
+BatchCallback = Callable[[SearchWindow, Dict[Tuple[str, int], AggregatedCase]], None]
+
+
+def _run_sweep(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    start: date,
+    end: date,
+    on_batch: BatchCallback,
+    journal: SweepJournal | None = None,
+    client_options: Dict[str, Any],
+    failed: list[FailedUnit],
+) -> None:
+    """Run the sweep, handing each finished window's cases to ``on_batch``.
+
+    ``client_options`` holds the cache, rate limiter, retry settings and (for
+    sequential sweeps) connection pool shared by every client created during
+    this run. Searches that still fail after their end-of-sweep retry are
+    appended to ``failed``; everything else has reached ``on_batch`` by then.
+    """
+    try:
+        _dispatch_sweep(
+            args, class_codes, start=start, end=end, on_batch=on_batch, journal=journal, client_options=client_options
+        )
+    except IncompleteSweepError as exc:
+        failed.extend(exc.failed)
+
+
+def _dispatch_sweep(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    start: date,
+    end: date,
+    on_batch: BatchCallback,
+    journal: SweepJournal | None,
+    client_options: Dict[str, Any],
+) -> None:
+    options = dict(
+        start=start,
+        end=end,
+        class_codes=class_codes,
+        span_days=args.span_days,
+        adaptive=args.adaptive,
+        result_cap=args.result_cap,
+        journal=journal,
+    )
+
+    if args.processes > 1:
+        del options["journal"]
+        worker_options = {key: client_options[key] for key in ("cache", "retry_policy", "sessions")}
+        for window, batch in sharded_iter_window_batches(
+            processes=args.processes,
+            client_options=worker_options,
+            rps=args.rps,
+            burst=args.burst,
+            **options,
+        ):
+            on_batch(window, batch)
+        return
+
+    if args.concurrency > 1:
+        async def _sweep() -> None:
+            # Async connections are bound to the event loop, so each sweep gets its own pool.
+            transport = build_async_transport(
+                http2=args.http2, max_connections=max(DEFAULT_MAX_CONNECTIONS, args.concurrency)
+            )
+            try:
+                async with AsyncWICourtClient(transport=transport, **client_options) as client:
+                    async for window, batch in async_iter_window_batches(
+                        concurrency=args.concurrency, client=client, **options
+                    ):
+                        on_batch(window, batch)
+            finally:
+                await transport.aclose()
+
+        asyncio.run(_sweep())
+        return
+
+    with WICourtClient(**client_options) as client:
+        for window, batch in iter_window_batches(client=client, **options):
+            on_batch(window, batch)
+
+
+def _collect(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    start: date,
+    end: date,
+    journal: SweepJournal | None = None,
+    client_options: Dict[str, Any],
+    failed: list[FailedUnit],
+) -> CompactCaseStore:
+    # Columnar storage keeps multi-year sweeps small; output is identical to a dict.
+    aggregated = CompactCaseStore()
+    _run_sweep(
+        args,
+        class_codes,
+        start=start,
+        end=end,
+        journal=journal,
+        client_options=client_options,
+        failed=failed,
+        on_batch=lambda _, batch: merge_aggregated(aggregated, batch),
+    )
+    return aggregated
+
+
+def _stream_ndjson(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    end: date,
+    journal: SweepJournal | None = None,
+    client_options: Dict[str, Any],
+    failed: list[FailedUnit],
+) -> None:
+    """Write one case per line as each window completes, then a trailing meta record."""
+    written: set[str] = set()
+    with NDJSONSink(args.output) as sink:
+        def _write(_: SearchWindow, batch: Dict[Tuple[str, int], AggregatedCase]) -> None:
+            for item in batch.values():
+                case_no, county_no = item.key()
+                key = f"{county_no}:{case_no}"
+                if key in written:
+                    # Late class-code matches (e.g. requeued searches) for a case already written.
+                    sink.write(
+                        {
+                            "merge": {
+                                "case_no": case_no,
+                                "county_no": county_no,
+                                "class_codes": sorted(item.class_codes),
+                            }
+                        }
+                    )
+                    continue
+                written.add(key)
+                sink.write(serialise_case(item))
+            sink.flush()
+
+        _run_sweep(
+            args,
+            class_codes,
+            start=args.start,
+            end=end,
+            journal=journal,
+            client_options=client_options,
+            failed=failed,
+            on_batch=_write,
+        )
+        sink.write({"meta": _build_meta(args, class_codes, end=end, total_cases=len(written), failed=failed)})
+
+
+def _write_parquet(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    end: date,
+    journal: SweepJournal | None = None,
+    client_options: Dict[str, Any],
+    failed: list[FailedUnit],
+) -> int:
+    """Append each finished window to the ``--output`` Parquet file; returns the rows written."""
+    with ParquetCaseWriter(args.output) as writer:
+        _run_sweep(
+            args,
+            class_codes,
+            start=args.start,
+            end=end,
+            journal=journal,
+            client_options=client_options,
+            failed=failed,
+            on_batch=lambda _, batch: writer.write_batch(batch),
+        )
+        return writer.count
+
+
+def _build_meta(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    end: date,
+    total_cases: int,
+    failed: Sequence[FailedUnit] = (),
+) -> dict:
+    meta = {
+        "start": args.start.isoformat(),
+        "end": end.isoformat(),
+        "span_days": args.span_days,
+        "adaptive": args.adaptive,
+        "incremental": args.incremental,
+        "class_codes": [code.code for code in class_codes],
+        "total_cases": total_cases,
+    }
+    if failed:
+        # The dataset is missing these searches' cases; rerun to fill them in.
+        meta["failed_searches"] = [
+            {"start": window.start.isoformat(), "end": window.end.isoformat(), "class_code": code}
+            for window, code in failed
+        ]
+    return meta
+
+
+def _state_path(args: argparse.Namespace) -> Path:
+    if args.state_file:
+        return args.state_file
+    return args.output.with_name(args.output.name + ".state.json")
+
+
+def _resume_groups(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    end: date,
+    state: SyncState | None,
+) -> list[tuple[date, list[ClassCode]]]:
+    """Group class codes by the date their sweep starts from, skipping those already current."""
+    if state is None:
+        return [(args.start, list(class_codes))]
+    groups: dict[date, list[ClassCode]] = {}
+    for code in class_codes:
+        resume = state.resume_from(code.code, default=args.start, overlap_days=args.overlap_days)
+        groups.setdefault(resume, []).append(code)
+    return [(start, codes) for start, codes in sorted(groups.items()) if start <= end]
+
+
+def _run_incremental(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    end: date,
+    state: SyncState,
+    journal: SweepJournal | None = None,
+    client_options: Dict[str, Any],
+    failed: list[FailedUnit],
+) -> list[dict]:
+    """Sweep only the windows after each class code's high-water mark and merge them into ``--output``."""
+    rows: list[dict] = []
+    if args.output.exists():
+        rows = loads(args.output.read_bytes()).get("cases", [])
+
+    for start, codes in _resume_groups(args, class_codes, end=end, state=state):
+        aggregated = _collect(
+            args, codes, start=start, end=end, journal=journal, client_options=client_options, failed=failed
+        )
+        rows = merge_flattened(rows, flatten_aggregated(aggregated))
+    return rows
+
+
+def _store_sqlite(
+    args: argparse.Namespace,
+    class_codes: Sequence[ClassCode],
+    *,
+    end: date,
+    state: SyncState | None = None,
+    journal: SweepJournal | None = None,
+    client_options: Dict[str, Any],
+    failed: list[FailedUnit],
+) -> int:
+    """Upsert every finished window into the ``--output`` database; returns the stored case count."""
+    with SQLiteCaseStore(args.output) as store:
+        for start, codes in _resume_groups(args, class_codes, end=end, state=state):
+            _run_sweep(
+                args,
+                codes,
+                start=start,
+                end=end,
+                journal=journal,
+                client_options=client_options,
+                failed=failed,
+                on_batch=lambda _, batch: store.write_batch(batch),
+            )
+        return store.count()
+
+
 def main(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    if args.incremental and not args.output:
+        parser.error("--incremental requires --output (the dataset to merge into)")
+    if args.format in ("sqlite", "parquet") and not args.output:
+        parser.error(f"--format {args.format} requires --output")
+    if args.incremental and args.format in ("ndjson", "parquet"):
+        parser.error(f"--incremental merges into existing data and cannot be combined with --format {args.format}")
+    if args.processes > 1 and (args.concurrency > 1 or args.journal or args.retry_budget is not None):
+        parser.error("--processes cannot be combined with --concurrency, --journal or --retry-budget")
 
     class_codes = _resolve_class_codes(args.class_codes or [])
-    aggregated = fetch_case_summaries(
-        start=args.start,
-        end=args.end,
-        class_codes=class_codes,
-        span_days=args.span_days,
-    )
-    rows = flatten_aggregated(aggregated)
-
-    payload = {
-        "meta": {
-            "start": args.start.isoformat(),
-            "end": (args.end or date.today()).isoformat(),
-            "span_days": args.span_days,
-            "class_codes": [code.code for code in class_codes],
-            "total_cases": len(rows),
-        },
-        "cases": rows,
+    end = args.end or date.today()
+    state = SyncState(_state_path(args)) if args.incremental else None
+    journal = SweepJournal(args.journal) if args.journal else None
+    client_options: Dict[str, Any] = {
+        "cache": SearchCache(args.cache_dir) if args.cache_dir else None,
+        "rate_limiter": build_rate_limiter(args.rps, args.burst),
+        "retry_policy": RetryPolicy(max_attempts=args.max_attempts) if args.max_attempts > 1 else None,
+        "retry_budget": RetryBudget(args.retry_budget) if args.retry_budget is not None else None,
+        "sessions": args.sessions,
     }
+    failed: list[FailedUnit] = []
+    if args.concurrency == 1:
+        # One connection pool for every sweep in this run (incremental mode runs several).
+        client_options["transport"] = build_transport(http2=args.http2)
+    try:
+        if args.format == "ndjson":
+            _stream_ndjson(args, class_codes, end=end, journal=journal, client_options=client_options, failed=failed)
+            rows = None
+        elif args.format == "sqlite":
+            total = _store_sqlite(
+                args, class_codes, end=end, state=state, journal=journal, client_options=client_options, failed=failed
+            )
+            print(f"{args.output} now holds {total} case(s)")
+            rows = None
+        elif args.format == "parquet":
+            total = _write_parquet(
+                args, class_codes, end=end, journal=journal, client_options=client_options, failed=failed
+            )
+            print(f"Wrote {total} case row(s) to {args.output}")
+            rows = None
+        elif state is not None:
+            rows = _run_incremental(
+                args, class_codes, end=end, state=state, journal=journal, client_options=client_options, failed=failed
+            )
+        else:
+            aggregated = _collect(
+                args,
+                class_codes,
+                start=args.start,
+                end=end,
+                journal=journal,
+                client_options=client_options,
+                failed=failed,
+            )
+            rows = flatten_aggregated(aggregated)
+    finally:
+        if journal is not None:
+            journal.close()
+        if "transport" in client_options:
+            client_options["transport"].close()
+
+    if rows is not None:
+        payload = {
+            "meta": _build_meta(args, class_codes, end=end, total_cases=len(rows), failed=failed),
+            "cases": rows,
+        }
+        if args.output:
+            args.output.write_bytes(dump_bytes(payload, indent=True))
+        else:
+            print(dumps(payload, indent=True))
+
+    # Only advance the high-water marks once the merged dataset (or database) is on disk, and
+    # never for a class code with a failed search: the next run has to cover that window again.
+    incomplete = {code for _, code in failed}
+    if state is not None:
+        for code in class_codes:
+            if code.code not in incomplete:
+                state.mark_synced(code.code, end)
+        state.save()
+
+    if failed:
+        # Keep the checkpoint so a rerun replays the finished searches and only repeats the failed ones.
+        print(f"{len(failed)} search(es) still failed after their retry; the output is incomplete:", file=sys.stderr)
+        for window, code in failed:
+            print(f"  {window.start}..{window.end} class {code}", file=sys.stderr)
+        return 1
 
-    if args.output:
-        args.output.write_text(json.dumps(payload, indent=2))
-    else:
-        print(json.dumps(payload, indent=2))
+    # The sweep finished, so the checkpoint is no longer needed.
+    if args.journal:
+        args.journal.unlink(missing_ok=True)
 
     return 0
 
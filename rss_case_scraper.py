@@ -4,24 +4,60 @@ from __future__ import annotations
 
 import argparse
 import json
+import queue
 import random
+import sys
+import threading
 import time
-from dataclasses import asdict, dataclass
-from datetime import date, datetime
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
+from typing import Dict, Iterator, List, Optional, Sequence
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 from wi_scraper import (
     DEFAULT_CLASS_CODES,
     ClassCode,
+    CSVSink,
+    IncompleteSweepError,
+    NDJSONSink,
+    RateLimiter,
+    WICourtClient,
+    build_rate_limiter,
     fetch_case_summaries,
     flatten_aggregated,
 )
+from wi_scraper.browser import (
+    DEFAULT_DETAIL_TIMEOUT,
+    LIGHT_VIEWPORT,
+    DetailCapture,
+    ResourceBlocker,
+    build_resource_blocker,
+    captcha_present,
+    parties_rendered,
+)
+from wi_scraper.clearance import BrowserClearances, ClearanceBroker
+from wi_scraper.detailcache import DEFAULT_MAX_AGE, DetailCache
+from wi_scraper.pagepool import PagePool, harvest_cookies, solve_clearance
+from wi_scraper.parquet import DETAIL_FLUSH_INTERVAL, ParquetRowWriter, party_schema
+from wi_scraper.scraper import FailedUnit
+from wi_scraper.serialization import dump_bytes, dumps
+from wi_scraper.workqueue import DEFAULT_MAX_ATTEMPTS, DetailJob, DetailWorkQueue
 
 BASE_URL = "https://wcca.wicourts.gov"
 DEFAULT_PROFILE = ".wcca_profile"
+CAPTCHA_BYPASS_SELECTOR = 'span.link:has-text("Click here")'
+# Clearances tried per case before it is given up as stuck behind a CAPTCHA.
+MAX_CLEARANCES_PER_CASE = 3
+LAUNCH_OPTIONS = {
+    "args": [
+        "--disable-blink-features=AutomationControlled",
+        "--disable-extensions",
+        "--no-first-run",
+        "--no-default-browser-check",
+    ],
+}
 
 
 @dataclass
@@ -38,6 +74,9 @@ class PartyRecord:
     role_status: Optional[str]
 
 
+PARTY_FIELDS = [field.name for field in fields(PartyRecord)]
+
+
 @dataclass
 class CaseDetailEnvelope:
     case: Dict[str, object]
@@ -69,32 +108,14 @@ def _get_case_detail_url(case_no: str, county_no: int, index: Optional[int] = No
     return f"{BASE_URL}/caseDetail.html?caseNo={case_no}&countyNo={county_no}"
 
 
-def _unwrap_case_detail(obj: object) -> Optional[Dict[str, object]]:
-    if isinstance(obj, dict):
-        if "caseDetail" in obj and isinstance(obj["caseDetail"], dict):
-            return _unwrap_case_detail(obj["caseDetail"])
-        if "parties" in obj or "records" in obj:
-            return obj
-        for key in ("result", "detail", "data"):
-            if key in obj:
-                detail = _unwrap_case_detail(obj[key])
-                if detail:
-                    return detail
-    return None
-
-
-def _extract_case_data_from_html(page) -> Dict[str, object]:
+def _extract_case_data_from_html(page, debug_dir: Optional[Path] = None) -> Dict[str, object]:
     """Extract case detail data from the HTML page as fallback."""
     data = {
         "case": {},
         "parties": [],
     }
-    
-    # Always dump HTML for debugging
-    html = page.content()
-    with open('debug_detail.html', 'w', encoding='utf-8') as f:
-        f.write(html)
-    print("Dumped page HTML to debug_detail.html for inspection.")
+
+    _dump_html(page, debug_dir, "detail_fallback")
     
     # Check page title or main content to see if loaded
     title = page.title()
@@ -233,25 +254,30 @@ def _build_party_records(case_meta: Dict[str, object], detail: Dict[str, object]
     return records
 
 
-def _extract_case_detail(page, case_meta: Dict[str, object]) -> Dict[str, object]:
-    storage = page.evaluate(
-        "() => {const out={}; for (let i=0;i<sessionStorage.length;i++){const key=sessionStorage.key(i); out[key]=sessionStorage.getItem(key);} return out;}"
-    )
-    for raw in storage.values():
-        if not raw:
-            continue
-        try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-        detail = _unwrap_case_detail(payload)
-        if detail:
-            parties = _build_party_records(case_meta, detail)
-            return {"detail": detail, "parties": parties}
-    
+def _dump_html(page, debug_dir: Optional[Path], name: str) -> None:
+    if debug_dir is None:
+        return
+    try:
+        html = page.content()
+    except Exception:  # page crashed or closed
+        return
+    debug_dir.mkdir(parents=True, exist_ok=True)
+    target = debug_dir / f"{name}.html"
+    target.write_text(html, encoding="utf-8")
+    print(f"Dumped page HTML to {target}")
+
+
+def _extract_case_detail(
+    page, case_meta: Dict[str, object], capture: DetailCapture, debug_dir: Optional[Path] = None
+) -> Dict[str, object]:
+    detail = capture.take(case_no=case_meta.get("case_no"), county_no=case_meta.get("county_no"))
+    if detail:
+        parties = _build_party_records(case_meta, detail)
+        return {"detail": detail, "parties": parties}
+
     # Fallback to HTML parsing
-    print("JSON not found in sessionStorage, falling back to HTML parsing.")
-    html_data = _extract_case_data_from_html(page)
+    print("Case detail response not captured, falling back to HTML parsing.")
+    html_data = _extract_case_data_from_html(page, debug_dir)
     
     # Build parties from HTML data
     parties_data = html_data.get("parties", [])
@@ -282,14 +308,220 @@ def _extract_case_detail(page, case_meta: Dict[str, object]) -> Dict[str, object
     return {"detail": detail, "parties": parties}
 
 
-def fetch_case_details(
+def _remaining(deadline: float, *, cap: Optional[float] = None) -> float:
+    remaining = max(0.0, deadline - time.monotonic())
+    return min(remaining, cap) if cap is not None else remaining
+
+
+def _timeout_ms(deadline: float, *, cap: Optional[float] = None) -> float:
+    # Playwright treats a timeout of 0 as "wait forever".
+    return max(1.0, _remaining(deadline, cap=cap) * 1000)
+
+
+def _clear_captcha(page, capture: DetailCapture, case: Dict[str, object], deadline: float) -> Optional[Dict[str, object]]:
+    """Click through the CAPTCHA interstitial and wait for the detail until ``deadline``."""
+    try:
+        page.locator(CAPTCHA_BYPASS_SELECTOR).first.click(timeout=_timeout_ms(deadline, cap=10.0))
+        print("Clicked the 'Click here' CAPTCHA bypass link.")
+    except PlaywrightTimeoutError:
+        print("No CAPTCHA bypass link found.")
+    return _wait_for_detail(page, capture, case, deadline)
+
+
+def _wait_for_detail(page, capture: DetailCapture, case: Dict[str, object], deadline: float) -> Optional[Dict[str, object]]:
+    return capture.wait(
+        case_no=case["case_no"],
+        county_no=case["county_no"],
+        timeout=_remaining(deadline),
+        abort=lambda: parties_rendered(page),
+    )
+
+
+def _fetch_case_detail(
+    page,
+    case: Dict[str, object],
+    *,
+    rate_limiter: Optional[RateLimiter] = None,
+    case_timeout: float = DEFAULT_DETAIL_TIMEOUT,
+    interactive: bool = False,
+    click_through: bool = True,
+    debug_dir: Optional[Path] = None,
+) -> Optional[CaseDetailEnvelope]:
+    """Load one case detail page; ``None`` if it stayed behind a CAPTCHA.
+
+    The case is ready as soon as its detail XHR is captured, or the parties
+    section renders without one (then the DOM is parsed). Everything, from
+    navigation to a CAPTCHA click-through, shares one ``case_timeout``.
+    Without ``click_through`` a CAPTCHA page is returned as ``None`` at once.
+    """
+    case_no = case["case_no"]
+    county_no = case["county_no"]
+    url = _get_case_detail_url(case_no, county_no, case.get("_result_index"))
+    deadline = time.monotonic() + case_timeout
+
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    # Listen before navigating so the detail XHR cannot slip past.
+    capture = DetailCapture(page)
+    try:
+        page.goto(url, wait_until="domcontentloaded", timeout=_timeout_ms(deadline))
+        detail = capture.wait(
+            case_no=case_no,
+            county_no=county_no,
+            timeout=_remaining(deadline),
+            abort=lambda: captcha_present(page) or parties_rendered(page),
+        )
+        captcha_detected = detail is None and captcha_present(page)
+        if captcha_detected:
+            print("CAPTCHA page detected.")
+            if rate_limiter is not None:
+                rate_limiter.penalize()
+            if click_through:
+                detail = _clear_captcha(page, capture, case, deadline)
+            if detail is None and captcha_present(page) and interactive:
+                input("Solve CAPTCHA manually in browser, then press Enter to continue...")
+                detail = _wait_for_detail(page, capture, case, time.monotonic() + case_timeout)
+
+        if detail is not None:
+            if rate_limiter is not None and not captcha_detected:
+                rate_limiter.reward()
+            return CaseDetailEnvelope(case=case, detail=detail, parties=_build_party_records(case, detail))
+
+        if captcha_present(page):
+            print("Still on CAPTCHA page after attempts. Skipping case.")
+            _dump_html(page, debug_dir, f"{case_no}_{county_no}_captcha")
+            return None
+
+        detail_payload = _extract_case_detail(page, case, capture, debug_dir)
+        if rate_limiter is not None and not captcha_detected:
+            rate_limiter.reward()
+        return CaseDetailEnvelope(case=case, detail=detail_payload["detail"], parties=detail_payload["parties"])
+    finally:
+        capture.detach()
+
+
+def _click_captcha_bypass(page) -> None:
+    try:
+        page.locator(CAPTCHA_BYPASS_SELECTOR).first.click(timeout=10000)
+    except PlaywrightTimeoutError:
+        print("No CAPTCHA bypass link found; solve the CAPTCHA in the browser window.")
+
+
+def build_clearance_broker(probe: Dict[str, object], *, headless: bool = False) -> ClearanceBroker:
+    """Broker whose solves open ``probe``'s detail page in a fresh browser and click through the CAPTCHA."""
+    url = _get_case_detail_url(probe["case_no"], probe["county_no"], probe.get("_result_index"))
+    return ClearanceBroker(
+        lambda: solve_clearance(url, headless=headless, prepare=_click_captcha_bypass, launch_options=LAUNCH_OPTIONS)
+    )
+
+
+def _serialise_envelope(envelope: CaseDetailEnvelope) -> Dict[str, object]:
+    return {
+        "case": envelope.case,
+        "detail": envelope.detail,
+        "parties": [asdict(p) for p in envelope.parties],
+    }
+
+
+def _envelope_from_result(result: Dict[str, object]) -> CaseDetailEnvelope:
+    return CaseDetailEnvelope(
+        case=result["case"],
+        detail=result["detail"],
+        parties=[PartyRecord(**party) for party in result["parties"]],
+    )
+
+
+def _drain_work_queue(pool: PagePool, load, work_queue: DetailWorkQueue) -> Iterator[CaseDetailEnvelope]:
+    """Let every worker claim cases from ``work_queue``, yielding each one as soon as it is stored.
+
+    The drain runs on its own thread so the caller can write results while it
+    goes on. Afterwards the queue's other finished cases (earlier runs, other
+    processes) follow.
+    """
+    finished: "queue.Queue[Optional[CaseDetailEnvelope]]" = queue.Queue()
+    stopping = threading.Event()
+    outcome: Dict[str, object] = {}
+
+    def claim() -> Optional[DetailJob]:
+        return None if stopping.is_set() else work_queue.claim_one()
+
+    def run(page, job: DetailJob) -> None:
+        envelope = load(page, job.case)
+        if envelope is None:
+            work_queue.fail(job, "still behind a CAPTCHA")
+        elif not work_queue.complete(job, _serialise_envelope(envelope)):
+            print(f"Dropped result for {job.case_no}: its claim expired or was released.")
+        else:
+            finished.put(envelope)
+
+    def failed(job: DetailJob, exc: BaseException) -> None:
+        work_queue.fail(job, f"{type(exc).__name__}: {exc}")
+
+    def drain() -> None:
+        try:
+            outcome["processed"] = pool.drain(run, claim, on_error=failed)
+        except BaseException as exc:
+            outcome["error"] = exc
+        finally:
+            finished.put(None)
+
+    streamed = set()
+    settled = False
+    thread = threading.Thread(target=drain, name="queue-drain", daemon=True)
+    thread.start()
+    try:
+        for envelope in iter(finished.get, None):
+            streamed.add((envelope.case["case_no"], int(envelope.case["county_no"])))
+            yield envelope
+        thread.join()
+        settled = True
+    finally:
+        if not settled:
+            # Ctrl-C (or the caller stopped reading): claim nothing more and hand back what is in flight.
+            stopping.set()
+            released = work_queue.release()
+            print(f"\nInterrupted; returned {released} in-flight case(s) to the queue at {work_queue.path}.")
+    if "error" in outcome:
+        raise outcome["error"]
+    counts = work_queue.counts()
+    print(
+        f"Processed {outcome['processed']} case(s) from {work_queue.path}: {counts['done']} done, "
+        f"{counts['failed']} failed, {counts['pending']} pending, {counts['in_flight']} in flight elsewhere."
+    )
+    for case, attempts, error in work_queue.failures():
+        print(f"  failed {case['case_no']} (county {case['county_no']}) after {attempts} attempt(s): {error}")
+    for case, result in work_queue.results():
+        if (case["case_no"], int(case["county_no"])) not in streamed:
+            yield _envelope_from_result(result)
+
+
+def iter_case_details(
     cases: List[Dict[str, object]],
     *,
     headless: bool = False,
     profile: Path,
-) -> List[CaseDetailEnvelope]:
-    envelopes: List[CaseDetailEnvelope] = []
-
+    rate_limiter: Optional[RateLimiter] = None,
+    case_timeout: float = DEFAULT_DETAIL_TIMEOUT,
+    debug_dir: Optional[Path] = None,
+    workers: int = 1,
+    blocker: Optional[ResourceBlocker] = None,
+    work_queue: Optional[DetailWorkQueue] = None,
+    detail_cache: Optional[DetailCache] = None,
+    clearances: Optional[BrowserClearances] = None,
+) -> Iterator[CaseDetailEnvelope]:
+    """Load details for ``cases``, yielding each envelope as soon as it is ready.
+
+    Cases whose summary still matches their ``detail_cache`` entry are
+    yielded first, straight from the cache; only the rest are loaded, in
+    input order, and no browser starts when nothing is left. With a ``work_queue`` the remaining
+    cases are enqueued (known ones are skipped), workers claim pending cases
+    one at a time and every outcome is stored the moment it is known. Each
+    case this run finishes is yielded as it is stored (in completion order),
+    then every other finished case in the queue, including those from
+    earlier runs or other processes. With ``clearances`` every worker's
+    context is seeded from the broker, starting with the profile's session,
+    and a CAPTCHA wall revokes the clearance instead of clicking through it.
+    """
     user_data_dir = Path(profile)
     if not user_data_dir.exists():
         raise RuntimeError(
@@ -297,116 +529,124 @@ def fetch_case_details(
         )
     print(f"Using Chromium profile: {user_data_dir}")
     print("Note: Close all Chrome instances before running to avoid lock errors.")
+    if workers > 1:
+        print(f"Loading details with {workers} browser workers sharing the profile's cookies.")
+
+    def setup_context(context) -> None:
+        if blocker is not None:
+            blocker.install(context)
+        if clearances is not None:
+            clearances.install(context)
+
+    pool = PagePool(
+        workers,
+        profile=user_data_dir,
+        # With shared clearances the broker's cookies replace the profile's.
+        cookies=[] if clearances is not None else None,
+        headless=headless,
+        launch_options=LAUNCH_OPTIONS,
+        context_options={
+            "viewport": LIGHT_VIEWPORT if blocker is not None else {"width": 1920, "height": 1080},
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        },
+        setup_context=setup_context if blocker is not None or clearances is not None else None,
+    )
+    # Several workers cannot share one terminal prompt, so only a lone visible browser asks for help.
+    interactive = not headless and workers == 1 and clearances is None
+
+    def fetch(page, case: Dict[str, object]) -> Optional[CaseDetailEnvelope]:
+        if clearances is None:
+            return _fetch_case_detail(
+                page,
+                case,
+                rate_limiter=rate_limiter,
+                case_timeout=case_timeout,
+                interactive=interactive,
+                debug_dir=debug_dir,
+            )
+        for _ in range(MAX_CLEARANCES_PER_CASE):
+            clearances.sync(page.context)
+            envelope = _fetch_case_detail(
+                page,
+                case,
+                rate_limiter=rate_limiter,
+                case_timeout=case_timeout,
+                click_through=False,
+                debug_dir=debug_dir,
+            )
+            if envelope is not None:
+                clearances.record_view(page.context)
+                return envelope
+            print("Switching to the next CAPTCHA clearance.")
+            clearances.revoke(page.context)
+        return None
+
+    def load(page, case: Dict[str, object]) -> Optional[CaseDetailEnvelope]:
+        case_no = case["case_no"]
+        print(f"Fetching case detail for {case_no} (county {case['county_no']}, index {case['_result_index']})")
+        try:
+            envelope = fetch(page, case)
+        except Exception as e:
+            print(f"Error fetching detail for {case_no}: {e}")
+            _dump_html(page, debug_dir, f"{case_no}_{case['county_no']}_error")
+            raise
+        # DOM-fallback details are partial; leave them out so the next run tries for the JSON again.
+        if detail_cache is not None and envelope is not None and envelope.detail.get("source") != "html_fallback":
+            detail_cache.put(case, envelope.detail)
+        return envelope
+
+    def failed(case: Dict[str, object], exc: BaseException) -> CaseDetailEnvelope:
+        return CaseDetailEnvelope(case=case, detail={}, parties=[])
+
+    for idx, case in enumerate(cases):
+        case.setdefault("_result_index", idx)
+    # Settle cache hits here, so only the misses reach a browser (and none starts if everything is cached).
+    cached = set()
+    if detail_cache is not None:
+        hits, cases = detail_cache.partition(cases)
+        for case, detail in hits:
+            cached.add((case["case_no"], int(case["county_no"])))
+            yield CaseDetailEnvelope(case=case, detail=detail, parties=_build_party_records(case, detail))
+        print(f"{len(hits)} detail(s) unchanged since they were cached in {detail_cache.path}; loading {len(cases)}.")
+    if work_queue is not None:
+        added = work_queue.enqueue(cases)
+        if cases:
+            print(f"Queued {added} new case(s) of {len(cases)} in {work_queue.path}")
+        counts = work_queue.counts()
+        if counts["pending"] or counts["in_flight"]:
+            if clearances is not None:
+                clearances.broker.add(harvest_cookies(user_data_dir, **LAUNCH_OPTIONS))
+            drained = _drain_work_queue(pool, load, work_queue)
+        else:
+            drained = (_envelope_from_result(result) for _, result in work_queue.results())
+        # Cases done in an earlier run and served from the cache this time were yielded above.
+        for envelope in drained:
+            if (envelope.case["case_no"], int(envelope.case["county_no"])) not in cached:
+                yield envelope
+        return
+    if not cases:
+        return
+    if clearances is not None:
+        clearances.broker.add(harvest_cookies(user_data_dir, **LAUNCH_OPTIONS))
+    for envelope in pool.imap(load, cases, on_error=failed):
+        if envelope is not None:
+            yield envelope
 
-    with sync_playwright() as p:
-        context = p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=headless,
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--disable-extensions",
-                "--no-first-run",
-                "--no-default-browser-check",
-            ],
-        )
-
-        for idx, case in enumerate(cases):
-            case_no = case["case_no"]
-            county_no = case["county_no"]
-            result_index = case.get("_result_index", idx)
-            print(f"Fetching case detail for {case_no} (county {county_no}, index {result_index})")
-
-            url = _get_case_detail_url(case_no, county_no, result_index)
-
-            try:
-                page = context.new_page()
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                page.wait_for_timeout(5000)  # Increased wait for dynamic content
-
-                # Detect and handle CAPTCHA
-                captcha_detected = False
-                try:
-                    page.wait_for_selector('text=/Please complete the CAPTCHA/i', timeout=10000)
-                    captcha_detected = True
-                    print("CAPTCHA page detected.")
-                except:
-                    pass
-
-                if captcha_detected:
-                    click_link = page.locator('span.link:has-text("Click here")')
-                    try:
-                        page.wait_for_selector('span.link:has-text("Click here")', timeout=10000)
-                        print("Found 'Click here' CAPTCHA bypass link. Clicking it...")
-                        click_link.first.click()
-                        # Wait for case details to load instead of networkidle
-                        page.wait_for_selector('#parties, h4:has-text("Case summary")', state='visible', timeout=60000)
-                        page.wait_for_timeout(3000)
-                        print("Case details loaded after CAPTCHA bypass.")
-                    except Exception as e:
-                        print(f"Error waiting for case details after CAPTCHA click: {e}")
-                        # Fallback: wait a bit and check
-                        page.wait_for_timeout(10000)
-                        if page.locator('text=/Please complete the CAPTCHA/i').count() > 0:
-                            print("CAPTCHA still present; manual intervention needed.")
-                            input("Solve CAPTCHA manually in browser, then press Enter to continue...")
-
-                # Additional wait for case details to load
-                page.wait_for_timeout(3000)
-                
-                # Removed duplicate CAPTCHA check as it's handled above
-                
-                # Final wait for case details to load
-                page.wait_for_timeout(5000)
-
-                # Verify if still on CAPTCHA page
-                if page.locator('text=/Please complete the CAPTCHA/i').count() > 0:
-                    print("Still on CAPTCHA page after attempts. Skipping case.")
-                    page.close()
-                    continue
-                
-                # Dump HTML for debugging
-                html = page.content()
-                with open('debug_detail_final.html', 'w', encoding='utf-8') as f:
-                    f.write(html)
-                print("Dumped final page HTML to debug_detail_final.html")
-                
-                # Verify content loaded
-                body_text = page.locator("body").inner_text().lower()
-                if any(word in body_text for word in ["case", "party", "court", "docket"]):
-                    print("Case content detected in page.")
-                else:
-                    print("No case content detected; page may not have loaded properly.")
-                    input("Check the browser window. If the case details are visible, press Enter. Otherwise, resolve any issues and press Enter.")
-
-                detail_payload = _extract_case_detail(page, case)
-                envelopes.append(
-                    CaseDetailEnvelope(
-                        case=case,
-                        detail=detail_payload["detail"],
-                        parties=detail_payload["parties"],
-                    )
-                )
 
-                page.close()
-                time.sleep(random.uniform(1.5, 3.0))
+def fetch_case_details(cases: List[Dict[str, object]], **kwargs) -> List[CaseDetailEnvelope]:
+    """Collect :func:`iter_case_details` into a list."""
+    return list(iter_case_details(cases, **kwargs))
 
-            except Exception as e:
-                print(f"Error fetching detail for {case_no}: {e}")
-                envelopes.append(CaseDetailEnvelope(case=case, detail={}, parties=[]))
-                if 'page' in locals():
-                    try:
-                        page.close()
-                    except Exception:
-                        pass
-                continue
 
-        try:
-            context.close()
-        except Exception as close_err:
-            print(f"Error closing context: {close_err}")
-    return envelopes
+def _party_row(case: Dict[str, object], party: PartyRecord) -> Dict[str, object]:
+    row = asdict(party)
+    row.update({
+        "case_no": case.get("case_no"),
+        "county_no": case.get("county_no"),
+        "county_name": case.get("county_name"),
+        "caption": case.get("caption"),
+    })
+    return row
 
 
 def load_cases_from_json(json_file: Path) -> List[Dict[str, object]]:
@@ -447,7 +687,13 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--input-json", type=Path)
     parser.add_argument("--random-sample", type=int)
     parser.add_argument("--output", type=Path)
-    parser.add_argument("--parties-csv", type=Path)
+    parser.add_argument(
+        "--ndjson",
+        type=Path,
+        help="Append each case's envelope to this NDJSON file as soon as it is loaded",
+    )
+    parser.add_argument("--parties-csv", type=Path, help="Write party rows to a CSV file as each case is loaded")
+    parser.add_argument("--parties-parquet", type=Path, help="Write party rows to a Parquet file (needs pyarrow)")
     parser.add_argument("--headless", action="store_true")
     parser.add_argument(
         "--profile",
@@ -455,26 +701,125 @@ def build_parser() -> argparse.ArgumentParser:
         default=Path(DEFAULT_PROFILE),
         help="Playwright user-data dir to reuse (default: .wcca_profile created via cookie_helper.py)",
     )
+    parser.add_argument("--rps", type=float, default=0.5, help="Target case loads/searches per second (default: 0.5)")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed back to back before pacing (default: 1)")
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=1.0,
+        help="Extra random politeness delay of up to this many seconds per page load, on top of --rps (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--detail-timeout",
+        type=float,
+        default=DEFAULT_DETAIL_TIMEOUT,
+        help="Deadline per case, from navigation to captured detail, CAPTCHA click-through included (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Browser workers loading details in parallel, each with its own page (default: 1)",
+    )
+    parser.add_argument(
+        "--light",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Skip images, fonts, stylesheets and analytics on detail pages and use a small viewport (default: on)",
+    )
+    parser.add_argument(
+        "--block-host",
+        dest="block_hosts",
+        action="append",
+        default=[],
+        metavar="HOST",
+        help="Extra host to block in light mode (repeatable)",
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        metavar="DB",
+        help="SQLite work queue tracking every case; reruns resume it and several processes can drain it together",
+    )
+    parser.add_argument(
+        "--drain-only",
+        action="store_true",
+        help="Skip the case search and only work off cases already in --queue",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Give cases parked as failed in --queue a fresh set of attempts",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help="Attempts per case before --queue parks it as failed (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--detail-cache",
+        type=Path,
+        metavar="DB",
+        help="SQLite cache of fetched details; cases whose summary row is unchanged are not loaded again",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE.days,
+        metavar="DAYS",
+        help="Reload cached details older than this even if the summary is unchanged (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--debug-html",
+        type=Path,
+        metavar="DIR",
+        help="Dump page HTML into DIR for cases that fail, stay behind a CAPTCHA or need the DOM fallback",
+    )
+    parser.add_argument(
+        "--shared-clearance",
+        action="store_true",
+        help="Share CAPTCHA clearances across workers through a broker and switch to a fresh one on a CAPTCHA wall",
+    )
     return parser
 
 
 def main(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if (args.drain_only or args.retry_failed) and args.queue is None:
+        parser.error("--drain-only and --retry-failed need --queue")
 
-    if args.input_json:
+    rate_limiter = build_rate_limiter(args.rps, args.burst, jitter=args.jitter)
+
+    failed: List[FailedUnit] = []
+    if args.drain_only:
+        cases = []
+    elif args.input_json:
         cases = load_cases_from_json(args.input_json)
         if args.random_sample:
             cases = select_random_cases(cases, args.random_sample)
             print(f"Selected {len(cases)} random cases for testing")
     else:
         class_codes = _resolve_class_codes(args.class_codes or [])
-        aggregated = fetch_case_summaries(
-            start=args.start,
-            end=args.end,
-            class_codes=class_codes,
-            span_days=args.span_days,
-        )
+        with WICourtClient(rate_limiter=rate_limiter) as client:
+            try:
+                aggregated = fetch_case_summaries(
+                    start=args.start,
+                    end=args.end,
+                    class_codes=class_codes,
+                    span_days=args.span_days,
+                    client=client,
+                )
+            except IncompleteSweepError as exc:
+                # Carry on with the cases the other searches found; the exit status reports the gap.
+                aggregated = exc.partial
+                failed = exc.failed
+                print(f"{len(failed)} search(es) still failed after their retry; the output is incomplete:", file=sys.stderr)
+                for window, code in failed:
+                    print(f"  {window.start}..{window.end} class {code}", file=sys.stderr)
         cases = flatten_aggregated(aggregated)
         for idx, case in enumerate(cases):
             case.setdefault("_result_index", idx)
@@ -484,55 +829,93 @@ def main(argv: Sequence[str] | None = None) -> int:
     if args.limit is not None:
         cases = cases[: args.limit]
 
-    if not cases:
+    if not cases and not args.drain_only:
         print("No cases matched the requested window.")
-        return 0
-
-    envelopes = fetch_case_details(cases, headless=args.headless, profile=args.profile)
-
-    if not envelopes:
+        return 1 if failed else 0
+
+    work_queue = None
+    if args.queue is not None:
+        work_queue = DetailWorkQueue(args.queue, max_attempts=args.max_attempts)
+        if args.retry_failed:
+            print(f"Retrying {work_queue.retry_failed()} failed case(s).")
+    broker = None
+    if args.shared_clearance:
+        probe = cases[0] if cases else work_queue.peek() if work_queue is not None else None
+        if probe is not None:
+            broker = build_clearance_broker(probe, headless=args.headless)
+    detail_cache = None
+    if args.detail_cache is not None:
+        detail_cache = DetailCache(args.detail_cache, max_age=timedelta(days=args.cache_max_age))
+    # A case takes seconds to load, so flushing NDJSON/CSV after every one costs nothing and survives a
+    # crash. Parquet only becomes readable once closed (see ParquetRowWriter).
+    envelope_sink = NDJSONSink(args.ndjson, flush_every=1) if args.ndjson else None
+    party_sink = CSVSink(args.parties_csv, fieldnames=PARTY_FIELDS, flush_every=1) if args.parties_csv else None
+    parties_parquet = (
+        ParquetRowWriter(args.parties_parquet, party_schema(), flush_interval=DETAIL_FLUSH_INTERVAL)
+        if args.parties_parquet
+        else None
+    )
+    # The indented JSON array needs every envelope at once; with only --ndjson memory stays flat.
+    collected: Optional[List[Dict[str, object]]] = [] if args.output or envelope_sink is None else None
+    written = 0
+    try:
+        for envelope in iter_case_details(
+            cases,
+            headless=args.headless,
+            profile=args.profile,
+            rate_limiter=rate_limiter,
+            case_timeout=args.detail_timeout,
+            debug_dir=args.debug_html,
+            workers=args.workers,
+            blocker=build_resource_blocker(args.light, extra_hosts=tuple(args.block_hosts)),
+            work_queue=work_queue,
+            detail_cache=detail_cache,
+            clearances=BrowserClearances(broker) if broker is not None else None,
+        ):
+            written += 1
+            record = _serialise_envelope(envelope)
+            if envelope_sink is not None:
+                envelope_sink.write(record)
+            if collected is not None:
+                collected.append(record)
+            if party_sink is not None or parties_parquet is not None:
+                rows = [_party_row(envelope.case, party) for party in envelope.parties]
+                if party_sink is not None:
+                    party_sink.write_many(rows)
+                if parties_parquet is not None:
+                    parties_parquet.write_many(rows)
+    finally:
+        for sink in (envelope_sink, party_sink, parties_parquet):
+            if sink is not None:
+                sink.close()
+        if work_queue is not None:
+            work_queue.close()
+        if detail_cache is not None:
+            detail_cache.close()
+        if broker is not None:
+            broker.close()
+            stats = broker.stats()
+            print(f"{stats['views']} detail(s) from {stats['solves']} CAPTCHA solve(s)")
+
+    if not written:
         print("No detail records captured.")
         return 1
 
-    serialisable = [
-        {
-            "case": env.case,
-            "detail": env.detail,
-            "parties": [asdict(p) for p in env.parties],
-        }
-        for env in envelopes
-    ]
-
-    if args.output:
-        args.output.write_text(json.dumps(serialisable, indent=2, default=str), encoding='utf-8')
-        print(f"Wrote {len(serialisable)} record(s) to {args.output}")
-    else:
-        print(json.dumps(serialisable, indent=2, default=str))
-
-    if args.parties_csv and envelopes:
-        import csv
-
-        all_parties = []
-        for env in envelopes:
-            for party in env.parties:
-                party_dict = asdict(party)
-                party_dict.update({
-                    "case_no": env.case.get("case_no"),
-                    "county_no": env.case.get("county_no"),
-                    "county_name": env.case.get("county_name"),
-                    "caption": env.case.get("caption"),
-                })
-                all_parties.append(party_dict)
-
-        if all_parties:
-            with args.parties_csv.open("w", newline="", encoding="utf-8") as handle:
-                fieldnames = all_parties[0].keys()
-                writer = csv.DictWriter(handle, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(all_parties)
-            print(f"Wrote {len(all_parties)} party rows to {args.parties_csv}")
-
-    return 0
+    if envelope_sink is not None:
+        print(f"Streamed {envelope_sink.count} record(s) to {args.ndjson}")
+    if collected is not None:
+        if args.output:
+            args.output.write_bytes(dump_bytes(collected, indent=True))
+            print(f"Wrote {len(collected)} record(s) to {args.output}")
+        else:
+            print(dumps(collected, indent=True))
+    if parties_parquet is not None:
+        print(f"Wrote {parties_parquet.count} party rows to {args.parties_parquet}")
+    if party_sink is not None:
+        print(f"Wrote {party_sink.count} party rows to {args.parties_csv}")
+
+    # Searches that failed were listed right after the sweep.
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,6 @@
+"""Make ``wi_scraper`` importable when pytest runs from a checkout."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,86 @@
+from datetime import date
+
+import pytest
+
+from wi_scraper.adaptive import AdaptiveWindowPlanner
+from wi_scraper.models import SearchWindow
+
+
+def _drain(planner, counts):
+    """Run the planner to completion; ``counts`` maps a window to its row count (default 0)."""
+    kept = []
+    while True:
+        window = planner.next_window()
+        if window is None:
+            return kept
+        if planner.record(window, counts.get(window, 0)):
+            kept.append(window)
+
+
+def test_saturated_window_is_split_into_halves():
+    planner = AdaptiveWindowPlanner(result_cap=100, max_span_days=7)
+    week = SearchWindow(date(2024, 1, 1), date(2024, 1, 7))
+    planner.begin(week)
+
+    assert planner.next_window() == week
+    assert planner.record(week, 100) is False
+    assert planner.next_window() == SearchWindow(date(2024, 1, 1), date(2024, 1, 4))
+    assert planner.next_window() == SearchWindow(date(2024, 1, 5), date(2024, 1, 7))
+    assert planner.span_days == 4
+
+
+def test_kept_windows_cover_the_range_once():
+    planner = AdaptiveWindowPlanner(result_cap=100, max_span_days=7)
+    planner.begin(SearchWindow(date(2024, 1, 1), date(2024, 1, 14)))
+    busy = {
+        SearchWindow(date(2024, 1, 1), date(2024, 1, 7)): 100,
+        SearchWindow(date(2024, 1, 1), date(2024, 1, 4)): 100,
+    }
+
+    kept = _drain(planner, busy)
+
+    days = [window.start.toordinal() + offset for window in kept for offset in range(window.days)]
+    assert days == list(range(date(2024, 1, 1).toordinal(), date(2024, 1, 14).toordinal() + 1))
+    assert SearchWindow(date(2024, 1, 1), date(2024, 1, 2)) in kept
+
+
+def test_single_day_window_is_kept_even_when_saturated():
+    planner = AdaptiveWindowPlanner(result_cap=10, max_span_days=1)
+    day = SearchWindow(date(2024, 1, 1), date(2024, 1, 1))
+    planner.begin(day)
+
+    assert planner.next_window() == day
+    assert planner.record(day, 10) is True
+    assert planner.next_window() is None
+
+
+def test_sparse_windows_widen_the_span_up_to_the_maximum():
+    planner = AdaptiveWindowPlanner(result_cap=100, max_span_days=8, sparse_ratio=0.25)
+    planner.span_days = 2
+
+    planner.record(SearchWindow(date(2024, 1, 1), date(2024, 1, 2)), 10)
+    assert planner.span_days == 4
+    planner.record(SearchWindow(date(2024, 1, 3), date(2024, 1, 6)), 10)
+    planner.record(SearchWindow(date(2024, 1, 7), date(2024, 1, 14)), 10)
+    assert planner.span_days == 8
+
+    # A moderately full window leaves the span alone.
+    planner.span_days = 4
+    planner.record(SearchWindow(date(2024, 1, 1), date(2024, 1, 4)), 50)
+    assert planner.span_days == 4
+
+
+def test_learned_span_carries_over_to_the_next_sweep_window():
+    planner = AdaptiveWindowPlanner(result_cap=100, max_span_days=7)
+    planner.begin(SearchWindow(date(2024, 1, 1), date(2024, 1, 7)))
+    first = planner.next_window()
+    planner.record(first, 100)
+
+    planner.begin(SearchWindow(date(2024, 1, 8), date(2024, 1, 14)))
+    assert planner.next_window() == SearchWindow(date(2024, 1, 8), date(2024, 1, 11))
+
+
+@pytest.mark.parametrize("kwargs", [{"result_cap": 0}, {"max_span_days": 0}])
+def test_rejects_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        AdaptiveWindowPlanner(**kwargs)
@@ -0,0 +1,80 @@
+import os
+from datetime import date, timedelta
+
+from wi_scraper import cache as cache_module
+from wi_scraper.cache import SearchCache, cache_key
+from wi_scraper.models import SearchWindow
+
+TODAY = date(2024, 6, 30)
+
+
+def _payload(n):
+    return {"classCode": "CV", "filingDate": {"start": f"01-{n:02d}-2024", "end": f"01-{n:02d}-2024"}}
+
+
+def _window(days_ago):
+    end = date.today() - timedelta(days=days_ago)
+    return SearchWindow(end - timedelta(days=6), end)
+
+
+def test_cache_key_ignores_key_order():
+    assert cache_key({"a": 1, "b": 2}) == cache_key({"b": 2, "a": 1})
+    assert cache_key({"a": 1}) != cache_key({"a": 2})
+
+
+def test_ttl_depends_on_window_age(tmp_path):
+    cache = SearchCache(tmp_path, closed_after_days=28, current_days=7)
+
+    def window_ending(days_ago):
+        end = TODAY - timedelta(days=days_ago)
+        return SearchWindow(end - timedelta(days=6), end)
+
+    assert cache.ttl_for(window_ending(60), today=TODAY) == cache.closed_ttl
+    assert cache.ttl_for(window_ending(14), today=TODAY) == cache.recent_ttl
+    assert cache.ttl_for(window_ending(0), today=TODAY) == cache.current_ttl
+
+
+def test_round_trip_and_expiry(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache = SearchCache(tmp_path, current_ttl=timedelta(minutes=15))
+    cases = [{"caseNo": "2024CV000001", "countyNo": 13}]
+
+    cache.put(_payload(1), _window(0), cases)
+    assert cache.get(_payload(1)) == cases
+    assert cache.get(_payload(2)) is None
+
+    now[0] += 15 * 60
+    assert cache.get(_payload(1)) is None
+    # An expired entry is removed on read.
+    assert not list(tmp_path.glob("*/*.json"))
+
+
+def test_evicts_least_recently_used_entries(tmp_path):
+    cases = [{"caseNo": "x" * 200}]
+    probe = SearchCache(tmp_path / "probe")
+    probe.put(_payload(1), _window(60), cases)
+    entry_size = next((tmp_path / "probe").glob("*/*.json")).stat().st_size
+
+    cache = SearchCache(tmp_path / "cache", max_bytes=int(entry_size * 3.5))
+    for n in (1, 2, 3):
+        cache.put(_payload(n), _window(60), cases)
+    # Give the entries distinct ages, oldest first, then touch entry 1 with a hit.
+    for age, n in enumerate((1, 2, 3)):
+        path = cache._path(cache_key(_payload(n)))
+        stamp = 1_000_000 + age
+        os.utime(path, (stamp, stamp))
+    assert cache.get(_payload(1)) == cases
+
+    cache.put(_payload(4), _window(60), cases)
+
+    assert cache.get(_payload(2)) is None
+    for n in (1, 3, 4):
+        assert cache.get(_payload(n)) == cases
+
+
+def test_clear_removes_everything(tmp_path):
+    cache = SearchCache(tmp_path)
+    cache.put(_payload(1), _window(60), [])
+    cache.clear()
+    assert cache.get(_payload(1)) is None
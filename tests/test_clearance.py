@@ -0,0 +1,248 @@
+import gc
+import itertools
+import threading
+
+import pytest
+
+from wi_scraper.clearance import BrowserClearances, ClearanceBroker, ClearanceError
+
+
+class Solver:
+    """Hands out numbered cookie sets; ``fail`` makes the next solves raise."""
+
+    def __init__(self, fail: int = 0) -> None:
+        self.fail = fail
+        self.calls = 0
+        self._ids = itertools.count(1)
+
+    def __call__(self):
+        self.calls += 1
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("solver broke")
+        return [{"name": "JSESSIONID", "value": f"s{next(self._ids)}", "domain": "wcca.wicourts.gov", "expires": -1}]
+
+
+def _value(clearance):
+    return clearance.cookies[0]["value"]
+
+
+def _settle(broker):
+    # Let a background refresh finish so assertions see a stable pool.
+    broker.close()
+
+
+def test_lease_solves_once_and_reuses_the_clearance():
+    solver = Solver()
+    with ClearanceBroker(solver) as broker:
+        first = broker.lease(timeout=5)
+        second = broker.lease(timeout=5)
+    assert first is second
+    assert _value(first) == "s1"
+    assert solver.calls == 1
+
+
+def test_revoke_hands_out_a_fresh_clearance():
+    solver = Solver()
+    with ClearanceBroker(solver) as broker:
+        first = broker.lease(timeout=5)
+        broker.record_view(first)
+        broker.revoke(first)
+        second = broker.lease(timeout=5)
+    assert second is not first
+    assert first.revoked and not second.revoked
+    assert _value(second) == "s2"
+
+
+def test_lease_after_revoke_in_a_worker_loop():
+    # The pattern every HTTP worker follows: lease on each attempt, revoke on a CAPTCHA demand.
+    solver = Solver()
+    with ClearanceBroker(solver) as broker:
+        used = []
+        for _ in range(3):
+            clearance = broker.lease(timeout=5)
+            used.append(_value(clearance))
+            broker.revoke(clearance)
+    assert used == ["s1", "s2", "s3"]
+
+
+def test_revoke_learns_views_per_clearance():
+    with ClearanceBroker(Solver(), smoothing=0.5) as broker:
+        first = broker.lease(timeout=5)
+        for _ in range(10):
+            broker.record_view(first)
+        broker.revoke(first)
+        assert broker.expected_views == 10.0
+
+        second = broker.lease(timeout=5)
+        for _ in range(4):
+            broker.record_view(second)
+        broker.revoke(second)
+        assert broker.expected_views == 7.0
+        # Revoking twice counts once.
+        broker.revoke(second)
+        assert broker.expected_views == 7.0
+
+
+def test_worn_clearance_is_refreshed_in_the_background():
+    solver = Solver()
+    with ClearanceBroker(solver, refresh_at=0.5) as broker:
+        broker.expected_views = 4.0
+        current = broker.lease(timeout=5)
+        broker.record_view(current)
+        _settle(broker)
+        assert solver.calls == 1
+
+        broker.record_view(current)  # 2 of ~4 views: past refresh_at
+        _settle(broker)
+        assert solver.calls == 2
+        assert broker.stats()["live"] == 2
+        # The older clearance is still drained first; the new one waits as the reserve.
+        assert broker.lease(timeout=5) is current
+        broker.revoke(current)
+        assert _value(broker.lease(timeout=5)) == "s2"
+
+
+def test_expired_clearance_is_not_leased():
+    solver = Solver()
+    with ClearanceBroker(solver) as broker:
+        old = broker.add([{"name": "JSESSIONID", "value": "old", "domain": "wcca.wicourts.gov"}])
+        old.expires_at = old.solved_at
+        assert _value(broker.lease(timeout=5)) == "s1"
+
+
+def test_add_offers_a_ready_clearance_without_solving():
+    solver = Solver()
+    with ClearanceBroker(solver) as broker:
+        added = broker.add([{"name": "JSESSIONID", "value": "harvested", "domain": "wcca.wicourts.gov"}])
+        assert broker.lease(timeout=5) is added
+    assert solver.calls <= 1  # at most a background refresh for the reserve
+
+
+def test_repeated_solve_failures_raise():
+    solver = Solver(fail=10)
+    with ClearanceBroker(solver, max_failures=3, retry_delay=0.0) as broker:
+        with pytest.raises(ClearanceError, match="3 times") as excinfo:
+            broker.lease(timeout=5)
+    assert solver.calls == 3
+    assert isinstance(excinfo.value.__cause__, RuntimeError)
+
+
+def test_failed_solves_back_off():
+    solver = Solver(fail=1)
+    with ClearanceBroker(solver, retry_delay=60.0) as broker:
+        with pytest.raises(ClearanceError, match="timed out"):
+            broker.lease(timeout=0.3)
+        # Still inside the backoff window: no second solve was started.
+        assert solver.calls == 1
+
+        broker.retry_delay = 0.0
+        broker._retry_at = 0.0
+        assert _value(broker.lease(timeout=5)) == "s1"
+
+
+def test_success_resets_the_failure_count():
+    solver = Solver(fail=2)
+    with ClearanceBroker(solver, max_failures=3, retry_delay=0.0) as broker:
+        first = broker.lease(timeout=5)
+        solver.fail = 2
+        broker.revoke(first)
+        assert _value(broker.lease(timeout=5)) == "s2"
+
+
+def test_concurrent_leases_share_one_solve():
+    gate = threading.Event()
+    solver = Solver()
+
+    def slow_solve():
+        gate.wait(5)
+        return solver()
+
+    with ClearanceBroker(slow_solve) as broker:
+        leased = []
+        workers = [threading.Thread(target=lambda: leased.append(broker.lease(timeout=5))) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        gate.set()
+        for worker in workers:
+            worker.join()
+    assert len({id(clearance) for clearance in leased}) == 1
+    assert solver.calls >= 1 and _value(leased[0]) == "s1"
+
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.cookies = []
+
+    def add_cookies(self, cookies) -> None:
+        self.cookies.extend(cookie["value"] for cookie in cookies)
+
+
+def test_browser_clearances_seed_and_swap_cookies():
+    with ClearanceBroker(Solver()) as broker:
+        clearances = BrowserClearances(broker, timeout=5)
+        context = FakeContext()
+
+        clearances.install(context)
+        clearances.sync(context)
+        assert context.cookies == ["s1"]
+
+        clearances.record_view(context)
+        assert clearances.held(context).views == 1
+
+        clearances.revoke(context)
+        clearances.sync(context)
+        assert context.cookies == ["s1", "s2"]
+
+
+def test_browser_clearances_forget_closed_contexts():
+    with ClearanceBroker(Solver()) as broker:
+        clearances = BrowserClearances(broker, timeout=5)
+        context = FakeContext()
+        clearances.sync(context)
+        del context
+        gc.collect()
+        assert len(clearances._held) == 0
+
+        # A new context never inherits a lease, whatever its id().
+        fresh = FakeContext()
+        clearances.sync(fresh)
+        assert fresh.cookies == ["s1"]
+
+
+def test_rejects_invalid_target():
+    with pytest.raises(ValueError):
+        ClearanceBroker(Solver(), target=0)
+
+
+def test_http_detail_loop_leases_a_fresh_clearance_after_a_captcha(monkeypatch):
+    pytest.importorskip("hcaptcha_challenger")
+    detail_scraper = pytest.importorskip("detail_scraper")
+    from wi_scraper.client import CaptchaRequiredError
+
+    class FakeClient:
+        """Serves a detail only with the second clearance's cookies."""
+
+        def __init__(self, **kwargs) -> None:
+            self.cookie = None
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return None
+
+        def use_cookies(self, cookies) -> None:
+            self.cookie = cookies[0]["value"]
+
+        def case_detail(self, case_no, county_no):
+            if self.cookie != "s2":
+                raise CaptchaRequiredError("captcha")
+            return {"caseNo": case_no, "cookie": self.cookie}
+
+    monkeypatch.setattr(detail_scraper, "WICourtClient", FakeClient)
+    with ClearanceBroker(Solver()) as broker:
+        results = detail_scraper.http_scrape_case_details(
+            [{"case_no": "2024CV000001", "county_no": 13}], limit=1, broker=broker, max_clearances=3
+        )
+    assert results[0]["detail"] == {"caseNo": "2024CV000001", "cookie": "s2"}
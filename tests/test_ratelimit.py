@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from wi_scraper import ratelimit
+from wi_scraper.ratelimit import RateLimiter, build_rate_limiter
+
+
+class FakeTime:
+    """Stands in for the ``time`` module: a manual clock whose sleep() advances it."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(ratelimit, "time", fake)
+    return fake
+
+
+def test_burst_then_paced_at_rate(clock):
+    limiter = RateLimiter(2.0, burst=2)
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == pytest.approx(0.5)
+    assert limiter.acquire() == pytest.approx(0.5)
+    assert clock.slept == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_idle_time_refills_up_to_burst(clock):
+    limiter = RateLimiter(1.0, burst=3)
+    for _ in range(3):
+        limiter.acquire()
+
+    clock.now += 60
+    waits = [limiter.acquire() for _ in range(4)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] == pytest.approx(1.0)
+
+
+def test_penalize_halves_rate_down_to_minimum(clock):
+    limiter = RateLimiter(4.0, min_rate=0.5, penalty_cooldown=5.0)
+
+    limiter.penalize()
+    assert limiter.rate == 2.0
+    for _ in range(5):
+        clock.now += 10
+        limiter.penalize()
+    assert limiter.rate == 0.5
+
+
+def test_penalties_within_cooldown_count_once(clock):
+    limiter = RateLimiter(4.0, penalty_cooldown=5.0)
+
+    limiter.penalize()
+    clock.now += 1
+    limiter.penalize()
+    assert limiter.rate == 2.0
+
+    clock.now += 5
+    limiter.penalize()
+    assert limiter.rate == 1.0
+
+
+def test_penalize_drains_the_bucket(clock):
+    limiter = RateLimiter(2.0, burst=5)
+    limiter.penalize()
+    # Rate is now 1/s and no token is left, so the next request waits a full second.
+    assert limiter.acquire() == pytest.approx(1.0)
+
+
+def test_reward_recovers_additively_to_target(clock):
+    limiter = RateLimiter(10.0, recovery=0.1)
+    limiter.penalize()
+    assert limiter.rate == 5.0
+
+    limiter.reward()
+    assert limiter.rate == pytest.approx(6.0)
+    for _ in range(10):
+        limiter.reward()
+    assert limiter.rate == 10.0
+
+
+def test_observe_status(clock):
+    limiter = RateLimiter(10.0, recovery=0.1)
+
+    limiter.observe_status(429)
+    assert limiter.rate == 5.0
+    limiter.observe_status(404)
+    assert limiter.rate == 5.0
+    limiter.observe_status(200)
+    assert limiter.rate == pytest.approx(6.0)
+    clock.now += 10
+    limiter.observe_status(503)
+    assert limiter.rate == pytest.approx(3.0)
+
+
+def test_async_acquire_shares_the_bucket(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(ratelimit.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter(1.0, burst=1)
+    limiter.acquire()
+
+    assert asyncio.run(limiter.acquire_async()) == pytest.approx(1.0)
+    assert slept == [pytest.approx(1.0)]
+
+
+def test_build_rate_limiter():
+    assert build_rate_limiter(None) is None
+    assert build_rate_limiter(0) is None
+    limiter = build_rate_limiter(3.0, 2)
+    assert limiter.rate == 3.0 and limiter.burst == 2
+
+
+@pytest.mark.parametrize("rate, burst", [(0, 1), (1.0, 0)])
+def test_rejects_invalid_settings(rate, burst):
+    with pytest.raises(ValueError):
+        RateLimiter(rate, burst)
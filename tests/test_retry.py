@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from wi_scraper import client as client_module
+from wi_scraper import retry as retry_module
+from wi_scraper.client import WICourtClient
+from wi_scraper.retry import RetryBudget, RetryPolicy, parse_retry_after
+
+
+@pytest.fixture
+def no_jitter(monkeypatch):
+    # Full jitter draws uniformly from [0, cap]; take the cap so delays are exact.
+    monkeypatch.setattr(retry_module.random, "uniform", lambda low, high: high)
+
+
+def test_delay_grows_exponentially_up_to_max(no_jitter):
+    policy = RetryPolicy(base_delay=0.5, max_delay=3.0)
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_delay_is_jittered_below_the_cap():
+    policy = RetryPolicy(base_delay=1.0, max_delay=30.0)
+    for _ in range(100):
+        assert 0 <= policy.delay(3) <= 4.0
+
+
+def test_retry_after_seconds_take_precedence(no_jitter):
+    policy = RetryPolicy(base_delay=0.5, max_retry_after=120.0)
+    assert policy.delay(1, "7") == 7.0
+    assert policy.delay(1, "600") == 120.0
+    # Garbage falls back to the backoff schedule.
+    assert policy.delay(2, "soon") == 1.0
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+    past = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+
+
+def test_retry_statuses():
+    policy = RetryPolicy()
+    assert all(policy.should_retry_status(code) for code in (429, 500, 502, 503, 504))
+    assert not policy.should_retry_status(404)
+
+
+def test_budget_is_shared_and_exhausts():
+    budget = RetryBudget(2)
+    assert budget.consume() and budget.consume()
+    assert not budget.consume()
+    assert budget.remaining == 0
+    with pytest.raises(ValueError):
+        RetryBudget(-1)
+
+
+def _client(handler, monkeypatch, **kwargs):
+    sleeps = []
+    monkeypatch.setattr(client_module, "time", SimpleNamespace(sleep=sleeps.append))
+    client = WICourtClient(transport=httpx.MockTransport(handler), **kwargs)
+    return client, sleeps
+
+
+def test_client_honours_retry_after_then_succeeds(monkeypatch):
+    responses = iter(
+        [
+            httpx.Response(200),  # bootstrap
+            httpx.Response(429, headers={"Retry-After": "3"}),
+            httpx.Response(503),
+            httpx.Response(200, json={"result": {"cases": []}}),
+        ]
+    )
+    client, sleeps = _client(lambda request: next(responses), monkeypatch)
+
+    assert client._post("/jsonPost/advancedCaseSearch", {}, lambda content: content) == b'{"result":{"cases":[]}}'
+    assert sleeps[0] == 3.0
+    assert len(sleeps) == 2
+
+
+def test_client_gives_up_after_max_attempts(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200) if request.method == "GET" else httpx.Response(502)
+
+    client, sleeps = _client(handler, monkeypatch, retry_policy=RetryPolicy(max_attempts=3))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        client._post("/jsonPost/advancedCaseSearch", {}, lambda content: content)
+    assert calls.count("/jsonPost/advancedCaseSearch") == 3
+    assert len(sleeps) == 2
+
+
+def test_client_stops_retrying_once_the_budget_is_spent(monkeypatch):
+    def handler(request):
+        return httpx.Response(200) if request.method == "GET" else httpx.Response(500)
+
+    client, sleeps = _client(handler, monkeypatch, retry_budget=RetryBudget(1))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        client._post("/jsonPost/advancedCaseSearch", {}, lambda content: content)
+    assert len(sleeps) == 1
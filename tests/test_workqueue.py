@@ -0,0 +1,120 @@
+import pytest
+
+from wi_scraper.workqueue import DONE, FAILED, IN_FLIGHT, PENDING, DetailWorkQueue
+
+
+def _case(n, county=13):
+    return {"case_no": f"2024CV{n:06d}", "county_no": county, "caption": f"Case {n}"}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    with DetailWorkQueue(tmp_path / "queue.db", worker_id="w1", max_attempts=2) as work_queue:
+        yield work_queue
+
+
+def test_enqueue_is_idempotent(queue):
+    assert queue.enqueue([_case(1), _case(2)]) == 2
+    assert queue.enqueue([_case(2), _case(3)]) == 1
+    assert queue.counts()[PENDING] == 3
+
+
+def test_claim_hands_out_oldest_first_and_marks_in_flight(queue):
+    queue.enqueue([_case(1), _case(2), _case(3)])
+
+    jobs = queue.claim(2)
+
+    assert [job.case_no for job in jobs] == ["2024CV000001", "2024CV000002"]
+    assert all(job.attempts == 1 for job in jobs)
+    assert jobs[0].case == _case(1)
+    assert queue.counts()[IN_FLIGHT] == 2
+    assert queue.peek() == _case(3)
+    assert queue.claim_one().case_no == "2024CV000003"
+    assert queue.claim_one() is None
+
+
+def test_complete_stores_the_result_once(queue):
+    queue.enqueue([_case(1)])
+    job = queue.claim_one()
+
+    assert queue.complete(job, {"parties": []}) is True
+    assert queue.complete(job, {"parties": ["again"]}) is False
+    assert list(queue.results()) == [(_case(1), {"parties": []})]
+    assert queue.counts()[DONE] == 1
+
+
+def test_fail_requeues_until_max_attempts(queue):
+    queue.enqueue([_case(1)])
+
+    first = queue.claim_one()
+    assert queue.fail(first, "timeout") is True
+    assert queue.counts()[PENDING] == 1
+
+    second = queue.claim_one()
+    assert second.attempts == 2
+    queue.fail(second, "timeout again")
+    assert queue.counts()[FAILED] == 1
+    assert list(queue.failures()) == [(_case(1), 2, "timeout again")]
+
+    assert queue.retry_failed() == 1
+    assert queue.claim_one().attempts == 1
+
+
+def test_fail_without_retry_parks_the_case(queue):
+    queue.enqueue([_case(1)])
+    queue.fail(queue.claim_one(), "no such case", retry=False)
+    assert queue.counts()[FAILED] == 1
+
+
+def test_release_returns_claims_without_charging_an_attempt(queue):
+    queue.enqueue([_case(1), _case(2)])
+    queue.claim(2)
+
+    assert queue.release() == 2
+    assert queue.counts()[PENDING] == 2
+    assert all(job.attempts == 1 for job in queue.claim(2))
+
+
+def test_release_only_touches_this_workers_claims(tmp_path):
+    path = tmp_path / "queue.db"
+    with DetailWorkQueue(path, worker_id="a") as first, DetailWorkQueue(path, worker_id="b") as second:
+        first.enqueue([_case(1), _case(2)])
+        first.claim_one()
+        second.claim_one()
+
+        assert first.release() == 1
+        assert first.counts() == {PENDING: 1, IN_FLIGHT: 1, DONE: 0, FAILED: 0}
+
+
+def test_expired_lease_is_requeued_and_the_stale_result_dropped(tmp_path):
+    path = tmp_path / "queue.db"
+    with DetailWorkQueue(path, worker_id="dead", lease_seconds=-1) as crashed:
+        crashed.enqueue([_case(1)])
+        stale = crashed.claim_one()
+
+    with DetailWorkQueue(path, worker_id="alive") as survivor:
+        fresh = survivor.claim_one()
+        assert fresh.case_no == stale.case_no
+        assert fresh.attempts == 2
+        assert fresh.claim != stale.claim
+
+        with DetailWorkQueue(path, worker_id="dead") as late:
+            assert late.complete(stale, {"from": "stale"}) is False
+        assert survivor.complete(fresh, {"from": "fresh"}) is True
+        assert [result for _, result in survivor.results()] == [{"from": "fresh"}]
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_case(tmp_path):
+    path = tmp_path / "queue.db"
+    with DetailWorkQueue(path, worker_id="dead", max_attempts=1, lease_seconds=-1) as work_queue:
+        work_queue.enqueue([_case(1)])
+        work_queue.claim_one()
+        assert work_queue.claim_one() is None
+        assert list(work_queue.failures()) == [(_case(1), 1, "lease expired")]
+
+
+def test_results_page_through_in_enqueue_order(queue):
+    queue.enqueue([_case(n) for n in range(5)])
+    for job in reversed(queue.claim(5)):
+        queue.complete(job, job.case_no)
+    assert [result for _, result in queue.results(page_size=2)] == [f"2024CV{n:06d}" for n in range(5)]
@@ -1,14 +1,87 @@
 """Public API surface for the WI scraper package."""
 
-from .constants import ClassCode, DEFAULT_CLASS_CODES
-from .scraper import build_windows, fetch_case_summaries, flatten_aggregated
-from .client import WICourtClient
+from .adaptive import AdaptiveWindowPlanner
+from .browser import AsyncDetailCapture, DetailCapture, ResourceBlocker
+from .cache import SearchCache
+from .compact import CompactCaseStore
+from .constants import ClassCode, DEFAULT_CLASS_CODES, DEFAULT_RESULT_CAP
+from .journal import SweepJournal
+from .models import CaseEvent
+from .ratelimit import RateLimiter, build_rate_limiter
+from .retry import RetryBudget, RetryPolicy
+from .scraper import (
+    IncompleteSweepError,
+    async_fetch_case_summaries,
+    async_iter_case_summaries,
+    async_iter_window_batches,
+    build_windows,
+    fetch_case_summaries,
+    flatten_aggregated,
+    iter_case_summaries,
+    iter_window_batches,
+    merge_aggregated,
+    merge_flattened,
+    serialise_case,
+)
+from .sharding import sharded_fetch_case_summaries, sharded_iter_window_batches
+from .sinks import CSVSink, NDJSONSink
+from .client import AsyncWICourtClient, CaptchaRequiredError, SessionRejectedError, WICourtClient
+from .clearance import BrowserClearances, ClearanceBroker, ClearanceError
+from .detailcache import DetailCache
+from .state import SyncState
+from .pagepool import PagePool, harvest_cookies, solve_clearance
+from .parquet import ParquetCaseWriter
+from .storage import SQLiteCaseStore
+from .transport import build_async_transport, build_transport
+from .workqueue import DetailWorkQueue
 
 __all__ = [
+    "AdaptiveWindowPlanner",
+    "AsyncDetailCapture",
+    "AsyncWICourtClient",
+    "BrowserClearances",
+    "CSVSink",
+    "CaptchaRequiredError",
+    "CaseEvent",
     "ClassCode",
+    "ClearanceBroker",
+    "ClearanceError",
+    "CompactCaseStore",
     "DEFAULT_CLASS_CODES",
+    "DEFAULT_RESULT_CAP",
+    "DetailCache",
+    "DetailCapture",
+    "DetailWorkQueue",
+    "IncompleteSweepError",
+    "NDJSONSink",
+    "RateLimiter",
+    "ResourceBlocker",
+    "RetryBudget",
+    "RetryPolicy",
+    "PagePool",
+    "ParquetCaseWriter",
+    "SQLiteCaseStore",
+    "SearchCache",
+    "SessionRejectedError",
+    "SweepJournal",
+    "SyncState",
     "WICourtClient",
+    "async_fetch_case_summaries",
+    "async_iter_case_summaries",
+    "async_iter_window_batches",
+    "build_async_transport",
+    "build_rate_limiter",
+    "build_transport",
     "build_windows",
     "fetch_case_summaries",
     "flatten_aggregated",
+    "harvest_cookies",
+    "iter_case_summaries",
+    "iter_window_batches",
+    "merge_aggregated",
+    "merge_flattened",
+    "serialise_case",
+    "sharded_fetch_case_summaries",
+    "sharded_iter_window_batches",
+    "solve_clearance",
 ]
@@ -0,0 +1,89 @@
+"""Adaptive filing-date window planning for saturated advanced searches."""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import List, Optional
+
+from .constants import DEFAULT_RESULT_CAP
+from .models import SearchWindow
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveWindowPlanner:
+    """Plans sub-windows of a sweep window for a single class code.
+
+    A response with ``result_cap`` or more rows is assumed to be truncated: the
+    window is discarded and re-queried as two halves, down to a single day.
+    Windows that come back with fewer than ``sparse_ratio * result_cap`` rows
+    double the span used for the next window, up to ``max_span_days``. The
+    learned span carries over between sweep windows so a busy class code does
+    not re-saturate at the start of every window.
+    """
+
+    def __init__(
+        self,
+        *,
+        result_cap: int = DEFAULT_RESULT_CAP,
+        max_span_days: int = 7,
+        sparse_ratio: float = 0.25,
+    ) -> None:
+        if result_cap < 1:
+            raise ValueError("result_cap must be >= 1")
+        if max_span_days < 1:
+            raise ValueError("max_span_days must be >= 1")
+        self.result_cap = result_cap
+        self.max_span_days = max_span_days
+        self.sparse_ratio = sparse_ratio
+        self.span_days = max_span_days
+        self._pending: List[SearchWindow] = []
+        self._cursor: Optional[date] = None
+        self._end: Optional[date] = None
+
+    def begin(self, window: SearchWindow) -> None:
+        """Start planning sub-windows covering ``window``."""
+        self._pending.clear()
+        self._cursor = window.start
+        self._end = window.end
+
+    def next_window(self) -> Optional[SearchWindow]:
+        """Return the next window to query, or ``None`` once the range is covered."""
+        if self._pending:
+            return self._pending.pop()
+        if self._cursor is None or self._end is None or self._cursor > self._end:
+            return None
+        window_end = min(self._cursor + timedelta(days=self.span_days - 1), self._end)
+        window = SearchWindow(self._cursor, window_end)
+        self._cursor = window_end + timedelta(days=1)
+        return window
+
+    def is_saturated(self, count: int) -> bool:
+        return count >= self.result_cap
+
+    def record(self, window: SearchWindow, count: int) -> bool:
+        """Feed back the row count for ``window``.
+
+        Returns ``True`` when the results are complete and should be kept, or
+        ``False`` when the window was split and its halves queued instead.
+        """
+        if self.is_saturated(count):
+            if window.days > 1:
+                first, second = window.split()
+                self._pending.append(second)
+                self._pending.append(first)
+                self.span_days = min(self.span_days, first.days)
+                return False
+            logger.warning(
+                "Single-day window %s returned %d rows (cap %d); results may be truncated",
+                window.start.isoformat(),
+                count,
+                self.result_cap,
+            )
+        elif count < self.result_cap * self.sparse_ratio:
+            self.span_days = min(self.span_days * 2, self.max_span_days)
+        return True
+
+
+__all__ = ["AdaptiveWindowPlanner"]
@@ -0,0 +1,271 @@
+"""Capture case-detail payloads from a Playwright page's own XHR responses."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .serialization import loads
+
+try:  # pragma: no cover - optional dependency
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+except ImportError:  # pragma: no cover - optional dependency
+    PlaywrightTimeoutError = TimeoutError
+
+# Resource types the detail page uses to fetch its JSON.
+_XHR_TYPES = frozenset({"xhr", "fetch"})
+
+DEFAULT_DETAIL_TIMEOUT = 30.0
+# How often ``abort`` callbacks are checked while no response is arriving.
+ABORT_POLL_INTERVAL = 0.25
+
+CAPTCHA_SELECTOR = "text=/Please complete the CAPTCHA/i"
+# Rendered once the detail page has drawn the case, whether or not its XHR was captured.
+PARTIES_SELECTOR = "#parties"
+
+
+# Resource types the detail payload never needs.
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+# Analytics and ad hosts loaded by the WCCA pages.
+DEFAULT_BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+)
+# The hCaptcha widget must load untouched (images, styles and all) or it cannot be solved.
+CAPTCHA_HOSTS = ("hcaptcha.com",)
+# Viewport for light mode; the detail XHR does not depend on layout size.
+LIGHT_VIEWPORT = {"width": 1024, "height": 768}
+
+
+def _host_matches(host: str, domains: Tuple[str, ...]) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+@dataclass(frozen=True)
+class ResourceBlocker:
+    """Abort page requests the case-detail payload does not need.
+
+    Requests are dropped by resource type (images, fonts, stylesheets, media
+    by default) or by host (analytics). Hosts in ``allow_hosts`` always go
+    through, so the CAPTCHA widget keeps working. Install on a context (all
+    pages) or on a single page. Note that Chromium skips its HTTP cache for
+    routed requests.
+    """
+
+    resource_types: FrozenSet[str] = DEFAULT_BLOCKED_RESOURCE_TYPES
+    hosts: Tuple[str, ...] = DEFAULT_BLOCKED_HOSTS
+    allow_hosts: Tuple[str, ...] = CAPTCHA_HOSTS
+
+    def should_block(self, request) -> bool:
+        host = urlsplit(request.url).hostname or ""
+        if _host_matches(host, self.allow_hosts):
+            return False
+        return request.resource_type in self.resource_types or _host_matches(host, self.hosts)
+
+    def _handle(self, route) -> None:
+        if self.should_block(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def _handle_async(self, route) -> None:
+        if self.should_block(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def install(self, target) -> None:
+        """Route every request of a sync-API context or page through the blocker."""
+        target.route("**/*", self._handle)
+
+    async def install_async(self, target) -> None:
+        await target.route("**/*", self._handle_async)
+
+
+def build_resource_blocker(enabled: bool = True, *, extra_hosts: Tuple[str, ...] = ()) -> Optional[ResourceBlocker]:
+    """Return the default blocker plus ``extra_hosts``, or ``None`` when light mode is off."""
+    if not enabled:
+        return None
+    return ResourceBlocker(hosts=DEFAULT_BLOCKED_HOSTS + tuple(extra_hosts))
+
+
+def unwrap_case_detail(obj: object) -> Optional[Dict[str, Any]]:
+    """Find the case-detail object inside a ``jsonPost`` response body."""
+    if isinstance(obj, dict):
+        if "caseDetail" in obj and isinstance(obj["caseDetail"], dict):
+            # An explicit caseDetail is the payload even if it lists no parties.
+            return unwrap_case_detail(obj["caseDetail"]) or obj["caseDetail"]
+        if "parties" in obj or "records" in obj:
+            return obj
+        for key in ("result", "detail", "data"):
+            if key in obj:
+                detail = unwrap_case_detail(obj[key])
+                if detail:
+                    return detail
+    return None
+
+
+def is_detail_response(response) -> bool:
+    """Whether ``response`` is a successful ``jsonPost`` XHR that may carry a case detail."""
+    return (
+        response.request.resource_type in _XHR_TYPES
+        and "/jsonPost" in response.url
+        and response.ok
+    )
+
+
+def captcha_present(page) -> bool:
+    return page.locator(CAPTCHA_SELECTOR).count() > 0
+
+
+def parties_rendered(page) -> bool:
+    return page.locator(PARTIES_SELECTOR).count() > 0
+
+
+def _matches_case(detail: Dict[str, Any], case_no: Optional[str], county_no: Optional[int]) -> bool:
+    # Payloads that do not echo the identifiers are accepted as-is.
+    if case_no is not None and detail.get("caseNo") not in (None, case_no):
+        return False
+    if county_no is not None and detail.get("countyNo") not in (None, county_no, str(county_no)):
+        return False
+    return True
+
+
+class _CaptureBase:
+    def __init__(self, page, *, match: Callable[[Any], bool] = is_detail_response) -> None:
+        self.page = page
+        self.match = match
+        self._pending: List[Any] = []
+        page.on("response", self._on_response)
+
+    def _on_response(self, response) -> None:
+        # Only record here; bodies are read by the waiting caller, outside the event loop callback.
+        if self.match(response):
+            self._pending.append(response)
+
+    def detach(self) -> None:
+        self.page.remove_listener("response", self._on_response)
+        self._pending.clear()
+
+    @staticmethod
+    def _decode(body: bytes, case_no: Optional[str], county_no: Optional[int]) -> Optional[Dict[str, Any]]:
+        try:
+            detail = unwrap_case_detail(loads(body))
+        except ValueError:
+            return None
+        if detail is None or not _matches_case(detail, case_no, county_no):
+            return None
+        return detail
+
+
+class DetailCapture(_CaptureBase):
+    """Record the page's ``jsonPost`` responses and return the case detail as soon as it arrives.
+
+    Attach before navigating so the response cannot be missed, then call
+    :meth:`wait`. Responses for other cases (e.g. left over from the previous
+    navigation of a reused page) are skipped when the payload names its case.
+    """
+
+    def take(self, *, case_no: Optional[str] = None, county_no: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Return a detail captured so far without waiting, or ``None``."""
+        while self._pending:
+            response = self._pending.pop(0)
+            try:
+                body = response.body()
+            except Exception:  # the page navigated away before the body was read
+                continue
+            detail = self._decode(body, case_no, county_no)
+            if detail is not None:
+                return detail
+        return None
+
+    def wait(
+        self,
+        *,
+        case_no: Optional[str] = None,
+        county_no: Optional[int] = None,
+        timeout: float = DEFAULT_DETAIL_TIMEOUT,
+        abort: Optional[Callable[[], bool]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Block until a matching detail response arrives.
+
+        Returns ``None`` after ``timeout`` seconds, or as soon as ``abort()``
+        is true (e.g. the page is showing a CAPTCHA and no detail will come).
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            detail = self.take(case_no=case_no, county_no=county_no)
+            if detail is not None:
+                return detail
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (abort is not None and abort()):
+                return None
+            if abort is not None:
+                remaining = min(remaining, ABORT_POLL_INTERVAL)
+            try:
+                self.page.wait_for_event("response", predicate=self.match, timeout=remaining * 1000)
+            except PlaywrightTimeoutError:
+                pass
+
+
+class AsyncDetailCapture(_CaptureBase):
+    """``playwright.async_api`` counterpart of :class:`DetailCapture`."""
+
+    async def take(self, *, case_no: Optional[str] = None, county_no: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        while self._pending:
+            response = self._pending.pop(0)
+            try:
+                body = await response.body()
+            except Exception:  # the page navigated away before the body was read
+                continue
+            detail = self._decode(body, case_no, county_no)
+            if detail is not None:
+                return detail
+        return None
+
+    async def wait(
+        self,
+        *,
+        case_no: Optional[str] = None,
+        county_no: Optional[int] = None,
+        timeout: float = DEFAULT_DETAIL_TIMEOUT,
+        abort: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            detail = await self.take(case_no=case_no, county_no=county_no)
+            if detail is not None:
+                return detail
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (abort is not None and await abort()):
+                return None
+            if abort is not None:
+                remaining = min(remaining, ABORT_POLL_INTERVAL)
+            try:
+                await self.page.wait_for_event("response", predicate=self.match, timeout=remaining * 1000)
+            except PlaywrightTimeoutError:
+                pass
+
+
+__all__ = [
+    "AsyncDetailCapture",
+    "CAPTCHA_HOSTS",
+    "CAPTCHA_SELECTOR",
+    "DEFAULT_BLOCKED_HOSTS",
+    "DEFAULT_BLOCKED_RESOURCE_TYPES",
+    "DEFAULT_DETAIL_TIMEOUT",
+    "DetailCapture",
+    "LIGHT_VIEWPORT",
+    "PARTIES_SELECTOR",
+    "ResourceBlocker",
+    "build_resource_blocker",
+    "captcha_present",
+    "is_detail_response",
+    "parties_rendered",
+    "unwrap_case_detail",
+]
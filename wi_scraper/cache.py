@@ -0,0 +1,147 @@
+"""Persistent on-disk cache for advanced search responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import SearchWindow
+from .serialization import dump_bytes, loads
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Content address for a search payload (window dates, class code and flags)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """Content-addressed response cache with age-dependent TTLs and LRU eviction.
+
+    Each entry is a small JSON file named after :func:`cache_key` that stores
+    the raw ``cases`` array and an absolute expiry time. The TTL is fixed when
+    the entry is written and depends on how far ``window.end`` lies in the past:
+
+    * windows closed for more than ``closed_after_days`` get ``closed_ttl``;
+    * windows that ended within the last ``current_days`` get ``current_ttl``;
+    * anything in between gets ``recent_ttl``.
+
+    Hits refresh the file's modification time, and once the cache grows past
+    ``max_bytes`` the least recently used entries are removed.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        closed_after_days: int = 28,
+        current_days: int = 7,
+        closed_ttl: timedelta = timedelta(days=7),
+        recent_ttl: timedelta = timedelta(hours=6),
+        current_ttl: timedelta = timedelta(minutes=15),
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.closed_after_days = closed_after_days
+        self.current_days = current_days
+        self.closed_ttl = closed_ttl
+        self.recent_ttl = recent_ttl
+        self.current_ttl = current_ttl
+        self._total_bytes: Optional[int] = None
+
+    def ttl_for(self, window: SearchWindow, *, today: Optional[date] = None) -> timedelta:
+        age_days = ((today or date.today()) - window.end).days
+        if age_days > self.closed_after_days:
+            return self.closed_ttl
+        if age_days < self.current_days:
+            return self.current_ttl
+        return self.recent_ttl
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, payload: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Return cached raw cases for ``payload`` or ``None`` on a miss/expiry."""
+        path = self._path(cache_key(payload))
+        try:
+            entry = loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("cases", [])
+
+    def put(self, payload: Dict[str, Any], window: SearchWindow, cases: List[Dict[str, Any]]) -> None:
+        path = self._path(cache_key(payload))
+        path.parent.mkdir(exist_ok=True)
+        entry = {
+            "expires_at": time.time() + self.ttl_for(window).total_seconds(),
+            "payload": payload,
+            "cases": cases,
+        }
+        data = dump_bytes(entry)
+        previous = path.stat().st_size if path.exists() else 0
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(data) - previous
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*/*.json"):
+            self._remove(path)
+        self._total_bytes = 0
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        if self._total_bytes is not None:
+            self._total_bytes -= size
+
+    def _scan_size(self) -> int:
+        return sum(path.stat().st_size for path in self.directory.glob("*/*.json"))
+
+    def _evict(self) -> None:
+        # Trim to 90% of the budget so eviction scans are amortised over many puts.
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+
+__all__ = ["SearchCache", "cache_key"]
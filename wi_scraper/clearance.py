@@ -0,0 +1,302 @@
+"""Share solved-CAPTCHA sessions ("clearances") between detail workers."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+import weakref
+from contextlib import AbstractContextManager
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+Cookies = List[Dict[str, Any]]
+
+# Assumed lifetime of a clearance whose cookies carry no expiry.
+DEFAULT_CLEARANCE_LIFETIME = 20 * 60.0
+
+# Pause after a failed solve, doubled for each further failure in a row.
+DEFAULT_SOLVE_RETRY_DELAY = 10.0
+
+
+class ClearanceError(RuntimeError):
+    """Raised when no clearance can be obtained (the solver keeps failing or a lease times out)."""
+
+
+class Clearance:
+    """One solved session: the cookies a browser held right after the CAPTCHA cleared."""
+
+    __slots__ = ("ident", "cookies", "solved_at", "expires_at", "views", "revoked")
+
+    def __init__(self, ident: int, cookies: Cookies, solved_at: float, expires_at: float) -> None:
+        self.ident = ident
+        self.cookies = cookies
+        self.solved_at = solved_at
+        self.expires_at = expires_at
+        self.views = 0
+        self.revoked = False
+
+    def usable(self, now: float) -> bool:
+        return not self.revoked and now < self.expires_at
+
+    def __repr__(self) -> str:
+        return f"Clearance(#{self.ident}, views={self.views}, revoked={self.revoked})"
+
+
+def _cookie_expiry(cookies: Sequence[Mapping[str, Any]], now: float, lifetime: float) -> float:
+    # Playwright reports session cookies with expires == -1.
+    wall_now = time.time()
+    expiries = [cookie["expires"] for cookie in cookies if (cookie.get("expires") or -1) > wall_now]
+    wall_deadline = min(expiries) if expiries else None
+    deadline = now + lifetime
+    if wall_deadline is not None:
+        deadline = min(deadline, now + (wall_deadline - wall_now))
+    return deadline
+
+
+class ClearanceBroker(AbstractContextManager["ClearanceBroker"]):
+    """Hold solved sessions and lease them to HTTP and browser workers.
+
+    ``solve()`` runs one CAPTCHA solve (hcaptcha-challenger, or a person at a
+    visible browser) and returns the cookies that cleared it. Workers call
+    :meth:`lease`, use the cookies (``WICourtClient.use_cookies`` or
+    ``PagePool(cookies=...)``), report every detail served with
+    :meth:`record_view`, and :meth:`revoke` the clearance when the server
+    asks for a CAPTCHA again.
+
+    The broker learns how many views a clearance lasts (an exponentially
+    weighted average over revoked clearances). Once every live clearance is
+    past ``refresh_at`` of that estimate, or of its expiry, it starts the next
+    solve in a background thread. Workers then switch over without waiting.
+    Solves are serialized and at most ``target`` clearances are kept ready.
+    After a failed solve the next one waits ``retry_delay`` seconds, doubled
+    for every further failure in a row (capped at ``max_retry_delay``), so a
+    broken solver does not open browser windows back to back.
+    """
+
+    def __init__(
+        self,
+        solve: Callable[[], Sequence[Mapping[str, Any]]],
+        *,
+        target: int = 1,
+        refresh_at: float = 0.8,
+        lifetime: float = DEFAULT_CLEARANCE_LIFETIME,
+        smoothing: float = 0.3,
+        max_failures: int = 3,
+        retry_delay: float = DEFAULT_SOLVE_RETRY_DELAY,
+        max_retry_delay: float = 120.0,
+    ) -> None:
+        if target < 1:
+            raise ValueError("target must be >= 1")
+        self._solve = solve
+        self.target = target
+        self.refresh_at = refresh_at
+        self.lifetime = lifetime
+        self.smoothing = smoothing
+        self.max_failures = max_failures
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.expected_views: Optional[float] = None
+        self.solves = 0
+        self.views = 0
+        self._pool: List[Clearance] = []
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._solver: Optional[threading.Thread] = None
+        self._failures = 0
+        self._last_error: Optional[BaseException] = None
+        # Monotonic time before which no new solve starts (set after a failure).
+        self._retry_at = 0.0
+
+    # Leasing -----------------------------------------------------------------------
+    def lease(self, timeout: Optional[float] = None) -> Clearance:
+        """Return a usable clearance, waiting for a solve if none is ready."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._pool = [clearance for clearance in self._pool if clearance.usable(now)]
+                if self._pool:
+                    # Drain the oldest clearance first; fresher ones wait as the reserve.
+                    clearance = self._pool[0]
+                    self._maybe_refresh(now)
+                    return clearance
+                if self._failures >= self.max_failures:
+                    raise ClearanceError(f"CAPTCHA solve failed {self._failures} times in a row") from self._last_error
+                self._start_solve(now)
+                remaining = None if deadline is None else deadline - now
+                if remaining is not None and remaining <= 0:
+                    raise ClearanceError("timed out waiting for a CAPTCHA clearance")
+                if now < self._retry_at:
+                    # Backing off after a failed solve: wake up when the next one may start.
+                    backoff = self._retry_at - now
+                    remaining = backoff if remaining is None else min(remaining, backoff)
+                self._cond.wait(remaining)
+
+    def record_view(self, clearance: Clearance) -> None:
+        """Count one detail served with ``clearance``."""
+        with self._cond:
+            clearance.views += 1
+            self.views += 1
+            self._maybe_refresh(time.monotonic())
+
+    def revoke(self, clearance: Clearance) -> None:
+        """Drop ``clearance`` after the server demanded a new CAPTCHA, learning its lifetime."""
+        with self._cond:
+            if clearance.revoked:
+                return
+            clearance.revoked = True
+            if self.expected_views is None:
+                self.expected_views = float(clearance.views)
+            else:
+                self.expected_views += self.smoothing * (clearance.views - self.expected_views)
+            logger.info("Clearance #%s revoked after %s views", clearance.ident, clearance.views)
+            self._pool = [item for item in self._pool if item is not clearance]
+            self._maybe_refresh(time.monotonic())
+
+    def add(self, cookies: Sequence[Mapping[str, Any]]) -> Clearance:
+        """Offer an already-solved session, e.g. the cookies harvested from a browser profile."""
+        now = time.monotonic()
+        cookies = [dict(cookie) for cookie in cookies]
+        with self._cond:
+            clearance = Clearance(next(self._ids), cookies, now, _cookie_expiry(cookies, now, self.lifetime))
+            self._pool.append(clearance)
+            self._cond.notify_all()
+            return clearance
+
+    # Solving -----------------------------------------------------------------------
+    def _worn(self, clearance: Clearance, now: float) -> bool:
+        lifetime = clearance.expires_at - clearance.solved_at
+        if now - clearance.solved_at >= self.refresh_at * lifetime:
+            return True
+        return self.expected_views is not None and clearance.views >= self.refresh_at * self.expected_views
+
+    def _maybe_refresh(self, now: float) -> None:
+        fresh = [clearance for clearance in self._pool if clearance.usable(now) and not self._worn(clearance, now)]
+        if len(fresh) < self.target and self._failures < self.max_failures:
+            self._start_solve(now)
+
+    def _start_solve(self, now: float) -> None:
+        if now < self._retry_at:
+            return
+        if self._solver is not None and self._solver.is_alive():
+            return
+        self._solver = threading.Thread(target=self._run_solve, name="captcha-solver", daemon=True)
+        self._solver.start()
+
+    def _run_solve(self) -> None:
+        try:
+            cookies = [dict(cookie) for cookie in self._solve()]
+        except Exception as exc:
+            logger.exception("CAPTCHA solve failed")
+            with self._cond:
+                self._failures += 1
+                self._last_error = exc
+                delay = min(self.max_retry_delay, self.retry_delay * 2 ** (self._failures - 1))
+                self._retry_at = time.monotonic() + delay
+                self._cond.notify_all()
+            return
+        now = time.monotonic()
+        with self._cond:
+            clearance = Clearance(next(self._ids), cookies, now, _cookie_expiry(cookies, now, self.lifetime))
+            self._pool.append(clearance)
+            self._failures = 0
+            self._retry_at = 0.0
+            self.solves += 1
+            logger.info("Clearance #%s ready (%s live)", clearance.ident, len(self._pool))
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "solves": self.solves,
+                "views": self.views,
+                "views_per_solve": self.views / self.solves if self.solves else None,
+                "expected_views": self.expected_views,
+                "live": len(self._pool),
+            }
+
+    def close(self) -> None:
+        """Wait for a solve in progress to finish."""
+        solver = self._solver
+        if solver is not None:
+            solver.join()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
+
+
+class BrowserClearances:
+    """Keep browser contexts seeded with the broker's current clearance.
+
+    Use :meth:`install` as a ``PagePool(setup_context=...)`` hook, call
+    :meth:`sync` before every page load (it adds the cookies of a newer
+    clearance once the broker has moved on), then :meth:`record_view` after a
+    detail arrived or :meth:`revoke` when the page shows a CAPTCHA wall. The
+    ``*_async`` methods do the same for ``playwright.async_api`` contexts.
+    """
+
+    def __init__(self, broker: ClearanceBroker, *, timeout: Optional[float] = None) -> None:
+        self.broker = broker
+        self.timeout = timeout
+        # Keyed by the context itself: a closed context's id() can be reused by the next one.
+        self._held: "weakref.WeakKeyDictionary[Any, Clearance]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _swap(self, context, lease: Clearance) -> bool:
+        """Record ``lease`` for ``context``; ``True`` if its cookies still have to be added."""
+        with self._lock:
+            if self._held.get(context) is lease:
+                return False
+            self._held[context] = lease
+            return True
+
+    def held(self, context) -> Optional[Clearance]:
+        with self._lock:
+            return self._held.get(context)
+
+    def install(self, context) -> None:
+        self.sync(context)
+
+    def sync(self, context) -> Clearance:
+        """Lease a clearance for ``context``, adding its cookies if the context does not hold it yet."""
+        lease = self.broker.lease(self.timeout)
+        if self._swap(context, lease):
+            context.add_cookies(lease.cookies)
+        return lease
+
+    async def install_async(self, context) -> None:
+        await self.sync_async(context)
+
+    async def sync_async(self, context) -> Clearance:
+        # lease() blocks while a solve runs; keep the event loop free meanwhile.
+        lease = await asyncio.to_thread(self.broker.lease, self.timeout)
+        if self._swap(context, lease):
+            await context.add_cookies(lease.cookies)
+        return lease
+
+    def record_view(self, context) -> None:
+        clearance = self.held(context)
+        if clearance is not None:
+            self.broker.record_view(clearance)
+
+    def revoke(self, context) -> None:
+        """The page behind ``context`` hit a CAPTCHA wall: drop its clearance so the next sync swaps it."""
+        with self._lock:
+            clearance = self._held.pop(context, None)
+        if clearance is not None:
+            self.broker.revoke(clearance)
+
+
+__all__ = [
+    "BrowserClearances",
+    "Clearance",
+    "ClearanceBroker",
+    "ClearanceError",
+    "DEFAULT_CLEARANCE_LIFETIME",
+    "DEFAULT_SOLVE_RETRY_DELAY",
+]
@@ -2,31 +2,296 @@
 
 from __future__ import annotations
 
-from contextlib import AbstractContextManager
-from typing import Iterable, List, Optional
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, TypeVar
 
 import httpx
 
+from .browser import unwrap_case_detail
+from .cache import SearchCache
 from .constants import BASE_URL
 from .models import CaseSummary, SearchWindow
+from .ratelimit import RateLimiter
+from .retry import RetryBudget, RetryPolicy
+from .serialization import decode_case_summaries, loads
+from .transport import build_async_http_client, build_async_transport, build_http_client, build_transport
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses the server answers with once a JSESSIONID has expired or been revoked.
+SESSION_REJECTED_STATUS_CODES = frozenset({401, 403, 440})
+
+# Unverified: inferred from the ``jsonPost/*`` naming of the search endpoint,
+# not captured from the detail page's own traffic. Check it against the
+# browser's network log before relying on the HTTP detail path.
+CASE_DETAIL_PATH = "/jsonPost/caseDetail"
+COOKIE_DOMAIN = "wicourts.gov"
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Content-Type": "application/json;charset=UTF-8",
+    "Origin": BASE_URL,
+    "Referer": f"{BASE_URL}/advanced.html",
+}
+
+
+def _search_payload(
+    *,
+    window: SearchWindow,
+    class_code: str,
+    include_missing_middle_name: bool,
+    include_missing_dob: bool,
+    attorney_type: str,
+) -> Dict[str, Any]:
+    return {
+        "includeMissingDob": include_missing_dob,
+        "includeMissingMiddleName": include_missing_middle_name,
+        "attyType": attorney_type,
+        "classCode": class_code,
+        "filingDate": window.as_payload(),
+    }
+
+
+def _extract_cases(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # A window with no matches may come back as ``{"result": null}``.
+    return (data.get("result") or {}).get("cases") or []
+
+
+def _decode_result(content: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        data = loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or "result" not in data:
+        return None
+    return data
+
+
+def _session_payload(response: httpx.Response, decode: Callable[[bytes], Optional[T]]) -> Optional[T]:
+    """Decode a ``jsonPost`` response, or return ``None`` if the session was rejected.
+
+    An expired session is answered with an auth status, a redirect back to the
+    search page, an HTML body instead of JSON, or JSON without a ``result``;
+    ``decode`` returns ``None`` for the last two.
+    """
+    if response.status_code in SESSION_REJECTED_STATUS_CODES or response.is_redirect:
+        return None
+    return decode(response.content)
+
+
+def _decode_case_detail(content: bytes) -> Optional[Dict[str, Any]]:
+    try:
+        data = loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    detail = unwrap_case_detail(data)
+    if detail is not None:
+        return detail
+    if b"captcha" in content.lower():
+        raise CaptchaRequiredError("case detail requires a solved CAPTCHA")
+    return None
+
+
+def _reject_seeded(url: str) -> None:
+    # A bootstrap would replace the browser cookies, and with them the solved
+    # CAPTCHA, by a fresh anonymous session; let the caller seed new ones.
+    raise CaptchaRequiredError(f"{url} rejected the browser cookies; seed a fresh clearance with use_cookies()")
+
+
+def _load_cookies(session: "_PooledSession", cookies: Iterable[Mapping[str, Any]]) -> None:
+    session.client.cookies.clear()
+    for cookie in cookies:
+        domain = cookie.get("domain") or ""
+        if COOKIE_DOMAIN in domain and cookie.get("value"):
+            session.client.cookies.set(cookie["name"], cookie["value"], domain=domain, path=cookie.get("path") or "/")
+    session.generation += 1
+    session.bootstrapped = True
+    session.seeded = True
+
+
+class SessionRejectedError(httpx.HTTPError):
+    """Raised when a session keeps being rejected even after re-bootstrapping."""
+
+
+class CaptchaRequiredError(SessionRejectedError):
+    """Raised when the server wants a freshly solved CAPTCHA before serving a case detail."""
+
+
+class _PooledSession:
+    """One cookie jar in a client's session pool."""
+
+    __slots__ = ("client", "lock", "bootstrapped", "generation", "seeded")
+
+    def __init__(self, client: Any, lock: Any) -> None:
+        self.client = client
+        self.lock = lock
+        self.bootstrapped = False
+        # Bumped on every bootstrap so concurrent callers that saw the same
+        # rejection trigger only one re-bootstrap.
+        self.generation = 0
+        # Set while the cookies come from use_cookies() rather than a bootstrap.
+        self.seeded = False
+
+    def invalidate(self, generation: int) -> None:
+        if self.generation == generation:
+            self.bootstrapped = False
+
+
+def _check_open(closed: bool) -> None:
+    if closed:
+        # Same error httpx raises for a closed client.
+        raise RuntimeError("Cannot send a request, as the client has been closed.")
+
+
+def _may_retry(policy: Optional[RetryPolicy], budget: Optional[RetryBudget], attempt: int) -> bool:
+    if policy is None or attempt >= policy.max_attempts:
+        return False
+    return budget is None or budget.consume()
 
 
 class WICourtClient(AbstractContextManager["WICourtClient"]):
-    """Thin wrapper around the ``jsonPost`` endpoints used by the UI."""
-
-    def __init__(self, *, timeout: float = 30.0) -> None:
-        self._client = httpx.Client(base_url=BASE_URL, timeout=timeout, headers={
-            "Accept": "application/json, text/plain, */*",
-            "Content-Type": "application/json;charset=UTF-8",
-            "Origin": BASE_URL,
-            "Referer": f"{BASE_URL}/advanced.html",
-        })
-        self._bootstrap()
-
-    def _bootstrap(self) -> None:
+    """Thin wrapper around the ``jsonPost`` endpoints used by the UI.
+
+    Requests are spread round-robin over ``sessions`` independently
+    bootstrapped cookie jars. A session the server rejects mid-run is
+    re-bootstrapped transparently and the request retried on it, up to
+    ``max_renewals`` times. All sessions share one connection pool
+    (``transport``, see :func:`wi_scraper.transport.build_transport`); pass the
+    same transport to several clients to reuse connections between them. A
+    caller-supplied transport is left open on :meth:`close`; the sessions are
+    only marked closed, since closing their ``httpx.Client`` would close it.
+
+    With ``keep_raw=False`` (and no cache, which stores raw rows) responses are
+    decoded straight into summaries via
+    :func:`wi_scraper.serialization.decode_case_summaries` and ``raw`` may be
+    left empty.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30.0,
+        cache: Optional[SearchCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = RetryPolicy(),
+        retry_budget: Optional[RetryBudget] = None,
+        sessions: int = 1,
+        max_renewals: int = 2,
+        transport: Optional[httpx.HTTPTransport] = None,
+        keep_raw: bool = True,
+    ) -> None:
+        if sessions < 1:
+            raise ValueError("sessions must be >= 1")
+        self._owns_transport = transport is None
+        transport = transport or build_transport()
+        self._sessions = [
+            _PooledSession(
+                build_http_client(headers=DEFAULT_HEADERS, transport=transport, timeout=timeout),
+                threading.Lock(),
+            )
+            for _ in range(sessions)
+        ]
+        self._rotation = itertools.cycle(self._sessions)
+        self._cache = cache
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._retry_budget = retry_budget
+        self._max_renewals = max_renewals
+        self._keep_raw = keep_raw
+        self._closed = False
+
+    def _send(self, client: httpx.Client, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        _check_open(self._closed)
+        attempt = 0
+        while True:
+            attempt += 1
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
+            try:
+                response = client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                # Connect errors, read timeouts and dropped connections.
+                if not _may_retry(self._retry_policy, self._retry_budget, attempt):
+                    raise
+                time.sleep(self._retry_policy.delay(attempt))
+                continue
+            if self._rate_limiter is not None:
+                self._rate_limiter.observe_status(response.status_code)
+            if (
+                self._retry_policy is not None
+                and self._retry_policy.should_retry_status(response.status_code)
+                and _may_retry(self._retry_policy, self._retry_budget, attempt)
+            ):
+                time.sleep(self._retry_policy.delay(attempt, response.headers.get("Retry-After")))
+                continue
+            if response.status_code not in SESSION_REJECTED_STATUS_CODES and not response.is_redirect:
+                response.raise_for_status()
+            return response
+
+    def _bootstrap(self, session: _PooledSession) -> None:
         # Prime cookies/session so subsequent POSTs are accepted.
-        response = self._client.get("/advanced.html")
-        response.raise_for_status()
+        session.client.cookies.clear()
+        self._send(session.client, "GET", "/advanced.html").raise_for_status()
+        session.generation += 1
+        session.bootstrapped = True
+        session.seeded = False
+
+    def _ensure_bootstrapped(self, session: _PooledSession) -> None:
+        if not session.bootstrapped:
+            with session.lock:
+                if not session.bootstrapped:
+                    self._bootstrap(session)
+
+    def _post(self, url: str, payload: Dict[str, Any], decode: Callable[[bytes], Optional[T]]) -> T:
+        session = next(self._rotation)
+        for _ in range(self._max_renewals + 1):
+            self._ensure_bootstrapped(session)
+            generation = session.generation
+            data = _session_payload(self._send(session.client, "POST", url, json=payload), decode)
+            if data is not None:
+                return data
+            if session.seeded:
+                _reject_seeded(url)
+            logger.info("Session rejected by %s; re-bootstrapping", url)
+            session.invalidate(generation)
+        raise SessionRejectedError(f"{url} still rejected the session after {self._max_renewals} re-bootstraps")
+
+    def use_cookies(self, cookies: Iterable[Mapping[str, Any]]) -> None:
+        """Adopt browser cookies (e.g. from :func:`wi_scraper.harvest_cookies`) on every session.
+
+        Sessions seeded this way skip the bootstrap request. If the server
+        later rejects one, it is not re-bootstrapped (that would throw the
+        solved CAPTCHA away); :class:`CaptchaRequiredError` is raised instead
+        and the session keeps the cookies until the next ``use_cookies`` call.
+        """
+        cookies = list(cookies)
+        for session in self._sessions:
+            with session.lock:
+                _load_cookies(session, cookies)
+
+    def case_detail(self, case_no: str, county_no: int) -> Dict[str, Any]:
+        """Fetch one case detail from :data:`CASE_DETAIL_PATH` (unverified, see there).
+
+        Raises :class:`CaptchaRequiredError` when the session needs a solved
+        CAPTCHA; seed it with :meth:`use_cookies` from a browser profile that
+        has one, or fall back to loading the page in a browser.
+        """
+        payload = {"caseNo": case_no, "countyNo": county_no}
+        try:
+            return self._post(CASE_DETAIL_PATH, payload, _decode_case_detail)
+        except CaptchaRequiredError:
+            if self._rate_limiter is not None:
+                self._rate_limiter.penalize()
+            raise
 
     def advanced_case_search(
         self,
@@ -37,24 +302,34 @@ class WICourtClient(AbstractContextManager["WICourtClient"]):
         include_missing_dob: bool = True,
         attorney_type: str = "partyAtty",
     ) -> List[CaseSummary]:
-        payload = {
-            "includeMissingDob": include_missing_dob,
-            "includeMissingMiddleName": include_missing_middle_name,
-            "attyType": attorney_type,
-            "classCode": class_code,
-            "filingDate": window.as_payload(),
-        }
-        response = self._client.post("/jsonPost/advancedCaseSearch", json=payload)
-        response.raise_for_status()
-        data = response.json()
-        result = data.get("result") or data.get("result", {}).get("result")  # defensive fallback
-        if not result:
-            return []
-        raw_cases = result.get("cases", [])
+        payload = _search_payload(
+            window=window,
+            class_code=class_code,
+            include_missing_middle_name=include_missing_middle_name,
+            include_missing_dob=include_missing_dob,
+            attorney_type=attorney_type,
+        )
+        if self._cache is None and not self._keep_raw:
+            return self._post(
+                "/jsonPost/advancedCaseSearch",
+                payload,
+                lambda content: decode_case_summaries(content, class_code),
+            )
+        raw_cases = self._cache.get(payload) if self._cache is not None else None
+        if raw_cases is None:
+            raw_cases = _extract_cases(self._post("/jsonPost/advancedCaseSearch", payload, _decode_result))
+            if self._cache is not None:
+                self._cache.put(payload, window, raw_cases)
         return [CaseSummary.from_api(item, class_code) for item in raw_cases]
 
     def close(self) -> None:  # pragma: no cover - trivial wrapper
-        self._client.close()
+        # Closing an httpx client closes its transport, which the sessions share.
+        # With a caller's transport the clients hold nothing else (just cookies),
+        # so refusing further requests is all that is left to do.
+        self._closed = True
+        if self._owns_transport:
+            for session in self._sessions:
+                session.client.close()
 
     # Context manager support -------------------------------------------------
     def __enter__(self) -> "WICourtClient":  # pragma: no cover - convenience
@@ -65,4 +340,165 @@ class WICourtClient(AbstractContextManager["WICourtClient"]):
         return None
 
 
-__all__ = ["WICourtClient"]
+class AsyncWICourtClient(AbstractAsyncContextManager["AsyncWICourtClient"]):
+    """Asyncio counterpart of :class:`WICourtClient` for concurrent sweeps.
+
+    Sessions are bootstrapped lazily on first use (or explicitly via
+    :meth:`bootstrap`) because ``__init__`` cannot await, and are pooled and
+    renewed exactly like the sync client's. Cache reads and writes are small
+    local file operations and run inline on the event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 30.0,
+        cache: Optional[SearchCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = RetryPolicy(),
+        retry_budget: Optional[RetryBudget] = None,
+        sessions: int = 1,
+        max_renewals: int = 2,
+        transport: Optional[httpx.AsyncHTTPTransport] = None,
+        keep_raw: bool = True,
+    ) -> None:
+        if sessions < 1:
+            raise ValueError("sessions must be >= 1")
+        self._owns_transport = transport is None
+        transport = transport or build_async_transport()
+        self._sessions = [
+            _PooledSession(
+                build_async_http_client(headers=DEFAULT_HEADERS, transport=transport, timeout=timeout),
+                asyncio.Lock(),
+            )
+            for _ in range(sessions)
+        ]
+        self._rotation = itertools.cycle(self._sessions)
+        self._cache = cache
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._retry_budget = retry_budget
+        self._max_renewals = max_renewals
+        self._keep_raw = keep_raw
+        self._closed = False
+
+    async def _send(self, client: httpx.AsyncClient, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        _check_open(self._closed)
+        attempt = 0
+        while True:
+            attempt += 1
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire_async()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if not _may_retry(self._retry_policy, self._retry_budget, attempt):
+                    raise
+                await asyncio.sleep(self._retry_policy.delay(attempt))
+                continue
+            if self._rate_limiter is not None:
+                self._rate_limiter.observe_status(response.status_code)
+            if (
+                self._retry_policy is not None
+                and self._retry_policy.should_retry_status(response.status_code)
+                and _may_retry(self._retry_policy, self._retry_budget, attempt)
+            ):
+                await asyncio.sleep(self._retry_policy.delay(attempt, response.headers.get("Retry-After")))
+                continue
+            if response.status_code not in SESSION_REJECTED_STATUS_CODES and not response.is_redirect:
+                response.raise_for_status()
+            return response
+
+    async def _bootstrap(self, session: _PooledSession) -> None:
+        # Prime cookies/session so subsequent POSTs are accepted. Concurrent
+        # callers on one session share a single bootstrap request.
+        async with session.lock:
+            if session.bootstrapped:
+                return
+            session.client.cookies.clear()
+            (await self._send(session.client, "GET", "/advanced.html")).raise_for_status()
+            session.generation += 1
+            session.bootstrapped = True
+            session.seeded = False
+
+    async def bootstrap(self) -> None:
+        await asyncio.gather(*(self._bootstrap(session) for session in self._sessions))
+
+    async def _post(self, url: str, payload: Dict[str, Any], decode: Callable[[bytes], Optional[T]]) -> T:
+        session = next(self._rotation)
+        for _ in range(self._max_renewals + 1):
+            if not session.bootstrapped:
+                await self._bootstrap(session)
+            generation = session.generation
+            data = _session_payload(await self._send(session.client, "POST", url, json=payload), decode)
+            if data is not None:
+                return data
+            if session.seeded:
+                _reject_seeded(url)
+            logger.info("Session rejected by %s; re-bootstrapping", url)
+            session.invalidate(generation)
+        raise SessionRejectedError(f"{url} still rejected the session after {self._max_renewals} re-bootstraps")
+
+    def use_cookies(self, cookies: Iterable[Mapping[str, Any]]) -> None:
+        """See :meth:`WICourtClient.use_cookies`."""
+        cookies = list(cookies)
+        for session in self._sessions:
+            _load_cookies(session, cookies)
+
+    async def case_detail(self, case_no: str, county_no: int) -> Dict[str, Any]:
+        """See :meth:`WICourtClient.case_detail`."""
+        payload = {"caseNo": case_no, "countyNo": county_no}
+        try:
+            return await self._post(CASE_DETAIL_PATH, payload, _decode_case_detail)
+        except CaptchaRequiredError:
+            if self._rate_limiter is not None:
+                self._rate_limiter.penalize()
+            raise
+
+    async def advanced_case_search(
+        self,
+        *,
+        window: SearchWindow,
+        class_code: str,
+        include_missing_middle_name: bool = True,
+        include_missing_dob: bool = True,
+        attorney_type: str = "partyAtty",
+    ) -> List[CaseSummary]:
+        payload = _search_payload(
+            window=window,
+            class_code=class_code,
+            include_missing_middle_name=include_missing_middle_name,
+            include_missing_dob=include_missing_dob,
+            attorney_type=attorney_type,
+        )
+        if self._cache is None and not self._keep_raw:
+            return await self._post(
+                "/jsonPost/advancedCaseSearch",
+                payload,
+                lambda content: decode_case_summaries(content, class_code),
+            )
+        raw_cases = self._cache.get(payload) if self._cache is not None else None
+        if raw_cases is None:
+            raw_cases = _extract_cases(
+                await self._post("/jsonPost/advancedCaseSearch", payload, _decode_result)
+            )
+            if self._cache is not None:
+                self._cache.put(payload, window, raw_cases)
+        return [CaseSummary.from_api(item, class_code) for item in raw_cases]
+
+    async def aclose(self) -> None:  # pragma: no cover - trivial wrapper
+        # See WICourtClient.close.
+        self._closed = True
+        if self._owns_transport:
+            await asyncio.gather(*(session.client.aclose() for session in self._sessions))
+
+    # Context manager support -------------------------------------------------
+    async def __aenter__(self) -> "AsyncWICourtClient":  # pragma: no cover - convenience
+        return self
+
+    async def __aexit__(self, *exc_info) -> Optional[bool]:  # pragma: no cover - convenience
+        await self.aclose()
+        return None
+
+
+__all__ = ["WICourtClient", "AsyncWICourtClient", "CaptchaRequiredError", "SessionRejectedError"]
@@ -0,0 +1,176 @@
+"""Columnar, memory-compact storage for aggregated case summaries."""
+
+from __future__ import annotations
+
+import zlib
+from array import array
+from collections.abc import MutableMapping
+from datetime import date
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from .models import AggregatedCase, CaseSummary
+from .serialization import dump_bytes, loads
+
+CaseKey = Tuple[str, int]
+
+
+class _SymbolTable:
+    """Map repeated strings (counties, statuses, class codes) to small integers."""
+
+    __slots__ = ("values", "_ids")
+
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+        self._ids: Dict[Any, int] = {}
+
+    def id_for(self, value: Any) -> int:
+        ident = self._ids.get(value)
+        if ident is None:
+            ident = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return ident
+
+
+class CompactCaseStore(MutableMapping):
+    """Drop-in replacement for the ``{(case_no, county_no): AggregatedCase}`` dict.
+
+    Rows are kept column by column in :mod:`array` buffers and plain lists.
+    County names, statuses, the first matching class code and each distinct
+    set of class codes are stored once in symbol tables and referenced by
+    index. ``raw`` payloads are zlib-compressed JSON, or dropped entirely
+    with ``keep_raw=False``. Lookups return a freshly built
+    :class:`AggregatedCase`; mutate the store via ``store[key] = case``,
+    :meth:`add_class_codes` or :func:`wi_scraper.merge_aggregated`, not by
+    editing a returned case. Iteration follows insertion order like a dict.
+    Deleting a case frees its strings and ``raw`` blob at once; its column
+    slot is reused by the next new case.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[AggregatedCase] = (),
+        *,
+        keep_raw: bool = True,
+        compression_level: int = 6,
+    ) -> None:
+        self.keep_raw = keep_raw
+        self.compression_level = compression_level
+        self._rows: Dict[CaseKey, int] = {}
+        self._case_no: List[str] = []
+        self._county_no = array("I")
+        self._caption: List[str] = []
+        self._party_name: List[str] = []
+        self._dob: List[Optional[str]] = []
+        self._sealed = bytearray()
+        # Proleptic ordinal of the filing date; 0 means unknown.
+        self._filing = array("I")
+        self._county_name = array("I")
+        self._status = array("I")
+        self._class_code = array("I")
+        self._code_set = array("I")
+        self._raw: List[Optional[bytes]] = []
+        # Rows of deleted cases, handed out again before the columns grow.
+        self._free: List[int] = []
+        self._symbols = _SymbolTable()
+        self._code_sets = _SymbolTable()
+        for item in items:
+            self[item.key()] = item
+
+    # Encoding ----------------------------------------------------------------
+    def _encode_raw(self, raw: Dict[str, Any]) -> Optional[bytes]:
+        if not self.keep_raw or not raw:
+            return None
+        return zlib.compress(dump_bytes(raw), self.compression_level)
+
+    def _write_row(self, row: int, item: AggregatedCase) -> None:
+        summary = item.summary
+        values = (
+            (self._case_no, summary.case_no),
+            (self._county_no, summary.county_no),
+            (self._caption, summary.caption),
+            (self._party_name, summary.party_name),
+            (self._dob, summary.dob),
+            (self._sealed, int(summary.is_dob_sealed)),
+            (self._filing, summary.filing_date.toordinal() if summary.filing_date else 0),
+            (self._county_name, self._symbols.id_for(summary.county_name)),
+            (self._status, self._symbols.id_for(summary.status)),
+            (self._class_code, self._symbols.id_for(summary.class_code)),
+            (self._code_set, self._code_sets.id_for(frozenset(item.class_codes))),
+            (self._raw, self._encode_raw(summary.raw)),
+        )
+        if row == len(self._case_no):
+            for column, value in values:
+                column.append(value)
+        else:
+            for column, value in values:
+                column[row] = value
+
+    def _read_row(self, row: int) -> AggregatedCase:
+        symbols = self._symbols.values
+        blob = self._raw[row]
+        ordinal = self._filing[row]
+        summary = CaseSummary(
+            case_no=self._case_no[row],
+            caption=self._caption[row],
+            county_name=symbols[self._county_name[row]],
+            county_no=self._county_no[row],
+            party_name=self._party_name[row],
+            status=symbols[self._status[row]],
+            filing_date=date.fromordinal(ordinal) if ordinal else None,
+            class_code=symbols[self._class_code[row]],
+            dob=self._dob[row],
+            is_dob_sealed=bool(self._sealed[row]),
+            raw=loads(zlib.decompress(blob)) if blob is not None else {},
+        )
+        return AggregatedCase(summary=summary, class_codes=set(self._code_sets.values[self._code_set[row]]))
+
+    # Mapping protocol ----------------------------------------------------------
+    def __getitem__(self, key: CaseKey) -> AggregatedCase:
+        return self._read_row(self._rows[key])
+
+    def __setitem__(self, key: CaseKey, item: AggregatedCase) -> None:
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = self._free.pop() if self._free else len(self._case_no)
+        self._write_row(row, item)
+
+    def __delitem__(self, key: CaseKey) -> None:
+        row = self._rows.pop(key)
+        # Drop the per-row objects now; the fixed-width slots wait for the next insert.
+        self._case_no[row] = ""
+        self._caption[row] = ""
+        self._party_name[row] = ""
+        self._dob[row] = None
+        self._raw[row] = None
+        self._free.append(row)
+
+    def __iter__(self) -> Iterator[CaseKey]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+    # Aggregation -----------------------------------------------------------------
+    def class_codes(self, key: CaseKey) -> FrozenSet[str]:
+        return self._code_sets.values[self._code_set[self._rows[key]]]
+
+    def add_class_codes(self, key: CaseKey, codes: Iterable[str]) -> None:
+        row = self._rows[key]
+        current = self._code_sets.values[self._code_set[row]]
+        merged = current.union(codes)
+        if merged != current:
+            self._code_set[row] = self._code_sets.id_for(merged)
+
+    def merge(self, batch: Dict[CaseKey, AggregatedCase]) -> None:
+        """Fold ``batch`` in, unioning class codes of cases already stored."""
+        for key, item in batch.items():
+            if key in self._rows:
+                self.add_class_codes(key, item.class_codes)
+            else:
+                self[key] = item
+
+
+__all__ = ["CompactCaseStore"]
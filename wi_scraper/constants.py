@@ -7,6 +7,10 @@ from typing import Tuple
 
 BASE_URL = "https://wcca.wicourts.gov"
 
+# Number of rows at which an advancedCaseSearch response is treated as
+# truncated by the server. Adjust if WCCA changes its per-query limit.
+DEFAULT_RESULT_CAP = 1000
+
 @dataclass(frozen=True)
 class ClassCode:
     code: str
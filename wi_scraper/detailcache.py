@@ -0,0 +1,130 @@
+"""Skip re-fetching case details whose summary row has not changed."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import AbstractContextManager
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .serialization import dumps, loads
+
+# Summary fields whose change means the case moved on and its detail is stale.
+DEFAULT_SIGNATURE_FIELDS = ("status", "caption", "party_name", "filing_date", "class_codes")
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detail_cache (
+    case_no    TEXT    NOT NULL,
+    county_no  INTEGER NOT NULL,
+    signature  TEXT    NOT NULL,
+    detail     TEXT    NOT NULL,
+    fetched_at REAL    NOT NULL,
+    PRIMARY KEY (case_no, county_no)
+);
+"""
+
+_UPSERT = """
+INSERT INTO detail_cache (case_no, county_no, signature, detail, fetched_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (case_no, county_no) DO UPDATE SET
+    signature = excluded.signature,
+    detail = excluded.detail,
+    fetched_at = excluded.fetched_at
+"""
+
+
+def case_signature(case: Mapping[str, Any], fields: Sequence[str] = DEFAULT_SIGNATURE_FIELDS) -> str:
+    """Digest of the summary ``fields`` of a flattened case row (see :func:`wi_scraper.serialise_case`)."""
+    values = {name: case.get(name) for name in fields}
+    canonical = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DetailCache(AbstractContextManager["DetailCache"]):
+    """SQLite cache of detail payloads keyed by ``(case_no, county_no)``.
+
+    Each entry remembers the :func:`case_signature` of the summary row it
+    was fetched for. :meth:`get` only returns it while the current summary
+    has the same signature and the entry is younger than ``max_age``, so a
+    rerun over the same window re-fetches just the cases that changed status,
+    caption, parties or class codes, plus the ones due for a refresh.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+        fields: Sequence[str] = DEFAULT_SIGNATURE_FIELDS,
+    ) -> None:
+        self.path = Path(path)
+        self.max_age = max_age
+        self.fields = tuple(fields)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Browser workers store results from their own threads.
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, case: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached detail for ``case`` if it is still current, else ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT signature, detail, fetched_at FROM detail_cache WHERE case_no = ? AND county_no = ?",
+                (case["case_no"], int(case["county_no"])),
+            ).fetchone()
+            fresh = (
+                row is not None
+                and row[0] == case_signature(case, self.fields)
+                and time.time() - row[2] < self.max_age.total_seconds()
+            )
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return loads(row[1]) if fresh else None
+
+    def partition(
+        self, cases: Iterable[Mapping[str, Any]]
+    ) -> Tuple[List[Tuple[Mapping[str, Any], Dict[str, Any]]], List[Mapping[str, Any]]]:
+        """Split ``cases`` into ``(case, cached detail)`` hits and cases that need fetching."""
+        hits: List[Tuple[Mapping[str, Any], Dict[str, Any]]] = []
+        misses: List[Mapping[str, Any]] = []
+        for case in cases:
+            detail = self.get(case)
+            if detail is None:
+                misses.append(case)
+            else:
+                hits.append((case, detail))
+        return hits, misses
+
+    def put(self, case: Mapping[str, Any], detail: Mapping[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                _UPSERT,
+                (
+                    case["case_no"],
+                    int(case["county_no"]),
+                    case_signature(case, self.fields),
+                    dumps(detail),
+                    time.time(),
+                ),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
+
+
+__all__ = ["DEFAULT_MAX_AGE", "DEFAULT_SIGNATURE_FIELDS", "DetailCache", "case_signature"]
@@ -0,0 +1,75 @@
+"""Checkpoint journal that makes summary sweeps resumable."""
+
+from __future__ import annotations
+
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import SearchWindow
+from .serialization import dumps, loads
+
+UnitKey = Tuple[str, str, str]
+
+
+def _unit_key(window: SearchWindow, class_code: str) -> UnitKey:
+    return window.start.isoformat(), window.end.isoformat(), class_code
+
+
+class SweepJournal(AbstractContextManager["SweepJournal"]):
+    """Append-only NDJSON log of finished (window, class code) search units.
+
+    Every completed search is written as one line holding the window, the
+    class code and the raw ``cases`` array, and flushed immediately. Opening an
+    existing journal loads those units so a restarted sweep can replay them
+    instead of re-querying; a partially written trailing line from a crash is
+    ignored. Replayed units are released from memory once consumed.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._done: Dict[UnitKey, List[Dict[str, Any]]] = {}
+        if self.path.exists():
+            self._load()
+        self._handle = self.path.open("a", encoding="utf-8")
+        if self._handle.tell() and not self._ends_with_newline():
+            # Terminate a line cut short by a crash so new entries stay parseable.
+            self._handle.write("\n")
+
+    def _ends_with_newline(self) -> bool:
+        with self.path.open("rb") as handle:
+            handle.seek(-1, 2)
+            return handle.read(1) == b"\n"
+
+    def _load(self) -> None:
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = loads(line)
+                except ValueError:
+                    continue
+                key = (entry["start"], entry["end"], entry["class_code"])
+                self._done[key] = entry.get("cases", [])
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def replay(self, window: SearchWindow, class_code: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the raw cases recorded for a finished unit, or ``None``."""
+        return self._done.pop(_unit_key(window, class_code), None)
+
+    def record(self, window: SearchWindow, class_code: str, cases: List[Dict[str, Any]]) -> None:
+        start, end, code = _unit_key(window, class_code)
+        entry = {"start": start, "end": end, "class_code": code, "cases": cases}
+        self._handle.write(dumps(entry) + "\n")
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
+
+
+__all__ = ["SweepJournal"]
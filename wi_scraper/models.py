@@ -3,10 +3,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import date
-from typing import Any, Dict, Optional, Set, Tuple
+from datetime import date, timedelta
+from typing import Any, ClassVar, Dict, Optional, Set, Tuple
 
-from .utils import parse_date
+from .utils import intern_str, parse_date
 
 
 @dataclass(frozen=True)
@@ -22,8 +22,22 @@ class SearchWindow:
             "end": self.end.strftime("%m-%d-%Y"),
         }
 
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def split(self) -> Tuple["SearchWindow", "SearchWindow"]:
+        """Split into two adjacent halves; the first half gets the extra day."""
+        if self.days < 2:
+            raise ValueError("cannot split a single-day window")
+        first_end = self.start + timedelta(days=(self.days + 1) // 2 - 1)
+        return (
+            SearchWindow(self.start, first_end),
+            SearchWindow(first_end + timedelta(days=1), self.end),
+        )
+
 
-@dataclass
+@dataclass(slots=True)
 class CaseSummary:
     """Normalized view of a case row returned by the API."""
 
@@ -45,19 +59,35 @@ class CaseSummary:
         return cls(
             case_no=payload["caseNo"],
             caption=payload.get("caption", ""),
-            county_name=payload.get("countyName", ""),
+            county_name=intern_str(payload.get("countyName", "")),
             county_no=int(payload.get("countyNo", 0) or 0),
             party_name=payload.get("partyName", ""),
-            status=payload.get("status", ""),
+            status=intern_str(payload.get("status", "")),
             filing_date=filing,
-            class_code=class_code,
+            class_code=intern_str(class_code),
             dob=payload.get("dob"),
             is_dob_sealed=bool(payload.get("isDobSealed")),
             raw=payload,
         )
 
+    def to_api(self) -> Dict[str, Any]:
+        """Return ``raw``, or rebuild the API row from the normalized fields when it was not kept."""
+        if self.raw:
+            return self.raw
+        return {
+            "caseNo": self.case_no,
+            "caption": self.caption,
+            "countyName": self.county_name,
+            "countyNo": self.county_no,
+            "partyName": self.party_name,
+            "status": self.status,
+            "filingDate": self.filing_date.isoformat() if self.filing_date else None,
+            "dob": self.dob,
+            "isDobSealed": self.is_dob_sealed,
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class AggregatedCase:
     """Represents a merged case potentially returned by multiple class-code searches."""
 
@@ -71,4 +101,26 @@ class AggregatedCase:
         self.class_codes.add(code)
 
 
-__all__ = ["SearchWindow", "CaseSummary", "AggregatedCase"]
+@dataclass(frozen=True)
+class CaseEvent:
+    """A newly discovered case, or a class code found for a case reported earlier.
+
+    ``CASE`` events carry the summary of the first row seen for the case.
+    ``MERGE`` events only identify the case and the class code that matched it
+    again; consumers should union the code into what they already stored.
+    """
+
+    CASE: ClassVar[str] = "case"
+    MERGE: ClassVar[str] = "merge"
+
+    kind: str
+    case_no: str
+    county_no: int
+    class_code: str
+    summary: Optional[CaseSummary] = None
+
+    def key(self) -> Tuple[str, int]:
+        return self.case_no, self.county_no
+
+
+__all__ = ["SearchWindow", "CaseSummary", "AggregatedCase", "CaseEvent"]
@@ -0,0 +1,307 @@
+"""Run browser tasks over a pool of reusable Playwright pages, one per worker thread."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+try:  # pragma: no cover - optional dependency
+    from playwright.sync_api import sync_playwright
+except ImportError:  # pragma: no cover - optional dependency
+    sync_playwright = None
+
+from .browser import DetailCapture
+from .clearance import ClearanceError
+
+logger = logging.getLogger(__name__)
+
+# How long a person gets to solve a CAPTCHA in a visible browser.
+DEFAULT_SOLVE_TIMEOUT = 120.0
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+ErrorHandler = Callable[[T, BaseException], R]
+
+
+def _require_playwright() -> None:
+    if sync_playwright is None:
+        raise ImportError("Browser scraping requires playwright; install it with `pip install playwright`")
+
+
+def harvest_cookies(profile: Path | str, *, headless: bool = True, **launch_options: Any) -> List[Dict[str, Any]]:
+    """Read the cookies (e.g. a solved-CAPTCHA session) stored in a persistent browser profile."""
+    _require_playwright()
+    with sync_playwright() as p:
+        context = p.chromium.launch_persistent_context(str(profile), headless=headless, **launch_options)
+        try:
+            return context.cookies()
+        finally:
+            context.close()
+
+
+def solve_clearance(
+    url: str,
+    *,
+    headless: bool = False,
+    timeout: float = DEFAULT_SOLVE_TIMEOUT,
+    prepare: Optional[Callable[[Any], None]] = None,
+    launch_options: Optional[Mapping[str, Any]] = None,
+    context_options: Optional[Mapping[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Open a case-detail ``url`` in a fresh browser and return its cookies once the CAPTCHA is cleared.
+
+    The CAPTCHA counts as cleared when the page's detail XHR arrives, whether
+    ``prepare(page)`` (e.g. a click on the bypass link) or a person at the
+    visible window got it there. Meant as a :class:`~wi_scraper.ClearanceBroker`
+    ``solve`` callback; raises :class:`~wi_scraper.ClearanceError` on timeout.
+    """
+    _require_playwright()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless, **dict(launch_options or {}))
+        try:
+            context = browser.new_context(**dict(context_options or {}))
+            page = context.new_page()
+            capture = DetailCapture(page)
+            page.goto(url, wait_until="domcontentloaded")
+            if prepare is not None:
+                prepare(page)
+            if capture.wait(timeout=timeout) is None:
+                raise ClearanceError(f"the CAPTCHA on {url} was not cleared within {timeout:.0f}s")
+            return context.cookies()
+        finally:
+            browser.close()
+
+
+class PagePool:
+    """Feed items from a queue to ``workers`` threads, each driving one reusable page.
+
+    The sync Playwright API is bound to the thread that started it, so every
+    worker runs its own Playwright instance and browser. With one worker and a
+    ``profile`` the persistent profile is used directly, exactly like a single
+    ``launch_persistent_context`` loop. With more workers the profile's
+    cookies are harvested once and loaded into every worker's fresh context,
+    since a profile directory can only be opened by one browser at a time.
+
+    A task that raises only fails its own item: the error goes to
+    ``on_error`` (default: log and yield ``None``) and the worker carries on
+    with a fresh page. A worker whose browser cannot start leaves its items to
+    the others. ``setup_context`` runs on every new context, e.g. to install
+    request routing.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        *,
+        profile: Optional[Path | str] = None,
+        cookies: Optional[Iterable[Mapping[str, Any]]] = None,
+        headless: bool = True,
+        launch_options: Optional[Mapping[str, Any]] = None,
+        context_options: Optional[Mapping[str, Any]] = None,
+        setup_context: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self.profile = Path(profile) if profile is not None else None
+        self.cookies = list(cookies) if cookies is not None else None
+        self.headless = headless
+        self.launch_options = dict(launch_options or {})
+        self.context_options = dict(context_options or {})
+        self.setup_context = setup_context
+
+    # Browser lifecycle -----------------------------------------------------------
+    def _shared_cookies(self) -> List[Dict[str, Any]]:
+        if self.cookies is None:
+            self.cookies = (
+                harvest_cookies(self.profile, headless=True, **self.launch_options) if self.profile else []
+            )
+        return self.cookies
+
+    def _open_context(self, playwright) -> Tuple[Any, Any]:
+        """Return ``(context, browser)``; ``browser`` is ``None`` for a persistent context."""
+        if self.profile is not None and self.workers == 1 and self.cookies is None:
+            context = playwright.chromium.launch_persistent_context(
+                str(self.profile), headless=self.headless, **self.launch_options, **self.context_options
+            )
+            browser = None
+        else:
+            browser = playwright.chromium.launch(headless=self.headless, **self.launch_options)
+            context = browser.new_context(**self.context_options)
+            if self.cookies:
+                context.add_cookies(self.cookies)
+        if self.setup_context is not None:
+            self.setup_context(context)
+        return context, browser
+
+    # Work distribution -----------------------------------------------------------
+    def _work(
+        self,
+        next_item: Callable[[], Optional[Tuple[int, T]]],
+        task: Callable[[Any, T], R],
+        on_error: Optional[ErrorHandler],
+        deliver: Callable[[int, R], None],
+        stop: threading.Event,
+    ) -> None:
+        try:
+            with sync_playwright() as playwright:
+                context, browser = self._open_context(playwright)
+                page = context.new_page()
+                try:
+                    while not stop.is_set():
+                        job = next_item()
+                        if job is None:
+                            return
+                        index, item = job
+                        try:
+                            deliver(index, task(page, item))
+                        except Exception as exc:
+                            deliver(index, self._failed(item, exc, on_error))
+                            # The page may be mid-navigation or crashed; start the next item clean.
+                            page = self._replace_page(context, page)
+                finally:
+                    context.close()
+                    if browser is not None:
+                        browser.close()
+        except Exception:
+            logger.exception("Browser worker %s stopped", threading.current_thread().name)
+
+    @staticmethod
+    def _failed(item: T, exc: BaseException, on_error: Optional[ErrorHandler]) -> Any:
+        if on_error is not None:
+            return on_error(item, exc)
+        logger.error("Browser task failed for %r: %s", item, exc)
+        return None
+
+    @staticmethod
+    def _replace_page(context, page):
+        try:
+            page.close()
+        except Exception:
+            pass
+        return context.new_page()
+
+    def imap(
+        self,
+        task: Callable[[Any, T], R],
+        items: Iterable[T],
+        *,
+        on_error: Optional[ErrorHandler] = None,
+    ) -> Iterator[R]:
+        """Run ``task(page, item)`` for every item, yielding results in input order as they finish."""
+        _require_playwright()
+        items = list(items)
+        if not items:
+            return
+        if self.profile is not None and self.workers > 1:
+            self._shared_cookies()
+
+        jobs: "queue.Queue[Tuple[int, T]]" = queue.Queue()
+        for index, item in enumerate(items):
+            jobs.put((index, item))
+
+        def next_item() -> Optional[Tuple[int, T]]:
+            try:
+                return jobs.get_nowait()
+            except queue.Empty:
+                return None
+
+        done: Dict[int, R] = {}
+        ready = threading.Condition()
+        stop = threading.Event()
+
+        def deliver(index: int, result: R) -> None:
+            with ready:
+                done[index] = result
+                ready.notify_all()
+
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(next_item, task, on_error, deliver, stop),
+                name=f"page-worker-{number}",
+                daemon=True,
+            )
+            for number in range(min(self.workers, len(items)))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for index, item in enumerate(items):
+                with ready:
+                    while index not in done and any(thread.is_alive() for thread in threads):
+                        ready.wait(timeout=1.0)
+                    if index in done:
+                        result = done.pop(index)
+                    else:
+                        result = self._failed(item, RuntimeError("no browser worker left to run this item"), on_error)
+                yield result
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def drain(
+        self,
+        task: Callable[[Any, T], Any],
+        claim: Callable[[], Optional[T]],
+        *,
+        on_error: Optional[ErrorHandler] = None,
+    ) -> int:
+        """Run ``task(page, item)`` on items pulled from ``claim()`` until it returns ``None``.
+
+        For work that lives outside the process (e.g. a
+        :class:`~wi_scraper.workqueue.DetailWorkQueue`): each worker claims its
+        next item only once its page is free, and ``task`` records its own
+        result. Returns the number of items processed.
+        """
+        _require_playwright()
+        if self.profile is not None and self.workers > 1:
+            self._shared_cookies()
+
+        counter = itertools.count()
+        processed = itertools.count()
+        stop = threading.Event()
+
+        def next_item() -> Optional[Tuple[int, T]]:
+            item = claim()
+            return None if item is None else (next(counter), item)
+
+        def deliver(index: int, result: Any) -> None:
+            next(processed)
+
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(next_item, task, on_error, deliver, stop),
+                name=f"page-worker-{number}",
+                daemon=True,
+            )
+            for number in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        finally:
+            # On Ctrl-C do not wait: a worker may be blocked on a prompt. Unsettled claims stay with the caller.
+            stop.set()
+        return next(processed)
+
+    def map(
+        self,
+        task: Callable[[Any, T], R],
+        items: Iterable[T],
+        *,
+        on_error: Optional[ErrorHandler] = None,
+    ) -> List[R]:
+        return list(self.imap(task, items, on_error=on_error))
+
+
+__all__ = ["DEFAULT_SOLVE_TIMEOUT", "PagePool", "harvest_cookies", "solve_clearance"]
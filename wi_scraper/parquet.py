@@ -0,0 +1,196 @@
+"""Columnar Parquet export for case summaries and party rows.
+
+Requires the optional ``pyarrow`` package (``pip install pyarrow``).
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .models import AggregatedCase
+from .serialization import dumps
+
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+DEFAULT_ROW_GROUP_SIZE = 50_000
+# Detail scrapers produce a few rows per second at most; write what arrived at least this often.
+DETAIL_FLUSH_INTERVAL = 60.0
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet export requires pyarrow; install it with `pip install pyarrow`")
+
+
+def _categorical() -> "pa.DataType":
+    # Low-cardinality strings are stored once per row group and referenced by index.
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def case_schema(*, include_raw: bool = True) -> "pa.Schema":
+    """Arrow schema for :class:`ParquetCaseWriter` rows."""
+    _require_pyarrow()
+    fields = [
+        pa.field("case_no", pa.string(), nullable=False),
+        pa.field("county_no", pa.int32(), nullable=False),
+        pa.field("county_name", _categorical()),
+        pa.field("caption", pa.string()),
+        pa.field("party_name", pa.string()),
+        pa.field("status", _categorical()),
+        pa.field("filing_date", pa.date32()),
+        pa.field("dob", pa.string()),
+        pa.field("is_dob_sealed", pa.bool_()),
+        pa.field("class_codes", pa.list_(_categorical())),
+    ]
+    if include_raw:
+        fields.append(pa.field("raw", pa.string()))
+    return pa.schema(fields)
+
+
+def party_schema() -> "pa.Schema":
+    """Arrow schema for the flattened party rows written by the detail scrapers."""
+    _require_pyarrow()
+    return pa.schema(
+        [
+            pa.field("case_no", pa.string()),
+            pa.field("county_no", pa.int32()),
+            pa.field("county_name", _categorical()),
+            pa.field("caption", pa.string()),
+            pa.field("party_name", pa.string()),
+            pa.field("party_type", _categorical()),
+            pa.field("address", pa.string()),
+            pa.field("dob", pa.string()),
+            pa.field("is_dob_sealed", pa.bool_()),
+            pa.field("role_status", _categorical()),
+        ]
+    )
+
+
+class ParquetRowWriter(AbstractContextManager["ParquetRowWriter"]):
+    """Buffer rows column by column and write them to Parquet in row groups.
+
+    Every ``row_group_size`` rows, or on the first write once
+    ``flush_interval`` seconds have passed since the last row group, the
+    buffer is converted to an Arrow table and appended to the file as one row
+    group, so memory stays bounded and a sweep can be exported as it runs.
+    Missing keys are written as nulls.
+
+    Parquet keeps its metadata in a footer that only :meth:`close` writes.
+    Until then the file cannot be read, and a process that is killed before
+    closing it loses everything written to it. Pair it with an NDJSON or CSV
+    sink when the output has to survive a crash.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        schema: "pa.Schema",
+        *,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = "zstd",
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        _require_pyarrow()
+        self.path = Path(path)
+        self.schema = schema
+        self.row_group_size = max(1, row_group_size)
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+        self._buffered = 0
+        self._flushed_at = time.monotonic()
+        self._writer = pq.ParquetWriter(self.path, schema, compression=compression)
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        for name, column in self._columns.items():
+            column.append(row.get(name))
+        self._buffered += 1
+        self.count += 1
+        if self._buffered >= self.row_group_size or (
+            self.flush_interval is not None and time.monotonic() - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def write_many(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def flush(self) -> None:
+        """Write buffered rows out as a row group."""
+        self._flushed_at = time.monotonic()
+        if not self._buffered:
+            return
+        table = pa.Table.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self._buffered)
+        for column in self._columns.values():
+            column.clear()
+        self._buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
+
+
+class ParquetCaseWriter(ParquetRowWriter):
+    """Export aggregated cases; ``raw`` is kept as a JSON string column unless disabled."""
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        include_raw: bool = True,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = "zstd",
+    ) -> None:
+        super().__init__(
+            path,
+            case_schema(include_raw=include_raw),
+            row_group_size=row_group_size,
+            compression=compression,
+        )
+        self.include_raw = include_raw
+
+    def write_case(self, item: AggregatedCase) -> None:
+        summary = item.summary
+        self.write(
+            {
+                "case_no": summary.case_no,
+                "county_no": summary.county_no,
+                "county_name": summary.county_name,
+                "caption": summary.caption,
+                "party_name": summary.party_name,
+                "status": summary.status,
+                "filing_date": summary.filing_date,
+                "dob": summary.dob,
+                "is_dob_sealed": summary.is_dob_sealed,
+                "class_codes": sorted(item.class_codes),
+                "raw": dumps(summary.raw) if self.include_raw and summary.raw else None,
+            }
+        )
+
+    def write_batch(self, batch: Mapping[Tuple[str, int], AggregatedCase]) -> None:
+        """Append one window's aggregated cases (usable as a sweep ``on_batch`` sink)."""
+        for item in batch.values():
+            self.write_case(item)
+
+
+__all__ = [
+    "DEFAULT_ROW_GROUP_SIZE",
+    "DETAIL_FLUSH_INTERVAL",
+    "ParquetCaseWriter",
+    "ParquetRowWriter",
+    "case_schema",
+    "party_schema",
+]
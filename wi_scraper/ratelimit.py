@@ -0,0 +1,122 @@
+"""Shared token-bucket rate limiter for HTTP and browser request loops."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+# Responses that mean "slow down" rather than "this request is wrong".
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+
+
+class RateLimiter:
+    """Token bucket with additive-increase / multiplicative-decrease adaptation.
+
+    ``rate`` is the target requests per second and ``burst`` the bucket size.
+    Callers take a token with :meth:`acquire` (or :meth:`acquire_async`) before
+    every request or page load, then report back: :meth:`penalize` on a 429/503
+    or a CAPTCHA wall halves the current rate (down to ``min_rate``), and each
+    :meth:`reward` adds ``recovery * rate`` back until the target is reached.
+    Penalties arriving within ``penalty_cooldown`` seconds of the previous one
+    count once, so a burst of in-flight requests failing together does not
+    collapse the rate.
+
+    One instance is safe to share between threads; the async variant shares the
+    same bucket so a mixed sync/async process is paced as a whole.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        *,
+        min_rate: float = 0.05,
+        backoff: float = 0.5,
+        recovery: float = 0.05,
+        penalty_cooldown: float = 5.0,
+        jitter: float = 0.0,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if burst < 1:
+            raise ValueError("burst must be >= 1")
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.backoff = backoff
+        self.recovery = recovery
+        self.penalty_cooldown = penalty_cooldown
+        self.jitter = jitter
+        self._rate = rate
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._last_penalty = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def _reserve(self) -> float:
+        """Take one token, returning how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if self.jitter:
+            wait += random.uniform(0, self.jitter)
+        return wait
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the time slept."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_penalty < self.penalty_cooldown:
+                return
+            self._last_penalty = now
+            self._rate = max(self.min_rate, self._rate * self.backoff)
+            self._tokens = min(self._tokens, 0.0)
+
+    def reward(self) -> None:
+        with self._lock:
+            if self._rate < self.max_rate:
+                self._rate = min(self.max_rate, self._rate + self.max_rate * self.recovery)
+
+    def observe_status(self, status_code: int) -> None:
+        """Adapt to an HTTP status: throttle codes penalize, successes reward."""
+        if status_code in THROTTLE_STATUS_CODES:
+            self.penalize()
+        elif status_code < 400:
+            self.reward()
+
+
+def build_rate_limiter(
+    rate: Optional[float],
+    burst: int = 1,
+    *,
+    jitter: float = 0.0,
+) -> Optional[RateLimiter]:
+    """Return a limiter for CLI-style settings, or ``None`` when ``rate`` is unset/zero."""
+    if not rate:
+        return None
+    return RateLimiter(rate, burst, jitter=jitter)
+
+
+__all__ = ["RateLimiter", "THROTTLE_STATUS_CODES", "build_rate_limiter"]
@@ -2,15 +2,40 @@
 
 from __future__ import annotations
 
-from collections import OrderedDict
+import asyncio
+import logging
+from collections import OrderedDict, deque
 from datetime import date
-from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from itertools import groupby
+from typing import (
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
-from .client import WICourtClient
-from .constants import ClassCode, DEFAULT_CLASS_CODES
-from .models import AggregatedCase, SearchWindow
+import httpx
+
+from .adaptive import AdaptiveWindowPlanner
+from .client import AsyncWICourtClient, WICourtClient
+from .compact import CompactCaseStore
+from .constants import ClassCode, DEFAULT_CLASS_CODES, DEFAULT_RESULT_CAP
+from .journal import SweepJournal
+from .models import AggregatedCase, CaseEvent, CaseSummary, SearchWindow
 from .utils import iter_windows
 
+DEFAULT_CONCURRENCY = 8
+
+logger = logging.getLogger(__name__)
+
 
 def build_windows(
     *,
@@ -23,6 +48,312 @@ def build_windows(
         yield SearchWindow(window_start, window_end)
 
 
+def _merge_summaries(
+    aggregated: Dict[Tuple[str, int], AggregatedCase],
+    summaries: Iterable[CaseSummary],
+    class_code: str,
+) -> None:
+    for summary in summaries:
+        key = (summary.case_no, summary.county_no)
+        if key not in aggregated:
+            aggregated[key] = AggregatedCase(summary=summary)
+        aggregated[key].add_class_code(class_code)
+
+
+def _build_planners(
+    class_codes: Sequence[ClassCode],
+    *,
+    adaptive: bool,
+    span_days: int,
+    result_cap: int,
+) -> Optional[Dict[str, AdaptiveWindowPlanner]]:
+    if not adaptive:
+        return None
+    return {
+        code.code: AdaptiveWindowPlanner(result_cap=result_cap, max_span_days=span_days)
+        for code in class_codes
+    }
+
+
+def _search(
+    session: WICourtClient,
+    window: SearchWindow,
+    class_code: str,
+    journal: Optional[SweepJournal],
+) -> List[CaseSummary]:
+    if journal is not None:
+        replayed = journal.replay(window, class_code)
+        if replayed is not None:
+            return [CaseSummary.from_api(item, class_code) for item in replayed]
+    summaries = session.advanced_case_search(window=window, class_code=class_code)
+    if journal is not None:
+        journal.record(window, class_code, [summary.to_api() for summary in summaries])
+    return summaries
+
+
+async def _async_search(
+    session: AsyncWICourtClient,
+    window: SearchWindow,
+    class_code: str,
+    journal: Optional[SweepJournal],
+) -> List[CaseSummary]:
+    if journal is not None:
+        replayed = journal.replay(window, class_code)
+        if replayed is not None:
+            return [CaseSummary.from_api(item, class_code) for item in replayed]
+    summaries = await session.advanced_case_search(window=window, class_code=class_code)
+    if journal is not None:
+        journal.record(window, class_code, [summary.to_api() for summary in summaries])
+    return summaries
+
+
+def _search_adaptive(
+    session: WICourtClient,
+    window: SearchWindow,
+    class_code: str,
+    planner: AdaptiveWindowPlanner,
+    journal: Optional[SweepJournal],
+) -> List[CaseSummary]:
+    planner.begin(window)
+    collected: List[CaseSummary] = []
+    while True:
+        sub_window = planner.next_window()
+        if sub_window is None:
+            return collected
+        summaries = _search(session, sub_window, class_code, journal)
+        if planner.record(sub_window, len(summaries)):
+            collected.extend(summaries)
+
+
+async def _async_search_adaptive(
+    session: AsyncWICourtClient,
+    window: SearchWindow,
+    class_code: str,
+    planner: AdaptiveWindowPlanner,
+    journal: Optional[SweepJournal],
+) -> List[CaseSummary]:
+    planner.begin(window)
+    collected: List[CaseSummary] = []
+    while True:
+        sub_window = planner.next_window()
+        if sub_window is None:
+            return collected
+        summaries = await _async_search(session, sub_window, class_code, journal)
+        if planner.record(sub_window, len(summaries)):
+            collected.extend(summaries)
+
+
+WindowBatch = Tuple[SearchWindow, "OrderedDict[Tuple[str, int], AggregatedCase]"]
+
+
+def merge_aggregated(
+    aggregated: MutableMapping[Tuple[str, int], AggregatedCase],
+    batch: Dict[Tuple[str, int], AggregatedCase],
+) -> None:
+    """Fold ``batch`` into ``aggregated`` in place, unioning class codes of shared keys."""
+    if isinstance(aggregated, CompactCaseStore):
+        # Its lookups return copies, so the union has to happen inside the store.
+        aggregated.merge(batch)
+        return
+    for key, item in batch.items():
+        existing = aggregated.get(key)
+        if existing is None:
+            aggregated[key] = item
+        else:
+            existing.class_codes.update(item.class_codes)
+
+
+FailedUnit = Tuple[SearchWindow, str]
+
+
+class IncompleteSweepError(RuntimeError):
+    """Raised at the end of a sweep when some searches failed even after their retry.
+
+    Every other unit's results have been yielded by then. ``failed`` lists the
+    ``(window, class_code)`` pairs whose cases are missing, so callers can keep
+    their checkpoint and avoid marking those class codes as synced. The
+    ``fetch_*`` functions attach everything they aggregated as ``partial``, so
+    callers can carry on with those cases and still report the gap.
+    """
+
+    def __init__(
+        self,
+        failed: Sequence[FailedUnit],
+        partial: Optional[Dict[Tuple[str, int], AggregatedCase]] = None,
+    ) -> None:
+        self.failed: List[FailedUnit] = list(failed)
+        self.partial = partial
+        units = ", ".join(f"{window.start}..{window.end} class {code}" for window, code in self.failed)
+        super().__init__(f"{len(self.failed)} search(es) failed after their retry: {units}")
+
+    def __reduce__(self):
+        # Keep it picklable for the process-pool sweep.
+        return type(self), (self.failed, self.partial)
+
+    @property
+    def class_codes(self) -> Set[str]:
+        return {code for _, code in self.failed}
+
+
+def _log_unit_failure(
+    window: SearchWindow,
+    class_code: ClassCode,
+    exc: Exception,
+    *,
+    requeued: bool,
+) -> None:
+    if requeued:
+        logger.warning(
+            "Search %s..%s class %s failed (%s); requeued for the end of the sweep",
+            window.start, window.end, class_code.code, exc,
+        )
+    else:
+        logger.error(
+            "Search %s..%s class %s failed again (%s); the sweep will be incomplete",
+            window.start, window.end, class_code.code, exc,
+        )
+
+
+def _iter_unit_results(
+    session: WICourtClient,
+    *,
+    start: date,
+    end: Optional[date],
+    class_codes: Sequence[ClassCode],
+    span_days: int,
+    adaptive: bool,
+    result_cap: int,
+    journal: Optional[SweepJournal],
+) -> Iterator[Tuple[SearchWindow, ClassCode, List[CaseSummary]]]:
+    planners = _build_planners(class_codes, adaptive=adaptive, span_days=span_days, result_cap=result_cap)
+
+    def _run(window: SearchWindow, class_code: ClassCode) -> List[CaseSummary]:
+        if planners is not None:
+            return _search_adaptive(session, window, class_code.code, planners[class_code.code], journal)
+        return _search(session, window, class_code.code, journal)
+
+    # Units that still fail after the client's own retries are pushed to the
+    # end of the sweep instead of aborting it; their results arrive late.
+    deferred: List[Tuple[SearchWindow, ClassCode]] = []
+    for window in build_windows(start=start, end=end, span_days=span_days):
+        for class_code in class_codes:
+            try:
+                summaries = _run(window, class_code)
+            except httpx.HTTPError as exc:
+                _log_unit_failure(window, class_code, exc, requeued=True)
+                deferred.append((window, class_code))
+                continue
+            yield window, class_code, summaries
+
+    failed: List[FailedUnit] = []
+    for window, class_code in deferred:
+        try:
+            summaries = _run(window, class_code)
+        except httpx.HTTPError as exc:
+            _log_unit_failure(window, class_code, exc, requeued=False)
+            failed.append((window, class_code.code))
+            continue
+        yield window, class_code, summaries
+    if failed:
+        raise IncompleteSweepError(failed)
+
+
+def iter_window_batches(
+    *,
+    start: date,
+    end: Optional[date] = None,
+    class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
+    span_days: int = 7,
+    client: Optional[WICourtClient] = None,
+    adaptive: bool = False,
+    result_cap: int = DEFAULT_RESULT_CAP,
+    journal: Optional[SweepJournal] = None,
+) -> Iterator[WindowBatch]:
+    """Yield ``(window, cases)`` as soon as every class code of a window is searched.
+
+    ``cases`` aggregates that window's results by (case_no, county_no). Because
+    filing-date windows do not overlap, a case normally appears in exactly one
+    batch, which lets callers stream output without holding the whole sweep.
+    """
+
+    own_client = client is None
+    session = client or WICourtClient()
+
+    try:
+        units = _iter_unit_results(
+            session,
+            start=start,
+            end=end,
+            class_codes=class_codes,
+            span_days=span_days,
+            adaptive=adaptive,
+            result_cap=result_cap,
+            journal=journal,
+        )
+        for window, window_units in groupby(units, key=lambda unit: unit[0]):
+            batch: "OrderedDict[Tuple[str, int], AggregatedCase]" = OrderedDict()
+            for _, class_code, summaries in window_units:
+                _merge_summaries(batch, summaries, class_code.code)
+            yield window, batch
+    finally:
+        if own_client:
+            session.close()
+
+
+def _compact_key(case_no: str, county_no: int) -> str:
+    return f"{county_no}:{case_no}"
+
+
+def iter_case_summaries(
+    *,
+    start: date,
+    end: Optional[date] = None,
+    class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
+    span_days: int = 7,
+    client: Optional[WICourtClient] = None,
+    adaptive: bool = False,
+    result_cap: int = DEFAULT_RESULT_CAP,
+    journal: Optional[SweepJournal] = None,
+) -> Iterator[CaseEvent]:
+    """Yield :class:`CaseEvent` objects as each search returns.
+
+    The first row seen for a (case_no, county_no) produces a ``CASE`` event
+    with its summary; later rows for the same case produce ``MERGE`` events
+    naming the class code that matched. Only a set of short string keys is
+    retained, so memory does not grow with the size of the summaries. A
+    ``MERGE`` may repeat a class code already reported; treat it as a union.
+    """
+
+    own_client = client is None
+    session = client or WICourtClient()
+    seen: Set[str] = set()
+
+    try:
+        units = _iter_unit_results(
+            session,
+            start=start,
+            end=end,
+            class_codes=class_codes,
+            span_days=span_days,
+            adaptive=adaptive,
+            result_cap=result_cap,
+            journal=journal,
+        )
+        for _, class_code, summaries in units:
+            for summary in summaries:
+                key = _compact_key(summary.case_no, summary.county_no)
+                if key in seen:
+                    yield CaseEvent(CaseEvent.MERGE, summary.case_no, summary.county_no, class_code.code)
+                else:
+                    seen.add(key)
+                    yield CaseEvent(
+                        CaseEvent.CASE, summary.case_no, summary.county_no, class_code.code, summary
+                    )
+    finally:
+        if own_client:
+            session.close()
+
+
 def fetch_case_summaries(
     *,
     start: date,
@@ -30,49 +361,276 @@ def fetch_case_summaries(
     class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
     span_days: int = 7,
     client: Optional[WICourtClient] = None,
+    adaptive: bool = False,
+    result_cap: int = DEFAULT_RESULT_CAP,
+    journal: Optional[SweepJournal] = None,
 ) -> Dict[Tuple[str, int], AggregatedCase]:
-    """Iterate search windows and aggregate results keyed by (case_no, county_no)."""
+    """Iterate search windows and aggregate results keyed by (case_no, county_no).
+
+    With ``adaptive=True`` each class code gets an :class:`AdaptiveWindowPlanner`
+    that splits windows returning ``result_cap`` rows and widens sparse ones
+    (never beyond ``span_days``). When a ``journal`` is supplied every finished
+    search is checkpointed to it, and units already recorded there are replayed
+    instead of re-queried.
+
+    If some searches still fail after their retry, :class:`IncompleteSweepError`
+    is raised with the cases of every other search as ``partial``.
+    """
+    aggregated: "OrderedDict[Tuple[str, int], AggregatedCase]" = OrderedDict()
+    try:
+        for _, batch in iter_window_batches(
+            start=start,
+            end=end,
+            class_codes=class_codes,
+            span_days=span_days,
+            client=client,
+            adaptive=adaptive,
+            result_cap=result_cap,
+            journal=journal,
+        ):
+            merge_aggregated(aggregated, batch)
+    except IncompleteSweepError as exc:
+        exc.partial = aggregated
+        raise
+    return aggregated
+
+
+async def async_iter_window_batches(
+    *,
+    start: date,
+    end: Optional[date] = None,
+    class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
+    span_days: int = 7,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: Optional[AsyncWICourtClient] = None,
+    adaptive: bool = False,
+    result_cap: int = DEFAULT_RESULT_CAP,
+    journal: Optional[SweepJournal] = None,
+) -> AsyncIterator[WindowBatch]:
+    """Concurrent variant of :func:`iter_window_batches`.
+
+    At most ``concurrency`` searches are in flight at once and at most
+    ``concurrency`` windows are scheduled ahead of the one being yielded, so
+    memory stays bounded. Batches are yielded in window order. In adaptive mode
+    each class code's windows run one after another (its planner is stateful),
+    but different class codes and windows still overlap.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
 
     own_client = client is None
-    session = client or WICourtClient()
+    session = client or AsyncWICourtClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    planners = _build_planners(class_codes, adaptive=adaptive, span_days=span_days, result_cap=result_cap)
+    # asyncio.Lock wakes waiters in FIFO order, so each class code's windows
+    # reach its planner in window order.
+    code_locks = {code.code: asyncio.Lock() for code in class_codes}
+
+    code_order = {code.code: idx for idx, code in enumerate(class_codes)}
+    deferred: List[Tuple[SearchWindow, ClassCode]] = []
+    failed: List[FailedUnit] = []
 
+    async def _search_unit(
+        window: SearchWindow, class_code: ClassCode, *, requeue: bool = True
+    ) -> Optional[List[CaseSummary]]:
+        try:
+            if planners is None:
+                async with semaphore:
+                    return await _async_search(session, window, class_code.code, journal)
+            async with code_locks[class_code.code]:
+                async with semaphore:
+                    return await _async_search_adaptive(
+                        session, window, class_code.code, planners[class_code.code], journal
+                    )
+        except httpx.HTTPError as exc:
+            _log_unit_failure(window, class_code, exc, requeued=requeue)
+            if requeue:
+                deferred.append((window, class_code))
+            else:
+                failed.append((window, class_code.code))
+            return None
+
+    def _schedule(window: SearchWindow) -> "asyncio.Future[List[Optional[List[CaseSummary]]]]":
+        return asyncio.gather(*(_search_unit(window, code) for code in class_codes))
+
+    def _batch(
+        units: Iterable[Tuple[ClassCode, Optional[List[CaseSummary]]]],
+    ) -> "OrderedDict[Tuple[str, int], AggregatedCase]":
+        batch: "OrderedDict[Tuple[str, int], AggregatedCase]" = OrderedDict()
+        for class_code, summaries in units:
+            if summaries is not None:
+                _merge_summaries(batch, summaries, class_code.code)
+        return batch
+
+    pending: Deque[Tuple[SearchWindow, "asyncio.Future[List[Optional[List[CaseSummary]]]]"]] = deque()
     try:
-        aggregated: "OrderedDict[Tuple[str, int], AggregatedCase]" = OrderedDict()
         for window in build_windows(start=start, end=end, span_days=span_days):
-            for class_code in class_codes:
-                summaries = session.advanced_case_search(window=window, class_code=class_code.code)
-                for summary in summaries:
-                    key = (summary.case_no, summary.county_no)
-                    if key not in aggregated:
-                        aggregated[key] = AggregatedCase(summary=summary)
-                    aggregated[key].add_class_code(class_code.code)
-        return aggregated
+            pending.append((window, _schedule(window)))
+            if len(pending) > concurrency:
+                done_window, future = pending.popleft()
+                yield done_window, _batch(zip(class_codes, await future))
+        while pending:
+            done_window, future = pending.popleft()
+            yield done_window, _batch(zip(class_codes, await future))
+
+        # Second and final pass over units that failed, in sweep order.
+        retry_units = sorted(deferred, key=lambda unit: (unit[0].start, code_order[unit[1].code]))
+        deferred.clear()
+        retried = await asyncio.gather(
+            *(_search_unit(window, code, requeue=False) for window, code in retry_units)
+        )
+        outcomes = zip(retry_units, retried)
+        for window, grouped in groupby(outcomes, key=lambda outcome: outcome[0][0]):
+            batch = _batch((class_code, summaries) for (_, class_code), summaries in grouped)
+            if batch:
+                yield window, batch
+        if failed:
+            raise IncompleteSweepError(sorted(failed, key=lambda unit: (unit[0].start, code_order[unit[1]])))
     finally:
+        for _, future in pending:
+            future.cancel()
         if own_client:
-            session.close()
+            await session.aclose()
+
+
+async def async_fetch_case_summaries(
+    *,
+    start: date,
+    end: Optional[date] = None,
+    class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
+    span_days: int = 7,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: Optional[AsyncWICourtClient] = None,
+    adaptive: bool = False,
+    result_cap: int = DEFAULT_RESULT_CAP,
+    journal: Optional[SweepJournal] = None,
+) -> Dict[Tuple[str, int], AggregatedCase]:
+    """Concurrent variant of :func:`fetch_case_summaries`.
+
+    At most ``concurrency`` searches are in flight at once. Batches are merged
+    in window order, so the returned mapping is identical to the sequential
+    sweep, and a partial sweep is reported the same way.
+    """
+    aggregated: "OrderedDict[Tuple[str, int], AggregatedCase]" = OrderedDict()
+    try:
+        async for _, batch in async_iter_window_batches(
+            start=start,
+            end=end,
+            class_codes=class_codes,
+            span_days=span_days,
+            concurrency=concurrency,
+            client=client,
+            adaptive=adaptive,
+            result_cap=result_cap,
+            journal=journal,
+        ):
+            merge_aggregated(aggregated, batch)
+    except IncompleteSweepError as exc:
+        exc.partial = aggregated
+        raise
+    return aggregated
+
+
+async def async_iter_case_summaries(
+    *,
+    start: date,
+    end: Optional[date] = None,
+    class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
+    span_days: int = 7,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    client: Optional[AsyncWICourtClient] = None,
+    adaptive: bool = False,
+    result_cap: int = DEFAULT_RESULT_CAP,
+    journal: Optional[SweepJournal] = None,
+) -> AsyncIterator[CaseEvent]:
+    """Concurrent variant of :func:`iter_case_summaries`.
 
+    Events are produced per finished window rather than per search, so class
+    codes matched within the same window arrive as one ``CASE`` event followed
+    by ``MERGE`` events for the remaining codes.
+    """
+    seen: Set[str] = set()
+    async for _, batch in async_iter_window_batches(
+        start=start,
+        end=end,
+        class_codes=class_codes,
+        span_days=span_days,
+        concurrency=concurrency,
+        client=client,
+        adaptive=adaptive,
+        result_cap=result_cap,
+        journal=journal,
+    ):
+        for item in batch.values():
+            case_no, county_no = item.key()
+            codes = sorted(item.class_codes)
+            key = _compact_key(case_no, county_no)
+            if key not in seen:
+                seen.add(key)
+                yield CaseEvent(CaseEvent.CASE, case_no, county_no, codes[0], item.summary)
+                codes = codes[1:]
+            for code in codes:
+                yield CaseEvent(CaseEvent.MERGE, case_no, county_no, code)
 
-def flatten_aggregated(data: Dict[Tuple[str, int], AggregatedCase]) -> List[Dict[str, object]]:
+
+def serialise_case(item: AggregatedCase) -> Dict[str, object]:
+    """Convert one aggregated case into a JSON-ready dictionary."""
+    filing = item.summary.filing_date.isoformat() if item.summary.filing_date else None
+    return {
+        "case_no": item.summary.case_no,
+        "county_no": item.summary.county_no,
+        "county_name": item.summary.county_name,
+        "caption": item.summary.caption,
+        "party_name": item.summary.party_name,
+        "status": item.summary.status,
+        "filing_date": filing,
+        "dob": item.summary.dob,
+        "is_dob_sealed": item.summary.is_dob_sealed,
+        "class_codes": sorted(item.class_codes),
+        "raw": item.summary.raw,
+    }
+
+
+def flatten_aggregated(data: Mapping[Tuple[str, int], AggregatedCase]) -> List[Dict[str, object]]:
     """Convert aggregated cases into serialisable dictionaries."""
-    serialised: List[Dict[str, object]] = []
-    for item in data.values():
-        filing = item.summary.filing_date.isoformat() if item.summary.filing_date else None
-        serialised.append(
-            {
-                "case_no": item.summary.case_no,
-                "county_no": item.summary.county_no,
-                "county_name": item.summary.county_name,
-                "caption": item.summary.caption,
-                "party_name": item.summary.party_name,
-                "status": item.summary.status,
-                "filing_date": filing,
-                "dob": item.summary.dob,
-                "is_dob_sealed": item.summary.is_dob_sealed,
-                "class_codes": sorted(item.class_codes),
-                "raw": item.summary.raw,
-            }
-        )
-    return serialised
+    return [serialise_case(item) for item in data.values()]
+
+
+def merge_flattened(
+    existing: Iterable[Dict[str, object]],
+    updates: Iterable[Dict[str, object]],
+) -> List[Dict[str, object]]:
+    """Merge flattened rows keyed by (case_no, county_no).
+
+    Rows from ``updates`` replace the stored fields (status changes and the
+    like) while class codes are unioned. Existing order is kept and new cases
+    are appended.
+    """
+    merged: "OrderedDict[Tuple[str, int], Dict[str, object]]" = OrderedDict()
+    for row in existing:
+        merged[(str(row["case_no"]), int(row["county_no"]))] = row
+    for row in updates:
+        key = (str(row["case_no"]), int(row["county_no"]))
+        previous = merged.get(key)
+        if previous is not None:
+            codes = set(previous.get("class_codes") or []) | set(row.get("class_codes") or [])
+            row = {**row, "class_codes": sorted(codes)}
+        merged[key] = row
+    return list(merged.values())
 
 
-__all__ = ["build_windows", "fetch_case_summaries", "flatten_aggregated"]
+__all__ = [
+    "DEFAULT_CONCURRENCY",
+    "IncompleteSweepError",
+    "async_fetch_case_summaries",
+    "async_iter_case_summaries",
+    "async_iter_window_batches",
+    "build_windows",
+    "fetch_case_summaries",
+    "flatten_aggregated",
+    "iter_case_summaries",
+    "iter_window_batches",
+    "merge_aggregated",
+    "merge_flattened",
+    "serialise_case",
+]
@@ -0,0 +1,129 @@
+"""JSON encoding/decoding with optional orjson or msgspec acceleration.
+
+The fastest installed backend is picked at import time: ``orjson`` for
+generic documents, ``msgspec`` otherwise, falling back to the stdlib
+:mod:`json`. Dates are written in ISO format and other values JSON cannot
+represent via ``str()``, like ``json.dumps(default=str)`` (msgspec encodes
+sets and tuples natively as arrays). Output is UTF-8 rather than ASCII-escaped.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, List, Optional, Union
+
+from .models import CaseSummary
+from .utils import intern_str, parse_date
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:  # pragma: no cover - optional dependency
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+BACKEND = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode a JSON document; malformed input raises :class:`ValueError`."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as exc:
+            raise ValueError(str(exc)) from exc
+    return json.loads(data)
+
+
+def dump_bytes(obj: Any, *, indent: bool = False) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON, pretty-printed with two spaces if ``indent``."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=option)
+    if msgspec is not None:
+        encoded = msgspec.json.encode(obj, enc_hook=str)
+        return msgspec.json.format(encoded, indent=2) if indent else encoded
+    if indent:
+        return json.dumps(obj, indent=2, default=str, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), default=str, ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj: Any, *, indent: bool = False) -> str:
+    return dump_bytes(obj, indent=indent).decode("utf-8")
+
+
+if msgspec is not None:  # pragma: no cover - optional dependency
+
+    class _ApiCase(msgspec.Struct, rename="camel"):
+        case_no: str
+        caption: Optional[str] = ""
+        county_name: Optional[str] = ""
+        county_no: Optional[int] = 0
+        party_name: Optional[str] = ""
+        status: Optional[str] = ""
+        filing_date: Optional[str] = None
+        dob: Optional[str] = None
+        is_dob_sealed: Optional[bool] = False
+
+    class _ApiResult(msgspec.Struct):
+        # An empty window may send ``"cases": null``, like ``"result": null``.
+        cases: Optional[List[_ApiCase]] = []
+
+    class _ApiEnvelope(msgspec.Struct):
+        # UNSET (key absent) marks a rejected session; null means no cases.
+        result: Union[_ApiResult, None, msgspec.UnsetType] = msgspec.UNSET
+
+    _envelope_decoder = msgspec.json.Decoder(_ApiEnvelope, strict=False)
+
+
+def decode_case_summaries(content: bytes, class_code: str) -> Optional[List[CaseSummary]]:
+    """Decode an ``advancedCaseSearch`` body straight into :class:`CaseSummary` objects.
+
+    Returns ``None`` when the body is not a search result (e.g. the HTML page
+    served to an expired session). With msgspec installed the rows are decoded
+    into typed structs without building per-case dicts, so ``raw`` is left
+    empty; other backends keep the decoded dict as ``raw``.
+    """
+    if msgspec is None:
+        try:
+            data = loads(content)
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or "result" not in data:
+            return None
+        # Same null handling as client._extract_cases.
+        cases = (data["result"] or {}).get("cases") or []
+        return [CaseSummary.from_api(item, class_code) for item in cases]
+
+    try:  # pragma: no cover - optional dependency
+        envelope = _envelope_decoder.decode(content)
+    except msgspec.DecodeError:
+        return None
+    if envelope.result is msgspec.UNSET:
+        return None
+    result = envelope.result
+    code = intern_str(class_code)
+    return [
+        CaseSummary(
+            case_no=row.case_no,
+            caption=row.caption,
+            county_name=intern_str(row.county_name),
+            county_no=int(row.county_no or 0),
+            party_name=row.party_name,
+            status=intern_str(row.status),
+            filing_date=parse_date(row.filing_date),
+            class_code=code,
+            dob=row.dob,
+            is_dob_sealed=bool(row.is_dob_sealed),
+            raw={},
+        )
+        for row in ((result.cases if result is not None else None) or [])
+    ]
+
+
+__all__ = ["BACKEND", "decode_case_summaries", "dump_bytes", "dumps", "loads"]
@@ -0,0 +1,209 @@
+"""Multi-process sweeps that shard the (window x class code) grid across a process pool."""
+
+from __future__ import annotations
+
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from itertools import groupby
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .client import WICourtClient
+from .constants import ClassCode, DEFAULT_CLASS_CODES, DEFAULT_RESULT_CAP
+from .models import AggregatedCase
+from .ratelimit import build_rate_limiter
+from .scraper import (
+    FailedUnit,
+    IncompleteSweepError,
+    WindowBatch,
+    build_windows,
+    iter_window_batches,
+    merge_aggregated,
+)
+
+# Shards per worker process; more, smaller shards even out uneven class codes.
+SHARDS_PER_PROCESS = 4
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One class code over a contiguous run of search windows."""
+
+    index: int
+    start: date
+    end: date
+    class_code: ClassCode
+
+
+def plan_shards(
+    *,
+    start: date,
+    end: Optional[date] = None,
+    class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
+    span_days: int = 7,
+    processes: int = 1,
+    windows_per_shard: Optional[int] = None,
+) -> List[List[Shard]]:
+    """Split a sweep into shards, grouped by window chunk in sweep order.
+
+    Chunk boundaries fall on ``span_days`` window boundaries, so every shard
+    issues exactly the searches the sequential sweep would. Each chunk holds
+    one shard per class code.
+    """
+    windows = list(build_windows(start=start, end=end, span_days=span_days))
+    if not windows or not class_codes:
+        return []
+    if windows_per_shard is None:
+        chunks = max(1, math.ceil(SHARDS_PER_PROCESS * processes / len(class_codes)))
+        windows_per_shard = math.ceil(len(windows) / chunks)
+    plan: List[List[Shard]] = []
+    for offset in range(0, len(windows), windows_per_shard):
+        chunk = windows[offset : offset + windows_per_shard]
+        plan.append(
+            [
+                Shard(index, chunk[0].start, chunk[-1].end, code)
+                for index, code in enumerate(class_codes)
+            ]
+        )
+    return plan
+
+
+# Per-process state, set up once by the pool initializer. The client lives as
+# long as the worker; its connections close when the process exits.
+_worker_client: Optional[WICourtClient] = None
+_worker_settings: Dict[str, Any] = {}
+
+
+def _init_worker(
+    client_options: Mapping[str, Any],
+    rps: Optional[float],
+    burst: int,
+    settings: Mapping[str, Any],
+) -> None:
+    global _worker_client
+    _worker_client = WICourtClient(rate_limiter=build_rate_limiter(rps, burst), **client_options)
+    _worker_settings.update(settings)
+
+
+def _run_shard(shard: Shard) -> Tuple[Shard, List[WindowBatch], List[FailedUnit]]:
+    batches: List[WindowBatch] = []
+    try:
+        for batch in iter_window_batches(
+            start=shard.start,
+            end=shard.end,
+            class_codes=[shard.class_code],
+            client=_worker_client,
+            **_worker_settings,
+        ):
+            batches.append(batch)
+    except IncompleteSweepError as exc:
+        # Hand back what the shard did fetch; the parent raises once the whole sweep is merged.
+        return shard, batches, exc.failed
+    return shard, batches, []
+
+
+def _merge_chunk(results: Sequence[Tuple[Shard, List[WindowBatch], List[FailedUnit]]]) -> Iterator[WindowBatch]:
+    # Rebuild the sequential sweep's per-window batches: windows in date order,
+    # class codes in the order they were requested.
+    units = sorted(
+        ((window, shard.index, batch) for shard, batches, _ in results for window, batch in batches),
+        key=lambda unit: (unit[0].start, unit[0].end, unit[1]),
+    )
+    for window, grouped in groupby(units, key=lambda unit: unit[0]):
+        batch: "OrderedDict[Tuple[str, int], AggregatedCase]" = OrderedDict()
+        for _, _, partial in grouped:
+            merge_aggregated(batch, partial)
+        yield window, batch
+
+
+def sharded_iter_window_batches(
+    *,
+    start: date,
+    end: Optional[date] = None,
+    class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
+    span_days: int = 7,
+    processes: Optional[int] = None,
+    adaptive: bool = False,
+    result_cap: int = DEFAULT_RESULT_CAP,
+    client_options: Optional[Mapping[str, Any]] = None,
+    rps: Optional[float] = None,
+    burst: int = 1,
+    windows_per_shard: Optional[int] = None,
+) -> Iterator[WindowBatch]:
+    """Run a sweep on a process pool, yielding the same batches as :func:`iter_window_batches`.
+
+    Every worker process owns one :class:`WICourtClient` built from
+    ``client_options`` (which must be picklable, e.g. ``cache``,
+    ``retry_policy``, ``sessions``), so JSON decoding and ``CaseSummary``
+    construction use every core. ``rps``/``burst`` describe the overall rate
+    and are divided between the workers. Batches are yielded in sweep order
+    as each chunk of windows finishes.
+    """
+    processes = processes or os.cpu_count() or 1
+    plan = plan_shards(
+        start=start,
+        end=end,
+        class_codes=class_codes,
+        span_days=span_days,
+        processes=processes,
+        windows_per_shard=windows_per_shard,
+    )
+    if not plan:
+        return
+    worker_rps = rps / processes if rps else None
+    settings = {"span_days": span_days, "adaptive": adaptive, "result_cap": result_cap}
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(dict(client_options or {}), worker_rps, max(1, burst // processes), settings),
+    ) as pool:
+        results = pool.map(_run_shard, [shard for chunk in plan for shard in chunk])
+        failed: List[FailedUnit] = []
+        for chunk in plan:
+            chunk_results = [next(results) for _ in chunk]
+            for _, _, shard_failed in chunk_results:
+                failed.extend(shard_failed)
+            yield from _merge_chunk(chunk_results)
+    if failed:
+        raise IncompleteSweepError(sorted(failed, key=lambda unit: unit[0].start))
+
+
+def sharded_fetch_case_summaries(
+    *,
+    start: date,
+    end: Optional[date] = None,
+    class_codes: Sequence[ClassCode] = DEFAULT_CLASS_CODES,
+    span_days: int = 7,
+    processes: Optional[int] = None,
+    adaptive: bool = False,
+    result_cap: int = DEFAULT_RESULT_CAP,
+    client_options: Optional[Mapping[str, Any]] = None,
+    rps: Optional[float] = None,
+    burst: int = 1,
+) -> Dict[Tuple[str, int], AggregatedCase]:
+    """Process-pool counterpart of :func:`fetch_case_summaries`."""
+    aggregated: "OrderedDict[Tuple[str, int], AggregatedCase]" = OrderedDict()
+    try:
+        for _, batch in sharded_iter_window_batches(
+            start=start,
+            end=end,
+            class_codes=class_codes,
+            span_days=span_days,
+            processes=processes,
+            adaptive=adaptive,
+            result_cap=result_cap,
+            client_options=client_options,
+            rps=rps,
+            burst=burst,
+        ):
+            merge_aggregated(aggregated, batch)
+    except IncompleteSweepError as exc:
+        exc.partial = aggregated
+        raise
+    return aggregated
+
+
+__all__ = ["Shard", "plan_shards", "sharded_fetch_case_summaries", "sharded_iter_window_batches"]
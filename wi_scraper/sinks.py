@@ -0,0 +1,111 @@
+"""Incremental output sinks that write records as they are produced."""
+
+from __future__ import annotations
+
+import csv
+import sys
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional, Sequence, TextIO
+
+from .serialization import dumps
+
+
+class NDJSONSink(AbstractContextManager["NDJSONSink"]):
+    """Write one JSON document per line to a file or stdout.
+
+    The stream is flushed every ``flush_every`` records so readers can follow
+    the file while a sweep is still running. ``append=True`` keeps existing
+    lines instead of truncating the file.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path | str] = None,
+        *,
+        append: bool = False,
+        flush_every: int = 100,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self._owns_handle = self.path is not None
+        if self.path is not None:
+            self._handle: TextIO = self.path.open("a" if append else "w", encoding="utf-8")
+        else:
+            self._handle = sys.stdout
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        self._handle.write(dumps(record) + "\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._handle.flush()
+
+    def flush(self) -> None:
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.flush()
+        if self._owns_handle:
+            self._handle.close()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
+
+
+class CSVSink(AbstractContextManager["CSVSink"]):
+    """Append rows to a CSV file as they are produced.
+
+    Columns are ``fieldnames``, or the keys of the first row written; the
+    header goes out with the first row, unless ``append=True`` continues a
+    file that already has one. Like :class:`NDJSONSink` the file is flushed
+    every ``flush_every`` rows, so a crash loses at most the last few.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        fieldnames: Optional[Sequence[str]] = None,
+        append: bool = False,
+        flush_every: int = 100,
+    ) -> None:
+        self.path = Path(path)
+        self.fieldnames = list(fieldnames) if fieldnames is not None else None
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self._header_written = append and self.path.exists() and self.path.stat().st_size > 0
+        self._handle: TextIO = self.path.open("a" if append else "w", newline="", encoding="utf-8")
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        if self._writer is None:
+            if self.fieldnames is None:
+                self.fieldnames = list(row.keys())
+            self._writer = csv.DictWriter(self._handle, fieldnames=self.fieldnames)
+            if not self._header_written:
+                self._writer.writeheader()
+                self._header_written = True
+        self._writer.writerow(row)
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._handle.flush()
+
+    def write_many(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def flush(self) -> None:
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.flush()
+        self._handle.close()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
+
+
+__all__ = ["CSVSink", "NDJSONSink"]
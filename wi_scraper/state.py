@@ -0,0 +1,60 @@
+"""Durable high-water marks for incremental summary sweeps."""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from .utils import parse_date
+
+
+class SyncState:
+    """Per-class-code record of the last fully synced filing date.
+
+    The state lives in a small JSON file that is rewritten atomically, so an
+    interrupted run leaves the previous high-water marks intact.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._marks: Dict[str, date] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for code, value in (data.get("class_codes") or {}).items():
+                parsed = parse_date(value)
+                if parsed is not None:
+                    self._marks[code] = parsed
+
+    def high_water(self, class_code: str) -> Optional[date]:
+        return self._marks.get(class_code)
+
+    def resume_from(self, class_code: str, *, default: date, overlap_days: int = 7) -> date:
+        """First filing date to query for ``class_code``.
+
+        Re-checks ``overlap_days`` before the high-water mark because cases can
+        appear in the index a few days after their filing date.
+        """
+        mark = self._marks.get(class_code)
+        if mark is None:
+            return default
+        return max(default, mark - timedelta(days=overlap_days))
+
+    def mark_synced(self, class_code: str, through: date) -> None:
+        current = self._marks.get(class_code)
+        if current is None or through > current:
+            self._marks[class_code] = through
+
+    def save(self) -> None:
+        payload = {
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "class_codes": {code: mark.isoformat() for code, mark in sorted(self._marks.items())},
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+__all__ = ["SyncState"]
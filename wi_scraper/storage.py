@@ -0,0 +1,223 @@
+"""SQLite storage for swept cases, their class codes and fetched details."""
+
+from __future__ import annotations
+
+import sqlite3
+from contextlib import AbstractContextManager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .models import AggregatedCase
+from .serialization import dumps, loads
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    case_no       TEXT    NOT NULL,
+    county_no     INTEGER NOT NULL,
+    county_name   TEXT,
+    caption       TEXT,
+    party_name    TEXT,
+    status        TEXT,
+    filing_date   TEXT,
+    dob           TEXT,
+    is_dob_sealed INTEGER NOT NULL DEFAULT 0,
+    raw           TEXT,
+    updated_at    TEXT    NOT NULL,
+    PRIMARY KEY (case_no, county_no)
+);
+CREATE TABLE IF NOT EXISTS case_class_codes (
+    case_no    TEXT    NOT NULL,
+    county_no  INTEGER NOT NULL,
+    class_code TEXT    NOT NULL,
+    PRIMARY KEY (case_no, county_no, class_code)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS case_details (
+    case_no    TEXT    NOT NULL,
+    county_no  INTEGER NOT NULL,
+    detail     TEXT    NOT NULL,
+    fetched_at TEXT    NOT NULL,
+    PRIMARY KEY (case_no, county_no)
+);
+CREATE INDEX IF NOT EXISTS idx_cases_filing_date ON cases (filing_date);
+CREATE INDEX IF NOT EXISTS idx_cases_county_no ON cases (county_no);
+CREATE INDEX IF NOT EXISTS idx_case_class_codes_class_code ON case_class_codes (class_code);
+"""
+
+_UPSERT_CASE = """
+INSERT INTO cases (
+    case_no, county_no, county_name, caption, party_name, status,
+    filing_date, dob, is_dob_sealed, raw, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (case_no, county_no) DO UPDATE SET
+    county_name = excluded.county_name,
+    caption = excluded.caption,
+    party_name = excluded.party_name,
+    status = excluded.status,
+    filing_date = excluded.filing_date,
+    dob = excluded.dob,
+    is_dob_sealed = excluded.is_dob_sealed,
+    raw = COALESCE(excluded.raw, cases.raw),
+    updated_at = excluded.updated_at
+"""
+
+_LINK_CLASS_CODE = "INSERT OR IGNORE INTO case_class_codes (case_no, county_no, class_code) VALUES (?, ?, ?)"
+
+_UPSERT_DETAIL = """
+INSERT INTO case_details (case_no, county_no, detail, fetched_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (case_no, county_no) DO UPDATE SET
+    detail = excluded.detail,
+    fetched_at = excluded.fetched_at
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class SQLiteCaseStore(AbstractContextManager["SQLiteCaseStore"]):
+    """Upsert swept cases into a SQLite database in WAL mode.
+
+    Each :meth:`write_batch` / :meth:`upsert_cases` call runs in one
+    transaction, split into chunks of ``batch_size`` rows. Re-sweeping a case
+    refreshes its fields and adds any new class codes; existing links are
+    never dropped. Cases are keyed by ``(case_no, county_no)``, with
+    indexes on ``filing_date``, ``county_no`` and class code so analysts can
+    query the tables directly (see :attr:`connection`).
+    """
+
+    def __init__(self, path: Path | str, *, batch_size: int = 500) -> None:
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent on power loss even without a full fsync per commit.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._conn
+
+    def upsert_cases(self, items: Iterable[AggregatedCase]) -> int:
+        """Insert or refresh cases and link their class codes; returns the rows written."""
+        written = 0
+        now = _now()
+        chunk: List[AggregatedCase] = []
+        with self._conn:
+            for item in items:
+                chunk.append(item)
+                if len(chunk) >= self.batch_size:
+                    written += self._write_chunk(chunk, now)
+                    chunk = []
+            if chunk:
+                written += self._write_chunk(chunk, now)
+        return written
+
+    def _write_chunk(self, chunk: List[AggregatedCase], now: str) -> int:
+        self._conn.executemany(
+            _UPSERT_CASE,
+            [
+                (
+                    item.summary.case_no,
+                    item.summary.county_no,
+                    item.summary.county_name,
+                    item.summary.caption,
+                    item.summary.party_name,
+                    item.summary.status,
+                    item.summary.filing_date.isoformat() if item.summary.filing_date else None,
+                    item.summary.dob,
+                    int(item.summary.is_dob_sealed),
+                    dumps(item.summary.raw) if item.summary.raw else None,
+                    now,
+                )
+                for item in chunk
+            ],
+        )
+        self._conn.executemany(
+            _LINK_CLASS_CODE,
+            [
+                (item.summary.case_no, item.summary.county_no, code)
+                for item in chunk
+                for code in item.class_codes
+            ],
+        )
+        return len(chunk)
+
+    def write_batch(self, batch: Mapping[Tuple[str, int], AggregatedCase]) -> int:
+        """Store one window's aggregated cases (usable as a sweep ``on_batch`` sink)."""
+        return self.upsert_cases(batch.values())
+
+    def upsert_detail(self, case_no: str, county_no: int, detail: Mapping[str, Any]) -> None:
+        self.upsert_details([(case_no, county_no, detail)])
+
+    def upsert_details(self, details: Iterable[Tuple[str, int, Mapping[str, Any]]]) -> None:
+        now = _now()
+        with self._conn:
+            self._conn.executemany(
+                _UPSERT_DETAIL,
+                [(case_no, int(county_no), dumps(detail), now) for case_no, county_no, detail in details],
+            )
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+    def iter_cases(
+        self,
+        *,
+        filed_from: Optional[date] = None,
+        filed_to: Optional[date] = None,
+        class_code: Optional[str] = None,
+        county_no: Optional[int] = None,
+    ) -> Iterator[Dict[str, object]]:
+        """Yield stored cases as :func:`wi_scraper.serialise_case`-style dictionaries."""
+        clauses: List[str] = []
+        params: List[object] = []
+        if filed_from is not None:
+            clauses.append("c.filing_date >= ?")
+            params.append(filed_from.isoformat())
+        if filed_to is not None:
+            clauses.append("c.filing_date <= ?")
+            params.append(filed_to.isoformat())
+        if county_no is not None:
+            clauses.append("c.county_no = ?")
+            params.append(county_no)
+        if class_code is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM case_class_codes f WHERE f.case_no = c.case_no"
+                " AND f.county_no = c.county_no AND f.class_code = ?)"
+            )
+            params.append(class_code)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"""
+            SELECT c.case_no, c.county_no, c.county_name, c.caption, c.party_name, c.status,
+                   c.filing_date, c.dob, c.is_dob_sealed, c.raw,
+                   (SELECT group_concat(class_code, ',') FROM case_class_codes l
+                     WHERE l.case_no = c.case_no AND l.county_no = c.county_no)
+            FROM cases c {where}
+            ORDER BY c.filing_date, c.county_no, c.case_no
+        """
+        for row in self._conn.execute(query, params):
+            yield {
+                "case_no": row[0],
+                "county_no": row[1],
+                "county_name": row[2],
+                "caption": row[3],
+                "party_name": row[4],
+                "status": row[5],
+                "filing_date": row[6],
+                "dob": row[7],
+                "is_dob_sealed": bool(row[8]),
+                "class_codes": sorted(row[10].split(",")) if row[10] else [],
+                "raw": loads(row[9]) if row[9] else {},
+            }
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
+
+
+__all__ = ["SQLiteCaseStore"]
@@ -0,0 +1,108 @@
+"""Shared HTTP transport factory for every WCCA entry point."""
+
+from __future__ import annotations
+
+import importlib.util
+from typing import Mapping, Optional
+
+import httpx
+
+from .constants import BASE_URL
+
+DEFAULT_MAX_CONNECTIONS = 20
+# httpx drops idle connections after 5s by default, which at the paced
+# request rates used here means a fresh TLS handshake for almost every call.
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+
+def http2_available() -> bool:
+    """Return whether the optional ``h2`` package (``httpx[http2]``) is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_limits(
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    *,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+) -> httpx.Limits:
+    """Pool limits that keep every connection of a concurrent sweep alive between requests."""
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+
+
+def build_transport(
+    *,
+    http2: Optional[bool] = None,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+) -> httpx.HTTPTransport:
+    """Build a connection pool that can be shared by several :class:`httpx.Client` objects.
+
+    ``http2=None`` enables HTTP/2 whenever ``h2`` is installed; the protocol is
+    still negotiated per connection, so servers without HTTP/2 get HTTP/1.1.
+    Clients sharing the transport keep separate cookie jars but reuse its
+    connections. Closing any of them (``httpx.Client.close``) closes the
+    transport for all, so close the transport yourself once every client is
+    done and leave the clients unclosed.
+    """
+    return httpx.HTTPTransport(
+        http2=http2_available() if http2 is None else http2,
+        limits=build_limits(max_connections, keepalive_expiry=keepalive_expiry),
+    )
+
+
+def build_async_transport(
+    *,
+    http2: Optional[bool] = None,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+) -> httpx.AsyncHTTPTransport:
+    """Asyncio counterpart of :func:`build_transport`."""
+    return httpx.AsyncHTTPTransport(
+        http2=http2_available() if http2 is None else http2,
+        limits=build_limits(max_connections, keepalive_expiry=keepalive_expiry),
+    )
+
+
+def build_http_client(
+    *,
+    headers: Mapping[str, str],
+    transport: Optional[httpx.HTTPTransport] = None,
+    timeout: float = 30.0,
+) -> httpx.Client:
+    """Create a WCCA client on ``transport`` (or a fresh pooled one)."""
+    return httpx.Client(
+        base_url=BASE_URL,
+        timeout=timeout,
+        headers=headers,
+        transport=transport or build_transport(),
+    )
+
+
+def build_async_http_client(
+    *,
+    headers: Mapping[str, str],
+    transport: Optional[httpx.AsyncHTTPTransport] = None,
+    timeout: float = 30.0,
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        timeout=timeout,
+        headers=headers,
+        transport=transport or build_async_transport(),
+    )
+
+
+__all__ = [
+    "DEFAULT_KEEPALIVE_EXPIRY",
+    "DEFAULT_MAX_CONNECTIONS",
+    "build_async_http_client",
+    "build_async_transport",
+    "build_http_client",
+    "build_limits",
+    "build_transport",
+    "http2_available",
+]
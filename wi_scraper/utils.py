@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import sys
 from datetime import date, timedelta
-from typing import Generator, Optional, Tuple
+from typing import Any, Generator, Optional, Tuple
 
 
 def parse_date(value: str | None) -> Optional[date]:
@@ -21,6 +22,11 @@ def parse_date(value: str | None) -> Optional[date]:
     raise ValueError(f"Unrecognized date format: {value}")
 
 
+def intern_str(value: Any) -> Any:
+    """Intern strings that repeat across many rows (counties, statuses, class codes)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 def iter_windows(start: date, end: date, span_days: int = 7) -> Generator[Tuple[date, date], None, None]:
     """Yield inclusive windows covering start..end using ``span_days`` buckets."""
     if span_days < 1:
@@ -36,4 +42,4 @@ def iter_windows(start: date, end: date, span_days: int = 7) -> Generator[Tuple[
         current = window_end + one_day
 
 
-__all__ = ["parse_date", "iter_windows"]
+__all__ = ["intern_str", "parse_date", "iter_windows"]
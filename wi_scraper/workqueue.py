@@ -0,0 +1,261 @@
+"""Durable SQLite work queue for case-detail fetches."""
+
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .serialization import dumps, loads
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+STATES = (PENDING, IN_FLIGHT, DONE, FAILED)
+
+DEFAULT_MAX_ATTEMPTS = 3
+# An in-flight claim older than this is assumed to belong to a dead worker and is handed out again.
+DEFAULT_LEASE_SECONDS = 10 * 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detail_jobs (
+    case_no     TEXT    NOT NULL,
+    county_no   INTEGER NOT NULL,
+    payload     TEXT    NOT NULL,
+    state       TEXT    NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    claim       TEXT,
+    worker      TEXT,
+    lease_until REAL,
+    result      TEXT,
+    updated_at  TEXT    NOT NULL,
+    UNIQUE (case_no, county_no)
+);
+CREATE INDEX IF NOT EXISTS idx_detail_jobs_state ON detail_jobs (state);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class DetailJob:
+    """One claimed case; ``claim`` identifies this particular hand-out of it."""
+
+    case_no: str
+    county_no: int
+    case: Dict[str, Any]
+    attempts: int
+    claim: str
+
+
+class DetailWorkQueue(AbstractContextManager["DetailWorkQueue"]):
+    """Track detail fetches in SQLite as pending, in-flight, done or failed.
+
+    :meth:`enqueue` adds cases once, keyed by ``(case_no, county_no)``;
+    re-enqueueing a known case leaves its state alone, so a run can be
+    restarted with the same input and only the unfinished cases are fetched.
+    Workers :meth:`claim` cases, then record each outcome with
+    :meth:`complete` or :meth:`fail` as soon as it is known. Claims run in
+    ``BEGIN IMMEDIATE`` transactions, so several processes (and threads, the
+    connection is shared under a lock) can drain one database.
+
+    A claim not settled within ``lease_seconds`` (its worker crashed or was
+    killed) goes back to pending. Results are accepted only from the current
+    claim, so a case is stored exactly once even if a stale worker finishes
+    late. A case that fails ``max_attempts`` times is parked as failed with
+    its last error until :meth:`retry_failed`.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        worker_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        self.path = Path(path)
+        self.worker_id = worker_id or default_worker_id()
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        # Autocommit mode: every write below opens its own explicit transaction.
+        self._conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE takes the write lock up front, so two processes never claim the same row.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # Producers ---------------------------------------------------------------------
+    def enqueue(self, cases: Iterable[Mapping[str, Any]]) -> int:
+        """Add cases not seen before; returns how many were new."""
+        now = _now()
+        rows = [(case["case_no"], int(case["county_no"]), dumps(dict(case)), now) for case in cases]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO detail_jobs (case_no, county_no, payload, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def retry_failed(self) -> int:
+        """Move failed cases back to pending with a fresh attempt budget."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE detail_jobs SET state = ?, attempts = 0, updated_at = ? WHERE state = ?",
+                (PENDING, _now(), FAILED),
+            ).rowcount
+
+    # Workers -----------------------------------------------------------------------
+    def _expire_leases(self, conn: sqlite3.Connection) -> None:
+        now = _now()
+        conn.execute(
+            "UPDATE detail_jobs SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+            " error = COALESCE(error, 'lease expired'), claim = NULL, lease_until = NULL, updated_at = ?"
+            " WHERE state = ? AND lease_until < ?",
+            (self.max_attempts, FAILED, PENDING, now, IN_FLIGHT, time.time()),
+        )
+
+    def claim(self, limit: int = 1) -> List[DetailJob]:
+        """Take up to ``limit`` pending cases, oldest first, and mark them in flight."""
+        with self._transaction() as conn:
+            self._expire_leases(conn)
+            rows = conn.execute(
+                "SELECT rowid, case_no, county_no, payload, attempts FROM detail_jobs"
+                " WHERE state = ? ORDER BY rowid LIMIT ?",
+                (PENDING, limit),
+            ).fetchall()
+            jobs: List[DetailJob] = []
+            lease_until = time.time() + self.lease_seconds
+            now = _now()
+            for rowid, case_no, county_no, payload, attempts in rows:
+                job = DetailJob(case_no, county_no, loads(payload), attempts + 1, uuid.uuid4().hex)
+                conn.execute(
+                    "UPDATE detail_jobs SET state = ?, attempts = ?, claim = ?, worker = ?, lease_until = ?,"
+                    " updated_at = ? WHERE rowid = ?",
+                    (IN_FLIGHT, job.attempts, job.claim, self.worker_id, lease_until, now, rowid),
+                )
+                jobs.append(job)
+            return jobs
+
+    def claim_one(self) -> Optional[DetailJob]:
+        jobs = self.claim(1)
+        return jobs[0] if jobs else None
+
+    def complete(self, job: DetailJob, result: Any) -> bool:
+        """Store ``result`` for ``job``; ``False`` if the claim was lost and the result dropped."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE detail_jobs SET state = ?, result = ?, error = NULL, claim = NULL, lease_until = NULL,"
+                " updated_at = ? WHERE case_no = ? AND county_no = ? AND claim = ?",
+                (DONE, dumps(result), _now(), job.case_no, job.county_no, job.claim),
+            ).rowcount == 1
+
+    def fail(self, job: DetailJob, error: str, *, retry: bool = True) -> bool:
+        """Record a failed attempt; the case is retried until ``max_attempts`` unless ``retry`` is false."""
+        state = PENDING if retry and job.attempts < self.max_attempts else FAILED
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE detail_jobs SET state = ?, error = ?, claim = NULL, lease_until = NULL, updated_at = ?"
+                " WHERE case_no = ? AND county_no = ? AND claim = ?",
+                (state, error, _now(), job.case_no, job.county_no, job.claim),
+            ).rowcount == 1
+
+    def release(self) -> int:
+        """Hand this worker's in-flight cases back without charging an attempt (e.g. on Ctrl-C)."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE detail_jobs SET state = ?, attempts = MAX(attempts - 1, 0), claim = NULL,"
+                " lease_until = NULL, updated_at = ? WHERE state = ? AND worker = ?",
+                (PENDING, _now(), IN_FLIGHT, self.worker_id),
+            ).rowcount
+
+    # Reporting ---------------------------------------------------------------------
+    def peek(self) -> Optional[Dict[str, Any]]:
+        """Return the oldest pending case without claiming it."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM detail_jobs WHERE state = ? ORDER BY rowid LIMIT 1", (PENDING,)
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM detail_jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in STATES}
+        counts.update(dict(rows))
+        return counts
+
+    def results(self, *, page_size: int = 500) -> Iterator[Tuple[Dict[str, Any], Any]]:
+        """Yield ``(case, result)`` for every finished case in enqueue order, ``page_size`` rows at a time."""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, payload, result FROM detail_jobs WHERE state = ? AND rowid > ?"
+                    " ORDER BY rowid LIMIT ?",
+                    (DONE, last, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for last, payload, result in rows:
+                yield loads(payload), loads(result)
+
+    def failures(self) -> Iterator[Tuple[Dict[str, Any], int, Optional[str]]]:
+        """Yield ``(case, attempts, error)`` for cases parked as failed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, attempts, error FROM detail_jobs WHERE state = ? ORDER BY rowid", (FAILED,)
+            ).fetchall()
+        for payload, attempts, error in rows:
+            yield loads(payload), attempts, error
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        self.close()
+        return None
+
+
+__all__ = [
+    "DEFAULT_LEASE_SECONDS",
+    "DEFAULT_MAX_ATTEMPTS",
+    "DONE",
+    "DetailJob",
+    "DetailWorkQueue",
+    "FAILED",
+    "IN_FLIGHT",
+    "PENDING",
+    "default_worker_id",
+]